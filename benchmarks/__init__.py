@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+"""
+Performance benchmarks for cartography tools.
+
+Benchmarks must be run from a Python environment with access to the QGIS libraries,
+from the root of the repository, e.g.
+
+    python3 -m benchmarks.spatial_index
+    python3 -m benchmarks.algorithms --output results.json
+    python3 -m benchmarks.compare baseline.json results.json
+
+Synthetic road networks for the benchmarks are created by the seeded generators in
+benchmarks.generators.
+"""
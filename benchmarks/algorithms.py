@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Times each algorithm from the cartography tools processing provider against synthetic
+road networks of increasing size, and writes the results to a JSON file.
+
+    python3 -m benchmarks.algorithms --output results.json
+    python3 -m benchmarks.algorithms --sizes 10000 --cases removeculdesacs
+
+Every case is run in a separate Python process, so that the recorded peak resident set
+size belongs to that case alone. The peak includes the generated input layer.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from qgis.core import (Qgis,
+                       QgsApplication,
+                       QgsProcessing,
+                       QgsProcessingContext,
+                       QgsProcessingFeedback)
+
+from benchmarks.generators import GENERATORS, create_layer
+from benchmarks.utils import qgis_application, peak_rss_mb
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# benchmark case name: (algorithm id, generator name, algorithm parameters)
+CASES = {
+    'removeroundabouts': ('removeroundabouts', 'radial_network',
+                          {'EXPRESSION': '"type" = \'roundabout\''}),
+    'removeculdesacs': ('removeculdesacs', 'culdesac_suburb',
+                        {'THRESHOLD': 40}),
+    'removeculdesacs_iterate': ('removeculdesacs', 'culdesac_suburb',
+                                {'THRESHOLD': 40, 'ITERATE': True}),
+    'removecrossroads': ('removecrossroads', 'dual_carriageways',
+                         {'FIELDS': ['name'], 'THRESHOLD': 20}),
+    'removecrossroads_low_memory': ('removecrossroads', 'dual_carriageways',
+                                    {'FIELDS': ['name'], 'THRESHOLD': 20, 'LOW_MEMORY': True}),
+    'collapsedualcarriageway': ('collapsedualcarriageway', 'dual_carriageways',
+                                {'FIELDS': ['name'], 'THRESHOLD': 15}),
+    'averagelines': ('averagelines', 'grid_city',
+                     {'RESOLUTION': 10}),
+    'generalizeroadnetwork': ('generalizeroadnetwork', 'radial_network',
+                              {'ROUNDABOUT_EXPRESSION': '"type" = \'roundabout\'',
+                               'FIELDS': ['name'],
+                               'CULDESAC_THRESHOLD': 40,
+                               'CROSSROAD_THRESHOLD': 20,
+                               'DUAL_CARRIAGEWAY_THRESHOLD': 15}),
+    'placemarkersalonglines': ('placemarkersalonglines', 'grid_city',
+                               {'SPACING': 1, 'DISTANCE': 20}),
+}
+
+
+def run_case(case: str, segment_count: int, seed: int = 0) -> dict:
+    """
+    Runs a single benchmark case in the current process, returning the measured results
+    """
+    # imported here so that the plugin is only loaded after QGIS has been initialized
+    from cartography_tools.processing.provider import CartographyToolsProvider  # pylint: disable=import-outside-toplevel
+
+    algorithm_id, generator, case_parameters = CASES[case]
+
+    provider = CartographyToolsProvider()
+    QgsApplication.processingRegistry().addProvider(provider)
+    algorithm = QgsApplication.processingRegistry().createAlgorithmById(f'{provider.id()}:{algorithm_id}')
+
+    layer = create_layer(GENERATORS[generator](segment_count, seed), generator)
+    parameters = dict(case_parameters)
+    parameters['INPUT'] = layer
+    parameters['OUTPUT'] = QgsProcessing.TEMPORARY_OUTPUT
+
+    start = time.perf_counter()
+    _, ok = algorithm.run(parameters, QgsProcessingContext(), QgsProcessingFeedback())
+    wall_time = time.perf_counter() - start
+
+    features = layer.featureCount()
+    return {
+        'case': case,
+        'algorithm': algorithm_id,
+        'generator': generator,
+        'segments': segment_count,
+        'features': features,
+        'ok': bool(ok),
+        'wall_time': wall_time,
+        'peak_rss_mb': peak_rss_mb(),
+        'features_per_second': features / wall_time if wall_time > 0 else None,
+    }
+
+
+def run_case_in_subprocess(case: str, segment_count: int, seed: int = 0) -> dict:
+    """
+    Runs a single benchmark case in a new Python process, returning the measured results
+    """
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.algorithms', '--single',
+                             '--cases', case, '--sizes', str(segment_count), '--seed', str(seed)],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """
+    Runs the benchmarks from the command line
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the cartography tools processing algorithms')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='segment counts to test')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES.keys()), default=sorted(CASES.keys()),
+                        help='benchmark cases to run')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file to write results to')
+    parser.add_argument('--single', action='store_true',
+                        help='run the first case and size in this process, and print the result as JSON')
+    args = parser.parse_args()
+
+    if args.single:
+        with qgis_application():
+            print(json.dumps(run_case(args.cases[0], args.sizes[0], args.seed)))
+        return
+
+    results = []
+    for case in args.cases:
+        for size in args.sizes:
+            result = run_case_in_subprocess(case, size, args.seed)
+            print(f"{case:<30} {size:>8} segments {result['wall_time']:10.2f}s {result['peak_rss_mb']:10.1f} MB "
+                  f"{result['features_per_second'] or 0:12.0f} features/s")
+            results.append(result)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'metadata': {
+                'timestamp': datetime.datetime.now().isoformat(),
+                'qgis_version': Qgis.version(),
+                'python_version': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+            },
+            'results': results
+        }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Compares two sets of benchmark results written by benchmarks.algorithms, flagging
+any case which is slower or uses more memory than the baseline by more than a tolerance.
+
+    python3 -m benchmarks.compare baseline.json current.json --time-tolerance 0.1
+
+Exits with a non-zero status if any regressions are found. This script does not
+require QGIS.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+
+def load_results(path: str) -> Dict[Tuple[str, int], dict]:
+    """
+    Loads a benchmark results file, returning a dictionary of (case, segments) to result
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return {(r['case'], r['segments']): r for r in json.load(f)['results']}
+
+
+def compare(baseline: Dict[Tuple[str, int], dict],
+            current: Dict[Tuple[str, int], dict],
+            time_tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """
+    Compares current results against a baseline, returning a list of descriptions of regressions.
+
+    Tolerances are fractions of the baseline value, e.g. 0.1 allows results up to 10% worse.
+    Cases which only exist in one set of results are ignored, but a case which failed in the
+    current results is always a regression.
+    """
+    regressions = []
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]
+        after = current[key]
+        label = f'{key[0]} ({key[1]} segments)'
+
+        if before.get('ok', True) and not after.get('ok', True):
+            regressions.append(f'{label}: failed')
+            continue
+
+        for metric, unit, tolerance in (('wall_time', 's', time_tolerance),
+                                        ('peak_rss_mb', ' MB', memory_tolerance)):
+            if not before[metric]:
+                continue
+
+            change = after[metric] / before[metric] - 1
+            if change > tolerance:
+                regressions.append(f'{label}: {metric} increased by {change:.0%} '
+                                   f'({before[metric]:.2f}{unit} to {after[metric]:.2f}{unit})')
+
+    return regressions
+
+
+def main():
+    """
+    Compares benchmark results from the command line
+    """
+    parser = argparse.ArgumentParser(description='Compare benchmark results against a baseline')
+    parser.add_argument('baseline', help='baseline results JSON file')
+    parser.add_argument('current', help='current results JSON file')
+    parser.add_argument('--time-tolerance', type=float, default=0.1,
+                        help='allowed fractional increase in wall time')
+    parser.add_argument('--memory-tolerance', type=float, default=0.1,
+                        help='allowed fractional increase in peak memory')
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]
+        after = current[key]
+        print(f"{key[0]:<30} {key[1]:>8} {before['wall_time']:10.2f}s -> {after['wall_time']:10.2f}s "
+              f"{before['peak_rss_mb']:10.1f} MB -> {after['peak_rss_mb']:10.1f} MB")
+
+    regressions = compare(baseline, current, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s):')
+        for regression in regressions:
+            print('  ' + regression)
+        sys.exit(1)
+
+    print('\nNo regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Seeded generators for synthetic road networks.
+
+Each generator returns a list of roads as tuples of (points, name, type), where points
+is a list of (x, y) tuples. The same segment count and seed always give the same network.
+Generators aim for approximately, but never more than, the requested number of segments.
+"""
+
+import math
+import random
+from typing import List, Tuple
+
+from qgis.core import (QgsFeature,
+                       QgsField,
+                       QgsFields,
+                       QgsGeometry,
+                       QgsPointXY,
+                       QgsVectorLayer)
+from qgis.PyQt.QtCore import QVariant
+
+Road = Tuple[List[Tuple[float, float]], str, str]
+
+# distance between adjacent intersections
+SPACING = 100.0
+
+
+def create_layer(roads: List[Road], name: str = 'roads') -> QgsVectorLayer:
+    """
+    Creates a memory layer containing a list of generated roads, with 'name' and 'type' fields
+    """
+    fields = QgsFields()
+    fields.append(QgsField('name', QVariant.String))
+    fields.append(QgsField('type', QVariant.String))
+
+    layer = QgsVectorLayer('LineString?crs=EPSG:3857', name, 'memory')
+    layer.dataProvider().addAttributes(fields)
+    layer.updateFields()
+
+    features = []
+    for points, road_name, road_type in roads:
+        feature = QgsFeature(fields)
+        feature.setAttributes([road_name, road_type])
+        feature.setGeometry(QgsGeometry.fromPolylineXY([QgsPointXY(x, y) for x, y in points]))
+        features.append(feature)
+
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def random_segments(segment_count: int, seed: int = 0) -> List[Road]:
+    """
+    Randomly placed short line segments, at a constant density
+    """
+    rng = random.Random(seed)
+    extent = math.sqrt(segment_count) * 10
+
+    roads = []
+    for _ in range(segment_count):
+        x = rng.uniform(0, extent)
+        y = rng.uniform(0, extent)
+        angle = rng.uniform(0, 2 * math.pi)
+        roads.append(([(x, y), (x + 10 * math.cos(angle), y + 10 * math.sin(angle))], '', 'segment'))
+    return roads
+
+
+def grid_city(segment_count: int, seed: int = 0) -> List[Road]:
+    """
+    A jittered street grid. Each street is split into a separate segment between every
+    intersection, and all segments along a street share the street's name.
+    """
+    rng = random.Random(seed)
+    size = max(2, int(math.sqrt(segment_count / 2)) + 1)
+
+    nodes = [[(i * SPACING + rng.uniform(-10, 10), j * SPACING + rng.uniform(-10, 10))
+              for j in range(size)] for i in range(size)]
+
+    roads = []
+    for i in range(size):
+        for j in range(size - 1):
+            roads.append(([nodes[i][j], nodes[i][j + 1]], f'Avenue {i}', 'street'))
+            roads.append(([nodes[j][i], nodes[j + 1][i]], f'Street {i}', 'street'))
+
+    return roads[:segment_count]
+
+
+def _arc(center: Tuple[float, float], radius: float, start: float, end: float) -> List[Tuple[float, float]]:
+    """
+    Returns the points along a counter-clockwise circular arc between two angles (in radians)
+    """
+    if end <= start:
+        end += 2 * math.pi
+    steps = max(2, int(math.ceil((end - start) / (math.pi / 8))))
+    return [(center[0] + radius * math.cos(start + (end - start) * k / steps),
+             center[1] + radius * math.sin(start + (end - start) * k / steps)) for k in range(steps + 1)]
+
+
+def radial_network(segment_count: int, seed: int = 0) -> List[Road]:  # pylint: disable=too-many-locals
+    """
+    Concentric ring roads crossed by radial spokes, with a roundabout at every intersection.
+
+    Roundabouts are split into a separate part between each connecting road, and all roundabout
+    parts have a type of 'roundabout'.
+    """
+    rng = random.Random(seed)
+    radius = 10.0
+
+    # each intersection has two roads (one ring, one spoke) and up to four roundabout parts
+    intersections = max(8, segment_count // 6)
+    spokes = max(8, int(math.sqrt(intersections * 2 * math.pi)))
+    rings = max(1, intersections // spokes)
+
+    def node(ring: int, spoke: int) -> Tuple[float, float]:
+        angle = 2 * math.pi * spoke / spokes
+        distance = (ring + 1) * SPACING * spokes / (2 * math.pi)
+        return distance * math.cos(angle), distance * math.sin(angle)
+
+    centers = {(r, s): node(r, s) for r in range(rings) for s in range(spokes)}
+    # angles at which roads attach to each roundabout
+    attachments = {key: [] for key in centers}
+
+    def connect(a: Tuple[int, int], b: Tuple[int, int], road_name: str) -> Road:
+        (ax, ay), (bx, by) = centers[a], centers[b]
+        angle = math.atan2(by - ay, bx - ax)
+        attachments[a].append(angle)
+        attachments[b].append(angle + math.pi)
+        start = (ax + radius * math.cos(angle), ay + radius * math.sin(angle))
+        end = (bx - radius * math.cos(angle), by - radius * math.sin(angle))
+        middle = ((start[0] + end[0]) / 2 + rng.uniform(-5, 5), (start[1] + end[1]) / 2 + rng.uniform(-5, 5))
+        return [start, middle, end], road_name, 'road'
+
+    roads = []
+    for r in range(rings):
+        for s in range(spokes):
+            roads.append(connect((r, s), (r, (s + 1) % spokes), f'Ring {r}'))
+            if r + 1 < rings:
+                roads.append(connect((r, s), (r + 1, s), f'Spoke {s}'))
+
+    for key, center in centers.items():
+        angles = sorted(a % (2 * math.pi) for a in attachments[key])
+        for k, angle in enumerate(angles):
+            next_angle = angles[(k + 1) % len(angles)]
+            roads.append((_arc(center, radius, angle, next_angle), '', 'roundabout'))
+
+    rng.shuffle(roads)
+    return roads[:segment_count]
+
+
+def culdesac_suburb(segment_count: int, seed: int = 0) -> List[Road]:
+    """
+    A grid of collector roads with short cul-de-sacs branching off between intersections.
+
+    Most cul-de-sacs are shorter than 40 map units, and some end in a fork of two shorter stubs,
+    so that removing the stubs turns the branch into a new cul-de-sac.
+    """
+    rng = random.Random(seed)
+    branches = 3
+
+    # each collector segment is split into branches + 1 pieces, each with a cul-de-sac
+    # of one or three parts
+    size = max(2, int(math.sqrt(segment_count / (2 * (branches + 1) * 2.5))) + 1)
+
+    roads = []
+
+    def add_collector(start: Tuple[float, float], end: Tuple[float, float], road_name: str, side: float):  # pylint: disable=too-many-locals
+        dx = (end[0] - start[0]) / (branches + 1)
+        dy = (end[1] - start[1]) / (branches + 1)
+        length = math.sqrt(dx * dx + dy * dy)
+        # unit vector perpendicular to the collector
+        px, py = -dy / length * side, dx / length * side
+
+        previous = start
+        for k in range(1, branches + 2):
+            current = (start[0] + dx * k, start[1] + dy * k) if k <= branches else end
+            roads.append(([previous, current], road_name, 'collector'))
+            if k <= branches:
+                branch_length = rng.uniform(15, 50)
+                tip = (current[0] + px * branch_length, current[1] + py * branch_length)
+                roads.append(([current, tip], f'{road_name} Close {k}', 'culdesac'))
+                if rng.random() < 0.5:
+                    for turn in (-1, 1):
+                        stub_length = rng.uniform(5, 15)
+                        roads.append(([tip, (tip[0] + (px + turn * py) * stub_length,
+                                             tip[1] + (py - turn * px) * stub_length)],
+                                      f'{road_name} Close {k}', 'culdesac'))
+            previous = current
+
+    for i in range(size):
+        for j in range(size - 1):
+            add_collector((i * SPACING * 2, j * SPACING * 2), (i * SPACING * 2, (j + 1) * SPACING * 2),
+                          f'Drive {i}', 1 if (i + j) % 2 else -1)
+            add_collector((j * SPACING * 2, i * SPACING * 2), ((j + 1) * SPACING * 2, i * SPACING * 2),
+                          f'Way {i}', 1 if (i + j) % 2 else -1)
+
+    return roads[:segment_count]
+
+
+def dual_carriageways(segment_count: int, seed: int = 0) -> List[Road]:  # pylint: disable=too-many-locals
+    """
+    Parallel dual carriageways joined by single carriageway side streets.
+
+    Each carriageway is split into a separate segment at every junction, and the two
+    carriageways of a road share a name. Some junctions also have a short crossover
+    between the carriageways which shares the road's name.
+    """
+    rng = random.Random(seed)
+    separation = 10.0
+
+    # each junction has two carriageway segments, a side street and sometimes a crossover
+    junctions = max(4, int(segment_count / 3.25))
+    rows = max(1, int(math.sqrt(junctions) / 2))
+    columns = max(2, junctions // rows)
+
+    # the junction points along each carriageway, for each row
+    carriageways = [[[(column * SPACING, row * SPACING * 2 + offset + rng.uniform(-1, 1))
+                      for column in range(columns + 1)]
+                     for offset in (-separation / 2, separation / 2)]
+                    for row in range(rows)]
+
+    roads = []
+    for row, (lower, upper) in enumerate(carriageways):
+        road_name = f'Motorway {row}'
+        for points in (lower, upper):
+            for start, end in zip(points[:-1], points[1:]):
+                middle = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2 + rng.uniform(-1, 1))
+                roads.append(([start, middle, end], road_name, 'carriageway'))
+
+        for column in range(1, columns):
+            if row + 1 < rows:
+                start = upper[column]
+                end = carriageways[row + 1][0][column]
+                middle = ((start[0] + end[0]) / 2 + rng.uniform(-10, 10), (start[1] + end[1]) / 2)
+                roads.append(([start, middle, end], f'Street {column}', 'street'))
+            if rng.random() < 0.25:
+                roads.append(([lower[column], upper[column]], road_name, 'crossover'))
+
+    return roads[:segment_count]
+
+
+GENERATORS = {
+    'random_segments': random_segments,
+    'grid_city': grid_city,
+    'radial_network': radial_network,
+    'culdesac_suburb': culdesac_suburb,
+    'dual_carriageways': dual_carriageways,
+}
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Compares building a spatial index by adding features one at a time with
+bulk loading the index from a feature iterator, for both build and query time.
+
+    python3 -m benchmarks.spatial_index --segments 1000000
+"""
+
+import argparse
+import random
+import time
+
+from qgis.core import (QgsFeatureRequest,
+                       QgsRectangle,
+                       QgsSpatialIndex,
+                       QgsVectorLayer)
+
+from benchmarks.generators import create_layer, random_segments
+from benchmarks.utils import qgis_application
+
+
+def query_rectangles(layer: QgsVectorLayer, query_count: int, seed: int = 0):
+    """
+    Returns a list of random query rectangles covering the layer's extent
+    """
+    rng = random.Random(seed)
+    extent = layer.extent()
+    rectangles = []
+    for _ in range(query_count):
+        x = rng.uniform(extent.xMinimum(), extent.xMaximum())
+        y = rng.uniform(extent.yMinimum(), extent.yMaximum())
+        rectangles.append(QgsRectangle(x, y, x + 20, y + 20))
+    return rectangles
+
+
+def time_queries(index: QgsSpatialIndex, rectangles) -> float:
+    """
+    Returns the time taken to run all queries against an index, in seconds
+    """
+    start = time.perf_counter()
+    for rect in rectangles:
+        index.intersects(rect)
+    return time.perf_counter() - start
+
+
+def run(layer: QgsVectorLayer, query_count: int = 10000, seed: int = 0) -> dict:
+    """
+    Benchmarks incremental and bulk loaded spatial indexes for a layer
+    """
+    rectangles = query_rectangles(layer, query_count, seed)
+    results = {}
+
+    start = time.perf_counter()
+    index = QgsSpatialIndex()
+    for feature in layer.getFeatures(QgsFeatureRequest().setNoAttributes()):
+        index.addFeature(feature)
+    results['incremental_build'] = time.perf_counter() - start
+    results['incremental_query'] = time_queries(index, rectangles)
+    del index
+
+    start = time.perf_counter()
+    index = QgsSpatialIndex(layer.getFeatures(QgsFeatureRequest().setNoAttributes()))
+    results['bulk_build'] = time.perf_counter() - start
+    results['bulk_query'] = time_queries(index, rectangles)
+
+    return results
+
+
+def main():
+    """
+    Runs the benchmark from the command line
+    """
+    parser = argparse.ArgumentParser(description='Benchmark spatial index construction')
+    parser.add_argument('--segments', type=int, default=1000000, help='number of line segments')
+    parser.add_argument('--queries', type=int, default=10000, help='number of rectangle queries')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+
+    with qgis_application():
+        layer = create_layer(random_segments(args.segments, args.seed), 'segments')
+        results = run(layer, args.queries, args.seed)
+
+        print(f'{args.segments} segments, {args.queries} queries')
+        for method in ('incremental', 'bulk'):
+            print(f"{method:<12} build {results[method + '_build']:8.2f}s   query {results[method + '_query']:8.2f}s")
+
+
+if __name__ == '__main__':
+    main()
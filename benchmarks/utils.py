@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Shared helpers for benchmarks.
+"""
+
+import resource
+import sys
+from contextlib import contextmanager
+
+from qgis.core import QgsApplication
+
+
+@contextmanager
+def qgis_application():
+    """
+    Context manager which initializes a non-GUI QGIS application for the duration of a benchmark
+    """
+    app = QgsApplication([], False)
+    app.initQgis()
+    try:
+        yield app
+    finally:
+        app.exitQgis()
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the current process, in megabytes
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+from qgis.core import (QgsFeatureSource,
+                       QgsGeometry,
+                       QgsProcessingException)
+
+from cartography_tools.core.road_network import RoadNetwork
+
+
+class TrackedSet(set):
+    """
+    A set of road IDs which records the values added and removed since it was last saved
+    to a checkpoint, so that only the changes need to be saved.
+    """
+
+    def __init__(self, values: Iterable[int] = ()):
+        super().__init__(values)
+        # values changed since the last save, mapped to True if added or False if removed
+        self.changes = {}
+
+    def add(self, value: int):  # pylint: disable=missing-function-docstring
+        super().add(value)
+        self.changes[value] = True
+
+    def discard(self, value: int):  # pylint: disable=missing-function-docstring
+        super().discard(value)
+        self.changes[value] = False
+
+
+class Checkpoint:
+    """
+    Persists the progress of a long running road network algorithm to a SQLite database,
+    so that an interrupted run can be resumed.
+
+    A checkpoint stores the current position in the algorithm's main loop, a JSON serializable
+    dictionary of algorithm state, and the geometry of every road which has been modified or removed
+    since the network was loaded. Roads are saved incrementally, using the network's change tracking.
+    Large sets of road IDs can also be saved incrementally, as named TrackedSets.
+
+    Each checkpoint is tagged with a fingerprint of the input's location and content and the parameters,
+    and a checkpoint with a different fingerprint is discarded rather than resumed.
+    """
+
+    # minimum number of seconds between saves
+    INTERVAL = 60
+
+    def __init__(self, directory: str, name: str, fingerprint: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{name}.sqlite')
+        self.fingerprint = fingerprint
+        self.position = None
+        self.state = {}
+        self._last_save = time.monotonic()
+
+        self._connection = sqlite3.connect(self.path)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS roads (id INTEGER PRIMARY KEY, geometry BLOB)')
+            self._connection.execute('CREATE TABLE IF NOT EXISTS sets '
+                                     '(name TEXT, value INTEGER, PRIMARY KEY (name, value))')
+
+    @staticmethod
+    def create_fingerprint(source: QgsFeatureSource, uri: str, network: RoadNetwork, **parameters) -> str:
+        """
+        Creates a fingerprint for an algorithm run from the source, its URI, the freshly loaded
+        network and the values of the parameters which affect the result.
+
+        The fingerprint includes a hash of the ID, attributes and geometry of every feature in
+        the network, so that any edit to the input invalidates the checkpoint.
+        """
+        content = hashlib.sha1()
+        for road in itertools.chain(network.roads.values(), network.null_roads.values()):
+            content.update(repr((road.id(), road.attributes())).encode())
+            content.update(bytes(road.geometry().asWkb()))
+
+        return json.dumps({
+            'uri': uri,
+            'features': source.featureCount(),
+            'extent': source.sourceExtent().toString(),
+            'fields': source.fields().names(),
+            'content': content.hexdigest(),
+            'parameters': {key: str(value) for key, value in parameters.items()}
+        }, sort_keys=True)
+
+    def _meta(self, key: str) -> Optional[str]:
+        """
+        Returns a stored metadata value, or None if it is not set
+        """
+        row = self._connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def load(self) -> bool:
+        """
+        Loads the saved position and state, returning True if there is a checkpoint to resume from.
+
+        Checkpoints which do not match the fingerprint are cleared.
+        """
+        position = self._meta('position')
+        if position is None:
+            return False
+
+        if self._meta('fingerprint') != self.fingerprint:
+            self.clear()
+            return False
+
+        self.position = int(position)
+        self.state = json.loads(self._meta('state'))
+        return True
+
+    def restore_network(self, network: RoadNetwork):
+        """
+        Applies all saved road modifications and removals to a freshly loaded road network
+        """
+        for road_id, wkb in self._connection.execute('SELECT id, geometry FROM roads ORDER BY id'):
+            if road_id not in network.roads:
+                raise QgsProcessingException('Checkpoint does not match the input roads')
+
+            if wkb is None:
+                network.remove_road(road_id)
+            else:
+                geometry = QgsGeometry()
+                geometry.fromWkb(wkb)
+                network.set_road_geometry(road_id, geometry)
+
+    def load_set(self, name: str) -> TrackedSet:
+        """
+        Returns the saved set with matching name, which is empty if the set has not been saved
+        """
+        return TrackedSet(value for value, in self._connection.execute('SELECT value FROM sets WHERE name = ?',
+                                                                       (name,)))
+
+    def is_due(self) -> bool:
+        """
+        Returns True if enough time has passed since the last save that the checkpoint should be saved again
+        """
+        return time.monotonic() - self._last_save >= self.INTERVAL
+
+    def save(self, network: RoadNetwork, position: int, state: dict, sets: Optional[Dict[str, TrackedSet]] = None):
+        """
+        Saves the position and state, along with all roads and values in sets which have changed since the last save.
+
+        Each save is written in a single transaction, so an interrupted save leaves the previous
+        checkpoint intact.
+        """
+        changed = [(road_id, bytes(network.roads[road_id].geometry().asWkb()) if road_id in network.roads else None)
+                   for road_id in network.changed]
+        with self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO roads (id, geometry) VALUES (?, ?)', changed)
+            for name, values in (sets or {}).items():
+                self._connection.executemany('INSERT OR IGNORE INTO sets (name, value) VALUES (?, ?)',
+                                             [(name, value) for value, added in values.changes.items() if added])
+                self._connection.executemany('DELETE FROM sets WHERE name = ? AND value = ?',
+                                             [(name, value) for value, added in values.changes.items() if not added])
+            self._connection.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                         [('fingerprint', self.fingerprint),
+                                          ('position', str(position)),
+                                          ('state', json.dumps(state))])
+        network.changed.clear()
+        for values in (sets or {}).values():
+            values.changes.clear()
+        self._last_save = time.monotonic()
+
+    def clear(self):
+        """
+        Removes all saved progress
+        """
+        with self._connection:
+            self._connection.execute('DELETE FROM meta')
+            self._connection.execute('DELETE FROM roads')
+            self._connection.execute('DELETE FROM sets')
+        self.position = None
+        self.state = {}
+
+    def close(self):
+        """
+        Closes the checkpoint database, keeping any saved progress. Closing a closed checkpoint has no effect.
+        """
+        self._connection.close()
+
+    def remove(self):
+        """
+        Closes and deletes the checkpoint database, e.g. after a run has completed
+        """
+        self.close()
+        os.remove(self.path)
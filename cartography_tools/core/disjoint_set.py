@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from typing import List
+
+
+class DisjointSet:
+    """
+    A union-find structure over the integers 0..size-1, with path compression
+    and union by size
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        """
+        Returns the representative item of the set containing item
+        """
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # path compression
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+
+        return root
+
+    def union(self, item1: int, item2: int) -> int:
+        """
+        Merges the sets containing item1 and item2, returning the representative
+        item of the merged set
+        """
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return root1
+
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+        return root1
+
+    def groups(self) -> List[List[int]]:
+        """
+        Returns a list of all sets, each as a list of items in ascending order.
+
+        Sets are ordered by their smallest item.
+        """
+        groups = {}
+        for item in range(len(self.parent)):
+            groups.setdefault(self.find(item), []).append(item)
+        return list(groups.values())
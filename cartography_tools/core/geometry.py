@@ -11,15 +11,18 @@
 ***************************************************************************
 """
 
+import bisect
 import math
+import sys
+from array import array
 from typing import List, Tuple, Optional
 
 from qgis.core import (QgsLineString,
-                       QgsVertexId,
                        QgsPoint,
                        QgsPointXY,
-                       QgsGeometry)
+                       QgsVertexId)
 
+from cartography_tools.core.segment_index import SegmentIndex
 from cartography_tools.core.utils import Utils
 
 
@@ -28,35 +31,96 @@ class GeometryUtils:
     Utilities for geometry handling and manipulation
     """
 
+    # lines with fewer vertices in total than this are averaged with QgsLineString.closestSegment(),
+    # which is faster than building segment indexes until the lines get long
+    AVERAGE_INDEX_MIN_VERTICES = 500
+
     @staticmethod
-    def generate_rotated_points_along_path(points: List[QgsPointXY],
-                                           point_count: Optional[int] = None,
-                                           point_distance: Optional[float] = None,
-                                           orientation: float = 0, include_endpoints: bool = True) -> List[
-        Tuple[QgsPointXY, float]]:
+    def _average_angle(angle1: float, angle2: float) -> float:
         """
-        Generates a list of rotated points along a path defined by a list of QgsPointXY objects
+        Returns the average of two azimuths (in radians), taking the shortest way around the circle
+        """
+        clockwise_diff = (angle2 - angle1) % (2 * math.pi)
+        counter_clockwise_diff = 2 * math.pi - clockwise_diff
+        if clockwise_diff <= counter_clockwise_diff:
+            return (angle1 + clockwise_diff / 2.0) % (2 * math.pi)
+        return (angle1 - counter_clockwise_diff / 2.0) % (2 * math.pi)
+
+    @staticmethod
+    def generate_rotated_point_arrays_along_path(points: List[QgsPointXY],
+                                                 point_count: Optional[int] = None,
+                                                 point_distance: Optional[float] = None,
+                                                 orientation: float = 0,
+                                                 include_endpoints: bool = True) -> Tuple[array, array, array]:
         """
+        Generates rotated points along a path defined by a list of QgsPointXY objects, returned
+        as arrays of the point x coordinates, y coordinates and rotations.
 
+        The path is only walked once, so this is suitable for placing large numbers of points.
+        """
+        vertex_x = []
+        vertex_y = []
+        cumulative_length = []
+        segment_angles = []
         # trim duplicate points
-        points = Utils.unique_ordered_list(points)
+        for p in Utils.unique_ordered_list(points):
+            GeometryUtils.append_path_vertex(vertex_x, vertex_y, cumulative_length, segment_angles, p.x(), p.y())
 
-        if len(points) < 2:
-            return []
+        return GeometryUtils.generate_rotated_point_arrays_along_vertices(vertex_x, vertex_y,
+                                                                          cumulative_length, segment_angles,
+                                                                          point_count=point_count,
+                                                                          point_distance=point_distance,
+                                                                          orientation=orientation,
+                                                                          include_endpoints=include_endpoints)
 
-        if point_distance is not None and not point_distance:
-            return []
+    @staticmethod
+    def append_path_vertex(vertex_x: List[float], vertex_y: List[float],
+                           cumulative_length: List[float], segment_angles: List[float],
+                           x: float, y: float):
+        """
+        Appends a vertex to a path, stored as lists of the vertex x and y coordinates, the
+        cumulative length at each vertex and the azimuth (in radians) of each segment.
+        """
+        if vertex_x:
+            dx = x - vertex_x[-1]
+            dy = y - vertex_y[-1]
+            cumulative_length.append(cumulative_length[-1] + math.sqrt(dx * dx + dy * dy))
+            segment_angles.append((math.pi / 2 - math.atan2(dy, dx)) % (2 * math.pi))
+        else:
+            cumulative_length.append(0.0)
 
-        # calculate total length
-        total_length = 0
-        prev_point = None
-        for p in points:
-            if prev_point is not None:
-                total_length += prev_point.distance(p)
-            prev_point = p
+        vertex_x.append(x)
+        vertex_y.append(y)
 
+    @staticmethod
+    def generate_rotated_point_arrays_along_vertices(vertex_x: List[float],  # pylint: disable=too-many-locals,too-many-branches
+                                                     vertex_y: List[float],
+                                                     cumulative_length: List[float],
+                                                     segment_angles: List[float],
+                                                     point_count: Optional[int] = None,
+                                                     point_distance: Optional[float] = None,
+                                                     orientation: float = 0,
+                                                     include_endpoints: bool = True) -> Tuple[array, array, array]:
+        """
+        Generates rotated points along a path built with append_path_vertex(), returned
+        as arrays of the point x coordinates, y coordinates and rotations.
+
+        Only the segments containing the generated points are visited, so callers can
+        cheaply regenerate points after appending vertices to a long path.
+        """
+        xs = array('d')
+        ys = array('d')
+        angles = array('d')
+
+        if len(vertex_x) < 2:
+            return xs, ys, angles
+
+        if point_distance is not None and not point_distance:
+            return xs, ys, angles
+
+        total_length = cumulative_length[-1]
         if total_length == 0:
-            return []
+            return xs, ys, angles
 
         distance = 0
 
@@ -64,7 +128,7 @@ class GeometryUtils:
             point_count = math.floor(total_length / point_distance) + (1 if include_endpoints else 0)
 
         if point_count == 0:
-            return []
+            return xs, ys, angles
 
         if point_count == 1:
             marker_spacing = total_length
@@ -76,26 +140,110 @@ class GeometryUtils:
                 marker_spacing = total_length / point_count
                 distance = marker_spacing / 2
 
-        line_geom = QgsGeometry.fromPolylineXY(points)
-
-        return_points = []
+        epsilon = 4 * sys.float_info.epsilon
         for i in range(point_count):
             if point_count > 1 and i == point_count - 1 and include_endpoints:
                 distance = total_length
 
-            point = line_geom.interpolate(distance).asPoint()
-            angle = line_geom.interpolateAngle(distance) * 180 / math.pi - orientation
+            # the segment containing distance runs from vertex segment - 1 to vertex segment
+            segment = min(max(bisect.bisect_left(cumulative_length, distance), 1), len(cumulative_length) - 1)
+            if abs(distance - cumulative_length[segment - 1]) <= epsilon:
+                vertex = segment - 1
+            elif abs(distance - cumulative_length[segment]) <= epsilon:
+                vertex = segment
+            else:
+                vertex = None
+
+            if vertex is not None:
+                x = vertex_x[vertex]
+                y = vertex_y[vertex]
+                # points placed exactly on a vertex use the average angle of the adjoining segments
+                if vertex == 0:
+                    angle = segment_angles[0]
+                elif vertex == len(segment_angles):
+                    angle = segment_angles[-1]
+                else:
+                    angle = GeometryUtils._average_angle(segment_angles[vertex - 1], segment_angles[vertex])
+            else:
+                fraction = (distance - cumulative_length[segment - 1]) / (
+                    cumulative_length[segment] - cumulative_length[segment - 1])
+                x = vertex_x[segment - 1] + (vertex_x[segment] - vertex_x[segment - 1]) * fraction
+                y = vertex_y[segment - 1] + (vertex_y[segment] - vertex_y[segment - 1]) * fraction
+                angle = segment_angles[segment - 1]
 
-            return_points.append((point, angle))
+            xs.append(x)
+            ys.append(y)
+            angles.append(angle * 180 / math.pi - orientation)
 
             distance += marker_spacing
 
-        return return_points
+        return xs, ys, angles
+
+    @staticmethod
+    def generate_rotated_points_along_path(points: List[QgsPointXY],
+                                           point_count: Optional[int] = None,
+                                           point_distance: Optional[float] = None,
+                                           orientation: float = 0, include_endpoints: bool = True) -> List[
+        Tuple[QgsPointXY, float]]:
+        """
+        Generates a list of rotated points along a path defined by a list of QgsPointXY objects
+        """
+        xs, ys, angles = GeometryUtils.generate_rotated_point_arrays_along_path(points,
+                                                                                point_count=point_count,
+                                                                                point_distance=point_distance,
+                                                                                orientation=orientation,
+                                                                                include_endpoints=include_endpoints)
+        return [(QgsPointXY(x, y), angle) for x, y, angle in zip(xs, ys, angles)]
+
+    @staticmethod
+    def _cumulative_lengths(xs: List[float], ys: List[float]) -> List[float]:
+        """
+        Returns the cumulative length (chainage) at each vertex of a line
+        """
+        cumulative_length = [0.0]
+        for i in range(1, len(xs)):
+            dx = xs[i] - xs[i - 1]
+            dy = ys[i] - ys[i - 1]
+            cumulative_length.append(cumulative_length[-1] + math.sqrt(dx * dx + dy * dy))
+        return cumulative_length
+
+    @staticmethod
+    def _point_at_chainage(xs: List[float], ys: List[float], cumulative_length: List[float],
+                           chainage: float) -> Tuple[float, float]:
+        """
+        Returns the x and y coordinate of the point at the specified chainage along a line
+        """
+        segment = min(max(bisect.bisect_left(cumulative_length, chainage), 1), len(cumulative_length) - 1)
+        segment_length = cumulative_length[segment] - cumulative_length[segment - 1]
+        if segment_length <= 0:
+            return xs[segment], ys[segment]
+
+        fraction = min(max((chainage - cumulative_length[segment - 1]) / segment_length, 0), 1)
+        return (xs[segment - 1] + (xs[segment] - xs[segment - 1]) * fraction,
+                ys[segment - 1] + (ys[segment] - ys[segment - 1]) * fraction)
 
     @staticmethod
     def average_linestrings(line1: QgsLineString, line2: QgsLineString, weight: float = 1) -> QgsLineString:
         """
-        Averages two linestring geometries
+        Averages two linestring geometries.
+
+        The vertices of line1, plus the closest points on line1 to each vertex of line2, are
+        taken in order along line1. Each is averaged with its closest point on line2, weighted
+        towards line1 by weight.
+
+        Closest points on long lines are found using spatial indexes of the segments of each line,
+        so that averaging is O((n+m) log(n+m)) for lines with n and m vertices.
+        """
+        if line1.numPoints() + line2.numPoints() < GeometryUtils.AVERAGE_INDEX_MIN_VERTICES:
+            return GeometryUtils._average_linestrings_by_closest_segment(line1, line2, weight)
+
+        return GeometryUtils._average_linestrings_by_segment_index(line1, line2, weight)
+
+    @staticmethod
+    def _average_linestrings_by_closest_segment(line1: QgsLineString, line2: QgsLineString,
+                                                weight: float) -> QgsLineString:
+        """
+        Averages two linestring geometries, using QgsLineString.closestSegment() to find closest points
         """
         g1 = line1.clone()
 
@@ -109,7 +257,7 @@ class GeometryUtils:
         out = []
         for n in range(g1.numPoints()):
             vertex = g1.pointN(n)
-            _, pt, after, _ = line2.closestSegment(vertex)
+            _, pt, _, _ = line2.closestSegment(vertex)
 
             # average pts
             x = (vertex.x() * weight + pt.x()) / (weight + 1)
@@ -117,3 +265,84 @@ class GeometryUtils:
             out.append(QgsPoint(x, y))
 
         return QgsLineString(out)
+
+    @staticmethod
+    def _average_linestrings_by_segment_index(line1: QgsLineString, line2: QgsLineString,
+                                              weight: float) -> QgsLineString:
+        """
+        Averages two linestring geometries, using segment indexes to find closest points.
+
+        The vertices of line1 and the projected vertices of line2 are swept in order of their
+        chainage along line1.
+        """
+        index1 = SegmentIndex(line1)
+        index2 = SegmentIndex(line2)
+
+        # vertices along line1, as tuples of (chainage, x, y)
+        vertices = list(zip(index1.cumulative_length, index1.xs, index1.ys))
+        for x, y in zip(index2.xs, index2.ys):
+            closest_x, closest_y, chainage = index1.closest_point(x, y)
+            vertices.append((chainage, closest_x, closest_y))
+
+        vertices.sort(key=lambda vertex: vertex[0])
+
+        out_x = []
+        out_y = []
+        for _, x, y in vertices:
+            closest_x, closest_y, _ = index2.closest_point(x, y)
+
+            # average pts
+            out_x.append((x * weight + closest_x) / (weight + 1))
+            out_y.append((y * weight + closest_y) / (weight + 1))
+
+        return QgsLineString(out_x, out_y)
+
+    @staticmethod
+    def average_linestrings_by_chainage(lines: List[QgsLineString], resolution: float) -> QgsLineString:  # pylint: disable=too-many-locals
+        """
+        Averages any number of linestring geometries in a single pass.
+
+        Every line is sampled at the same proportions of its length, with the samples spaced
+        so that they are no more than resolution apart along the longest line, and the samples
+        are then averaged. Lines which run in the opposite direction to the first line are reversed.
+        """
+        tables = []
+        for line in lines:
+            xs = [p.x() for p in line.points()]
+            ys = [p.y() for p in line.points()]
+            if not xs:
+                continue
+
+            if tables:
+                first_xs, first_ys, _ = tables[0]
+                same_direction = math.hypot(xs[0] - first_xs[0], ys[0] - first_ys[0]) + \
+                    math.hypot(xs[-1] - first_xs[-1], ys[-1] - first_ys[-1])
+                opposite_direction = math.hypot(xs[0] - first_xs[-1], ys[0] - first_ys[-1]) + \
+                    math.hypot(xs[-1] - first_xs[0], ys[-1] - first_ys[0])
+                if opposite_direction < same_direction:
+                    xs.reverse()
+                    ys.reverse()
+
+            tables.append((xs, ys, GeometryUtils._cumulative_lengths(xs, ys)))
+
+        if not tables:
+            return QgsLineString()
+
+        max_length = max(cumulative_length[-1] for _, _, cumulative_length in tables)
+        sample_count = max(2, math.ceil(max_length / resolution) + 1) if resolution > 0 else 2
+
+        out_x = []
+        out_y = []
+        for sample in range(sample_count):
+            fraction = sample / (sample_count - 1)
+            sum_x = 0
+            sum_y = 0
+            for xs, ys, cumulative_length in tables:
+                x, y = GeometryUtils._point_at_chainage(xs, ys, cumulative_length, fraction * cumulative_length[-1])
+                sum_x += x
+                sum_y += y
+
+            out_x.append(sum_x / len(tables))
+            out_y.append(sum_y / len(tables))
+
+        return QgsLineString(out_x, out_y)
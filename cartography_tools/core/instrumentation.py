@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class PhaseStatistics:
+    """
+    Statistics recorded for a single phase of an algorithm
+    """
+
+    __slots__ = ('time', 'features', 'index_queries')
+
+    def __init__(self):
+        self.time = 0.0
+        self.features = 0
+        self.index_queries = 0
+
+
+class Instrumentation:
+    """
+    Records the wall time, feature counts and spatial index query counts for each phase
+    of an algorithm.
+
+    Phases can be entered any number of times, and statistics accumulate across all visits.
+    Phases can also be nested, in which case time and index queries are only counted for the
+    innermost phase.
+
+    Index queries made through any tracked road network are counted automatically, and other
+    queries can be added with add_index_queries().
+    """
+
+    LOAD = 'load'
+    DETECT = 'detect'
+    REWRITE = 'rewrite'
+    WRITE = 'write'
+
+    def __init__(self):
+        self.phases = {}
+        self._networks = []
+        self._stack = []
+        self._mark_time = 0.0
+        self._mark_queries = 0
+        self._extra_queries = 0
+
+    def track_network(self, network):
+        """
+        Adds a road network, whose index queries will be counted
+        """
+        self._networks.append(network)
+        # queries made before the network was tracked are not counted
+        self._extra_queries -= network.query_count
+
+    def add_index_queries(self, count: int):
+        """
+        Adds a number of index queries made outside of a tracked road network to the current phase
+        """
+        self._extra_queries += count
+
+    def _query_count(self) -> int:
+        """
+        Returns the total number of index queries made so far
+        """
+        return self._extra_queries + sum(network.query_count for network in self._networks)
+
+    def _update_current(self):
+        """
+        Adds the time and queries since the last phase change to the current phase
+        """
+        now = time.perf_counter()
+        queries = self._query_count()
+        if self._stack:
+            statistics = self._stack[-1]
+            statistics.time += now - self._mark_time
+            statistics.index_queries += queries - self._mark_queries
+        self._mark_time = now
+        self._mark_queries = queries
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager for a phase of an algorithm, which yields the phase's PhaseStatistics
+        so that feature counts can be added
+        """
+        statistics = self.phases.setdefault(name, PhaseStatistics())
+        self._update_current()
+        self._stack.append(statistics)
+        try:
+            yield statistics
+        finally:
+            self._update_current()
+            self._stack.pop()
+
+    def summary(self) -> List[str]:
+        """
+        Returns a summary of the statistics for each phase, as a list of lines
+        """
+        lines = []
+        for name, statistics in self.phases.items():
+            lines.append(f'{name}: {statistics.time:.3f}s, {statistics.features} features, '
+                         f'{statistics.index_queries} index queries')
+        lines.append(f'total: {sum(statistics.time for statistics in self.phases.values()):.3f}s')
+        return lines
+
+    def push_summary(self, feedback):
+        """
+        Pushes the summary of the statistics for each phase to a feedback object as debug information
+        """
+        for line in self.summary():
+            feedback.pushDebugInfo(line)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the statistics for each phase as a dictionary
+        """
+        return {name: {'time': statistics.time,
+                       'features': statistics.features,
+                       'index_queries': statistics.index_queries}
+                for name, statistics in self.phases.items()}
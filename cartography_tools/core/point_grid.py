@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+from typing import Any, List, Tuple
+
+from qgis.core import QgsPoint
+
+
+class PointGrid:
+    """
+    A hash of points snapped to a square grid, for finding all points within a tolerance
+    of a location in constant time.
+
+    The grid cell size is equal to the tolerance, so only the 3x3 block of cells around
+    a location needs to be checked. If the tolerance is 0 then points must match exactly.
+    """
+
+    def __init__(self, tolerance: float = 0):
+        self.tolerance = tolerance
+        self._cells = {}
+
+    def _cell(self, x: float, y: float) -> Tuple:
+        """
+        Returns the key of the grid cell containing the point at x, y
+        """
+        if not self.tolerance:
+            return x, y
+
+        return math.floor(x / self.tolerance), math.floor(y / self.tolerance)
+
+    def insert(self, point: QgsPoint, value: Any):
+        """
+        Adds a value to the grid at the specified point
+        """
+        self._cells.setdefault(self._cell(point.x(), point.y()), []).append((point.x(), point.y(), value))
+
+    def values_near(self, point: QgsPoint) -> List[Any]:
+        """
+        Returns all values within the tolerance of the specified point
+        """
+        x = point.x()
+        y = point.y()
+        if not self.tolerance:
+            return [value for _, _, value in self._cells.get((x, y), [])]
+
+        cell_x, cell_y = self._cell(x, y)
+        max_distance = self.tolerance * self.tolerance
+        matches = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other_x, other_y, value in self._cells.get((cell_x + dx, cell_y + dy), []):
+                    if (other_x - x) ** 2 + (other_y - y) ** 2 <= max_distance:
+                        matches.append(value)
+        return matches
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+from array import array
+from typing import List, Tuple
+
+from qgis.core import (QgsAbstractGeometry,
+                       QgsPoint,
+                       QgsWkbTypes)
+
+
+class RoadGraph:
+    """
+    A compact planar graph representing the topology of a road network.
+
+    Nodes are created by snapping line endpoints together (within an optional tolerance),
+    and each line becomes an edge between its start and end nodes. Node coordinates and
+    the edge to node table are stored in flat arrays, with an adjacency list of edges for
+    each node.
+
+    Edges are identified by the ID of the feature they represent.
+    """
+
+    def __init__(self, tolerance: float = 0):
+        """
+        Constructor for RoadGraph.
+
+        If tolerance is 0 then endpoints must match exactly to share a node, otherwise
+        endpoints within tolerance distance of an existing node are snapped to it.
+        """
+        self.tolerance = tolerance
+
+        self.node_x = array('d')
+        self.node_y = array('d')
+        self.adjacency = []
+
+        self.edge_ids = array('q')
+        self.edge_nodes = array('q')
+        self._edge_rows = {}
+        # rows of removed edges, reused by later edges
+        self._free_rows = []
+
+        self._cells = {}
+
+    def _cell(self, x: float, y: float) -> Tuple:
+        """
+        Returns the key of the snapping cell containing the point at x, y
+        """
+        if not self.tolerance:
+            return x, y
+
+        return math.floor(x / self.tolerance), math.floor(y / self.tolerance)
+
+    def _find_node(self, x: float, y: float) -> int:
+        """
+        Returns the node at x, y, or -1 if no node exists within the tolerance
+        """
+        if not self.tolerance:
+            nodes = self._cells.get((x, y))
+            return nodes[0] if nodes else -1
+
+        cell_x, cell_y = self._cell(x, y)
+        nearest = -1
+        nearest_distance = self.tolerance * self.tolerance
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for node in self._cells.get((cell_x + dx, cell_y + dy), []):
+                    distance = (self.node_x[node] - x) ** 2 + (self.node_y[node] - y) ** 2
+                    if distance <= nearest_distance:
+                        nearest = node
+                        nearest_distance = distance
+        return nearest
+
+    def _snap_node(self, x: float, y: float) -> int:
+        """
+        Returns the node at x, y, creating a new node if no node exists within the tolerance
+        """
+        node = self._find_node(x, y)
+        if node >= 0:
+            return node
+
+        node = len(self.node_x)
+        self.node_x.append(x)
+        self.node_y.append(y)
+        self.adjacency.append([])
+        self._cells.setdefault(self._cell(x, y), []).append(node)
+        return node
+
+    @staticmethod
+    def _endpoints(geometry: QgsAbstractGeometry) -> Tuple[QgsPoint, QgsPoint]:
+        """
+        Returns the start and end point of a line geometry. For multi-part geometries this
+        is the start of the first part and the end of the last part.
+        """
+        if QgsWkbTypes.isMultiType(geometry.wkbType()):
+            return geometry.geometryN(0).startPoint(), geometry.geometryN(geometry.numGeometries() - 1).endPoint()
+
+        return geometry.startPoint(), geometry.endPoint()
+
+    def add_edge(self, edge_id: int, geometry: QgsAbstractGeometry):
+        """
+        Adds a line geometry to the graph as an edge with the specified ID
+        """
+        start, end = self._endpoints(geometry)
+        start_node = self._snap_node(start.x(), start.y())
+        end_node = self._snap_node(end.x(), end.y())
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self.edge_ids[row] = edge_id
+            self.edge_nodes[row * 2] = start_node
+            self.edge_nodes[row * 2 + 1] = end_node
+        else:
+            row = len(self.edge_ids)
+            self.edge_ids.append(edge_id)
+            self.edge_nodes.append(start_node)
+            self.edge_nodes.append(end_node)
+        self._edge_rows[edge_id] = row
+
+        self.adjacency[start_node].append(row)
+        if end_node != start_node:
+            self.adjacency[end_node].append(row)
+
+    def remove_edge(self, edge_id: int):
+        """
+        Removes the edge with matching ID from the graph. Nodes are never removed,
+        but may be left with no incident edges. The edge's row is freed for reuse by
+        the next added edge.
+        """
+        row = self._edge_rows.pop(edge_id, None)
+        if row is None:
+            return
+
+        for node in set(self.edge_nodes[row * 2:row * 2 + 2]):
+            self.adjacency[node].remove(row)
+        self.edge_nodes[row * 2] = -1
+        self.edge_nodes[row * 2 + 1] = -1
+        self._free_rows.append(row)
+
+    def update_edge(self, edge_id: int, geometry: QgsAbstractGeometry):
+        """
+        Updates the edge with matching ID to reflect a new line geometry
+        """
+        self.remove_edge(edge_id)
+        self.add_edge(edge_id, geometry)
+
+    def has_edge(self, edge_id: int) -> bool:
+        """
+        Returns True if the graph contains an edge with matching ID
+        """
+        return edge_id in self._edge_rows
+
+    def edge_count(self) -> int:
+        """
+        Returns the number of edges in the graph
+        """
+        return len(self._edge_rows)
+
+    def node_count(self) -> int:
+        """
+        Returns the number of nodes in the graph, including nodes with no incident edges
+        """
+        return len(self.node_x)
+
+    def node_at(self, point: QgsPoint) -> int:
+        """
+        Returns the node at the specified point, or -1 if there is no node within the tolerance
+        """
+        return self._find_node(point.x(), point.y())
+
+    def edge_nodes_for(self, edge_id: int) -> Tuple[int, int]:
+        """
+        Returns the start and end node for the edge with matching ID
+        """
+        row = self._edge_rows[edge_id]
+        return self.edge_nodes[row * 2], self.edge_nodes[row * 2 + 1]
+
+    def node_edges(self, node: int) -> List[Tuple[int, bool]]:
+        """
+        Returns a list of all edges incident to a node, as tuples of the edge ID and True if the
+        edge starts at the node or False if it ends there.
+
+        Closed edges which start and end at the node are listed twice.
+        """
+        res = []
+        for row in self.adjacency[node]:
+            if self.edge_nodes[row * 2] == node:
+                res.append((self.edge_ids[row], True))
+            if self.edge_nodes[row * 2 + 1] == node:
+                res.append((self.edge_ids[row], False))
+        return res
+
+    def degree(self, node: int) -> int:
+        """
+        Returns the degree of a node. Closed edges count twice.
+        """
+        return len(self.node_edges(node))
+
+    def edges_at(self, point: QgsPoint) -> List[Tuple[int, bool]]:
+        """
+        Returns a list of all edges with an endpoint at the specified point (within the tolerance),
+        as tuples of the edge ID and True if the edge starts at the point or False if it ends there
+        """
+        node = self.node_at(point)
+        if node < 0:
+            return []
+        return self.node_edges(node)
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import itertools
+from typing import Iterable, List, Optional, Tuple
+
+from qgis.core import (QgsAbstractFeatureIterator,
+                       QgsFeature,
+                       QgsFeatureIterator,
+                       QgsFeatureRequest,
+                       QgsFeatureSink,
+                       QgsFeatureSource,
+                       QgsGeometry,
+                       QgsRectangle,
+                       QgsSpatialIndex,
+                       QgsWkbTypes)
+
+from cartography_tools.core.road_graph import RoadGraph
+from cartography_tools.core.road_record import RoadRecord
+
+
+class _RoadIterator(QgsAbstractFeatureIterator):
+    """
+    A feature iterator over roads which are already held in memory, used to bulk load
+    spatial indexes without reading the source again
+    """
+
+    def __init__(self, roads: Iterable[QgsFeature]):
+        super().__init__(QgsFeatureRequest())
+        self._roads = roads
+        self._iterator = iter(roads)
+
+    def fetchFeature(self, f: QgsFeature) -> bool:  # pylint: disable=missing-function-docstring
+        road = next(self._iterator, None)
+        if road is None:
+            return False
+
+        f.setId(road.id())
+        f.setGeometry(road.geometry())
+        f.setValid(True)
+        return True
+
+    def rewind(self) -> bool:  # pylint: disable=missing-function-docstring
+        self._iterator = iter(self._roads)
+        return True
+
+    def close(self) -> bool:  # pylint: disable=missing-function-docstring
+        return True
+
+
+class RoadNetwork:
+    """
+    An in-memory road network.
+
+    Holds road features together with a spatial index, road graph and a cached record
+    of each road's geometry properties, which are kept in sync as roads are added, modified
+    and removed. This allows a sequence of generalization steps to share a single copy of
+    the network.
+
+    Optionally, roads can be partitioned by a key formed from the attributes which
+    identify unique roads, with a separate spatial index for each key.
+
+    Features without a geometry are not part of the network, but are kept so that they
+    can be written to the output unchanged.
+    """
+
+    def __init__(self, tolerance: float = 0):
+        self.roads = {}
+        # features with a null or empty geometry, keyed by feature ID
+        self.null_roads = {}
+        self.records = {}
+        self.index = QgsSpatialIndex()
+        self.graph = RoadGraph(tolerance)
+        self._next_id = 1
+
+        self.key_fields = None
+        self.key_indexes = {}
+
+        # number of spatial index queries made through roads_in_rect() and roads_with_key()
+        self.query_count = 0
+
+        # IDs of roads added, modified or removed since change tracking was started
+        self.changed = None
+
+    @staticmethod
+    def from_source(source: QgsFeatureSource, tolerance: float, feedback) -> 'RoadNetwork':
+        """
+        Creates a road network from all features in a feature source
+        """
+        network = RoadNetwork(tolerance)
+
+        total = 80.0 / source.featureCount() if source.featureCount() else 0
+        for current, feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                return network
+
+            network.next_id_after(feature.id())
+            if not RoadNetwork.has_geometry(feature):
+                network.null_roads[feature.id()] = feature
+                continue
+
+            network.roads[feature.id()] = feature
+            network.records[feature.id()] = RoadRecord(feature)
+            network.graph.add_edge(feature.id(), feature.geometry().constGet())
+            feedback.setProgress(int(current * total))
+
+        # bulk loading the spatial index is much faster than adding features one at a time,
+        # and gives a better balanced tree. The roads are already in memory, so the index is
+        # loaded from them rather than from a second read of the source.
+        network.index = QgsSpatialIndex(QgsFeatureIterator(_RoadIterator(network.roads.values())), feedback)
+        feedback.setProgress(100)
+
+        return network
+
+    def track_changes(self):
+        """
+        Starts recording the IDs of all roads which are added, modified or removed in the changed set
+        """
+        self.changed = set()
+
+    @staticmethod
+    def has_geometry(feature: QgsFeature) -> bool:
+        """
+        Returns True if a feature has a non-empty geometry, and can be part of a road network
+        """
+        return feature.hasGeometry() and not feature.geometry().isEmpty()
+
+    def next_id(self) -> int:
+        """
+        Returns an unused road ID
+        """
+        return self._next_id
+
+    def next_id_after(self, road_id: int):
+        """
+        Ensures that IDs returned by next_id() are greater than road_id
+        """
+        self._next_id = max(self._next_id, road_id + 1)
+
+    def _index_road(self, road: QgsFeature):
+        """
+        Adds a road to the spatial indexes and graph
+        """
+        self.index.addFeature(road)
+        self.graph.add_edge(road.id(), road.geometry().constGet())
+        if self.key_fields:
+            key = self.records[road.id()].key
+            if key not in self.key_indexes:
+                self.key_indexes[key] = QgsSpatialIndex()
+            self.key_indexes[key].addFeature(road)
+
+    def _unindex_road(self, road: QgsFeature):
+        """
+        Removes a road from the spatial indexes and graph
+        """
+        self.index.deleteFeature(road)
+        self.graph.remove_edge(road.id())
+        if self.key_fields:
+            self.key_indexes[self.records[road.id()].key].deleteFeature(road)
+
+    def _road_key(self, road: QgsFeature) -> Tuple:
+        """
+        Calculates the key for a road
+        """
+        return tuple(road.attribute(i) for i in self.key_fields) if self.key_fields else ()
+
+    def add_road(self, road: QgsFeature):
+        """
+        Adds a road feature to the network. Features without a geometry are only kept for output.
+        """
+        self.next_id_after(road.id())
+        if not self.has_geometry(road):
+            self.null_roads[road.id()] = road
+            return
+
+        self.roads[road.id()] = road
+        self.records[road.id()] = RoadRecord(road, self._road_key(road) if self.key_fields is not None else None)
+        self._index_road(road)
+        if self.changed is not None:
+            self.changed.add(road.id())
+
+    def remove_road(self, road_id: int):
+        """
+        Removes the road with matching ID from the network
+        """
+        road = self.roads.pop(road_id)
+        self._unindex_road(road)
+        del self.records[road_id]
+        if self.changed is not None:
+            self.changed.add(road_id)
+
+    def set_road_geometry(self, road_id: int, geometry: QgsGeometry):
+        """
+        Changes the geometry of the road with matching ID
+        """
+        road = self.roads[road_id]
+        self._unindex_road(road)
+        road.setGeometry(geometry)
+        self.records[road_id] = RoadRecord(road, self.records[road_id].key)
+        self._index_road(road)
+        if self.changed is not None:
+            self.changed.add(road_id)
+
+    def set_key_fields(self, field_indices: List[int]):
+        """
+        Sets the indices of the attributes which identify unique roads.
+
+        The key for each road is calculated once, and a separate spatial index is built
+        for each distinct key.
+        """
+        if field_indices == self.key_fields:
+            return
+
+        self.key_fields = list(field_indices)
+        for road_id, road in self.roads.items():
+            self.records[road_id].key = self._road_key(road)
+        self.key_indexes = {}
+        if not self.key_fields:
+            return
+
+        for road_id, road in self.roads.items():
+            key = self.records[road_id].key
+            if key not in self.key_indexes:
+                self.key_indexes[key] = QgsSpatialIndex()
+            self.key_indexes[key].addFeature(road)
+
+    def road_key(self, road_id: int) -> Optional[Tuple]:
+        """
+        Returns the key for the road with matching ID, or None if key fields have not been set
+        """
+        return self.records[road_id].key
+
+    def roads_in_rect(self, rect: QgsRectangle) -> List[int]:
+        """
+        Returns the IDs of all roads whose bounding boxes intersect rect
+        """
+        self.query_count += 1
+        return self.index.intersects(rect)
+
+    def roads_with_key(self, key: Tuple, rect: QgsRectangle) -> List[int]:
+        """
+        Returns the IDs of all roads with a matching key whose bounding boxes intersect rect
+        """
+        self.query_count += 1
+        if not self.key_fields:
+            return self.index.intersects(rect)
+
+        index = self.key_indexes.get(key)
+        return index.intersects(rect) if index is not None else []
+
+    def explode_multipart(self):
+        """
+        Replaces all roads which are not single linestrings with a separate road for each part,
+        maintaining the original order of roads
+        """
+        roads = {}
+        for road_id, road in self.roads.items():
+            if road.geometry().wkbType() == QgsWkbTypes.Type.LineString:
+                roads[road_id] = road
+                continue
+
+            self._unindex_road(road)
+            key = self.records.pop(road_id).key
+            for part in road.geometry().parts():
+                part_road = QgsFeature(road)
+                part_road.setGeometry(QgsGeometry(part.clone()))
+                part_road.setId(self._next_id)
+                self._next_id += 1
+
+                roads[part_road.id()] = part_road
+                self.records[part_road.id()] = RoadRecord(part_road, key)
+                self._index_road(part_road)
+
+        self.roads = roads
+
+    def write_to_sink(self, sink: QgsFeatureSink, feedback):
+        """
+        Writes all roads in the network to a sink, followed by any features without a geometry
+        """
+        count = len(self.roads) + len(self.null_roads)
+        total = 100.0 / count if count else 0
+        for current, road in enumerate(itertools.chain(self.roads.values(), self.null_roads.values())):
+            if feedback.isCanceled():
+                break
+
+            sink.addFeature(road, QgsFeatureSink.Flag.FastInsert)
+            feedback.setProgress(int(current * total))
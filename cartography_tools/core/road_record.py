@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from typing import Optional, Tuple
+
+from qgis.core import QgsFeature
+
+
+class RoadRecord:
+    """
+    Cached geometry properties and identifying key for a road feature.
+
+    Records avoid repeatedly fetching, copying and measuring a feature's geometry
+    in tight loops. A record must be recreated whenever the feature's geometry changes.
+    """
+
+    __slots__ = ('geometry', 'line', 'length', 'bbox', 'start', 'end', 'key')
+
+    def __init__(self, feature: QgsFeature, key: Optional[Tuple] = None):
+        self.geometry = feature.geometry()
+
+        # the linestring for the road, or None for multi-part roads with more than one part
+        geometry = self.geometry.constGet()
+        if not self.geometry.isMultipart():
+            self.line = geometry
+        elif geometry.numGeometries() == 1:
+            self.line = geometry.geometryN(0)
+        else:
+            self.line = None
+
+        self.length = self.geometry.length()
+        self.bbox = self.geometry.boundingBox()
+        self.start = self.line.startPoint() if self.line is not None else None
+        self.end = self.line.endPoint() if self.line is not None else None
+        self.key = key
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+from typing import Tuple
+
+from qgis.core import (QgsLineString,
+                       QgsPointXY,
+                       QgsRectangle,
+                       QgsSpatialIndex)
+
+
+class SegmentIndex:
+    """
+    A spatial index of the segments of a linestring, for finding the closest point on the line
+    to a location in logarithmic time.
+
+    The closest segment is found by checking only the segments with a bounding box within the
+    distance to the segment with the nearest bounding box, and matches the segment which
+    QgsLineString.closestSegment() returns.
+    """
+
+    def __init__(self, line: QgsLineString):
+        self.xs = [p.x() for p in line.points()]
+        self.ys = [p.y() for p in line.points()]
+        self.cumulative_length = [0.0]
+        self._index = QgsSpatialIndex()
+        for i in range(1, len(self.xs)):
+            dx = self.xs[i] - self.xs[i - 1]
+            dy = self.ys[i] - self.ys[i - 1]
+            self.cumulative_length.append(self.cumulative_length[-1] + math.sqrt(dx * dx + dy * dy))
+            # segments are identified by the index of their first vertex
+            self._index.addFeature(i - 1, QgsRectangle(min(self.xs[i - 1], self.xs[i]),
+                                                       min(self.ys[i - 1], self.ys[i]),
+                                                       max(self.xs[i - 1], self.xs[i]),
+                                                       max(self.ys[i - 1], self.ys[i])))
+
+    def _closest_point_on_segment(self, segment: int, x: float, y: float) -> Tuple[float, float, float]:
+        """
+        Returns the squared distance from x, y to a segment, and the closest point on the segment
+        """
+        x1 = self.xs[segment]
+        y1 = self.ys[segment]
+        dx = self.xs[segment + 1] - x1
+        dy = self.ys[segment + 1] - y1
+        closest_x = x1
+        closest_y = y1
+        if dx != 0 or dy != 0:
+            t = ((x - x1) * dx + (y - y1) * dy) / (dx * dx + dy * dy)
+            if t > 1:
+                closest_x = self.xs[segment + 1]
+                closest_y = self.ys[segment + 1]
+            elif t > 0:
+                closest_x += dx * t
+                closest_y += dy * t
+
+        return (x - closest_x) ** 2 + (y - closest_y) ** 2, closest_x, closest_y
+
+    def closest_point(self, x: float, y: float) -> Tuple[float, float, float]:
+        """
+        Returns the closest point on the line to x, y, as a tuple of the point's x and y
+        coordinates and its chainage along the line
+        """
+        if len(self.xs) < 2:
+            return self.xs[0], self.ys[0], 0.0
+
+        nearest = self._index.nearestNeighbor(QgsPointXY(x, y), 1)[0]
+        best = (*self._closest_point_on_segment(nearest, x, y), nearest)
+        distance = math.sqrt(best[0])
+        for segment in sorted(self._index.intersects(QgsRectangle(x - distance, y - distance,
+                                                                  x + distance, y + distance))):
+            squared_distance, closest_x, closest_y = self._closest_point_on_segment(segment, x, y)
+            if squared_distance < best[0] or (squared_distance == best[0] and segment < best[3]):
+                best = (squared_distance, closest_x, closest_y, segment)
+
+        _, closest_x, closest_y, segment = best
+        chainage = self.cumulative_length[segment] + math.sqrt((closest_x - self.xs[segment]) ** 2 +
+                                                               (closest_y - self.ys[segment]) ** 2)
+        return closest_x, closest_y, chainage
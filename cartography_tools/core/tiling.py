@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+from typing import Tuple
+
+from qgis.core import QgsRectangle
+
+
+class TileGrid:
+    """
+    A regular grid of square tiles covering an extent, used to split
+    large processing jobs into independent chunks
+    """
+
+    def __init__(self, extent: QgsRectangle, tile_size: float):
+        if tile_size <= 0:
+            raise ValueError('Tile size must be greater than 0')
+
+        self.x_min = extent.xMinimum()
+        self.y_min = extent.yMinimum()
+        self.tile_size = tile_size
+        self.columns = max(1, int(math.ceil(extent.width() / tile_size)))
+        self.rows = max(1, int(math.ceil(extent.height() / tile_size)))
+
+    def tile_for_point(self, x: float, y: float) -> Tuple[int, int]:
+        """
+        Returns the (column, row) of the tile which owns the point at x, y.
+
+        Points outside the grid extent are clamped to the nearest edge tile, so that
+        every point is always owned by exactly one tile.
+        """
+        column = int(math.floor((x - self.x_min) / self.tile_size))
+        row = int(math.floor((y - self.y_min) / self.tile_size))
+        return min(max(column, 0), self.columns - 1), min(max(row, 0), self.rows - 1)
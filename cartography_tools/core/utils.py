@@ -11,6 +11,8 @@
 ***************************************************************************
 """
 
+from qgis.PyQt.QtCore import QThread
+
 
 class Utils:
     """
@@ -22,3 +24,17 @@ class Utils:
         seen = set()
         seen_add = seen.add
         return [x for x in seq if not (x in seen or seen_add(x))]
+
+    @staticmethod
+    def maximum_threads(context) -> int:
+        """
+        Returns the maximum number of threads to use for a Processing context
+        """
+        try:
+            max_threads = context.maximumThreads()
+        except AttributeError:
+            # QGIS < 3.28
+            max_threads = -1
+        if max_threads <= 0:
+            max_threads = QThread.idealThreadCount()
+        return max_threads
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Category code model
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+
+from typing import List, Optional
+
+from qgis.PyQt.QtCore import (
+    Qt,
+    QAbstractListModel,
+    QModelIndex,
+    QSize
+)
+from qgis.PyQt.QtWidgets import QCompleter
+from qgis.core import (
+    QgsRendererCategory,
+    QgsSymbolLayerUtils,
+    NULL
+)
+
+
+class CategoryCodeModel(QAbstractListModel):
+    """
+    A list model of the feature codes from a categorized renderer's categories.
+
+    Category icons are only rendered when a view requests them, i.e. for visible rows, and
+    are cached by the symbol's properties so that identical symbols are only rendered once.
+    The cache is cleared whenever the model is reset, so it never outgrows the current categories.
+    """
+
+    def __init__(self, icon_size: int, parent=None):
+        super().__init__(parent)
+        self.icon_size = icon_size
+        self._categories = []
+        self._labels = []
+        self._rows_by_label = {}
+        self._rows_by_value = {}
+        self._symbol_keys = []
+        self._icons = {}
+
+    def set_categories(self, categories: List[QgsRendererCategory]):
+        """
+        Resets the model to show the specified categories. Categories without a value are skipped.
+        """
+        self.beginResetModel()
+        self._categories = [category for category in categories
+                            if category.value() is not None and category.value() != NULL]
+        self._labels = [f'{category.label()} - ({category.value()})' if category.label() != category.value()
+                        else category.value() for category in self._categories]
+        self._rows_by_label = {}
+        self._rows_by_value = {}
+        for row, (label, category) in enumerate(zip(self._labels, self._categories)):
+            self._rows_by_label.setdefault(label, row)
+            self._rows_by_value.setdefault(self._value_key(category.value()), row)
+        self._symbol_keys = [None] * len(self._categories)
+        self._icons = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):  # pylint: disable=missing-function-docstring
+        if parent.isValid():
+            return 0
+        return len(self._categories)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):  # pylint: disable=missing-function-docstring
+        if not index.isValid() or index.row() >= len(self._categories):
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self._labels[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return self._categories[index.row()].value()
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon(index.row())
+
+        return None
+
+    def _icon(self, row: int):
+        """
+        Returns the icon for a row, rendering it if no identical symbol has been rendered before
+        """
+        symbol = self._categories[row].symbol()
+        if symbol is None:
+            return None
+
+        if self._symbol_keys[row] is None:
+            self._symbol_keys[row] = QgsSymbolLayerUtils.symbolProperties(symbol)
+
+        key = self._symbol_keys[row]
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = QgsSymbolLayerUtils.symbolPreviewIcon(symbol, QSize(self.icon_size, self.icon_size))
+            self._icons[key] = icon
+        return icon
+
+    @staticmethod
+    def _value_key(value):
+        """
+        Returns a hashable key for a category value. Categories matching several values have a list value.
+        """
+        return tuple(value) if isinstance(value, list) else value
+
+    def row_for_label(self, label: str) -> int:
+        """
+        Returns the first row with matching display label, or -1 if there is no match
+        """
+        return self._rows_by_label.get(label, -1)
+
+    def row_for_value(self, value) -> int:
+        """
+        Returns the first row with matching category value, or -1 if there is no match
+        """
+        return self._rows_by_value.get(self._value_key(value), -1)
+
+    def value_for_label(self, label: str) -> Optional[object]:
+        """
+        Returns the category value for the first row with matching display label, or None if there is no match
+        """
+        row = self.row_for_label(label)
+        return self._categories[row].value() if row >= 0 else None
+
+
+class CategoryCodeCompleter(QCompleter):
+    """
+    A completer which filters category codes as the user types, matching any part of the
+    category labels and values
+    """
+
+    def __init__(self, model: CategoryCodeModel, parent=None):
+        super().__init__(model, parent)
+        self.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setFilterMode(Qt.MatchFlag.MatchContains)
+        self.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+        self.popup().setUniformItemSizes(True)
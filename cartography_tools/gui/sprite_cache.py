@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Rotated marker sprite cache
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+
+from collections import OrderedDict
+
+from qgis.PyQt.QtCore import (
+    Qt,
+    QPointF
+)
+from qgis.PyQt.QtGui import (
+    QImage,
+    QPixmap,
+    QTransform
+)
+
+
+class SpriteCache:
+    """
+    A cache of pre-rotated marker preview pixmaps ("sprites"), so that canvas items can draw
+    rotated markers with plain drawPixmap calls instead of rotating the painter for every marker.
+
+    Sprites are keyed by the source image and the rotation quantized to ANGLE_STEP degrees.
+    Sprites keep the resolution and device pixel ratio of the source image. The least recently
+    used sprites are discarded once the cached sprites use more than MAX_BYTES of memory.
+    """
+
+    ANGLE_STEP = 1
+    MAX_BYTES = 16 * 1024 * 1024
+
+    _instance = None
+
+    def __init__(self):
+        self._sprites = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def instance() -> 'SpriteCache':
+        """
+        Returns the cache shared by all canvas items
+        """
+        if SpriteCache._instance is None:
+            SpriteCache._instance = SpriteCache()
+        return SpriteCache._instance
+
+    @staticmethod
+    def _size_in_bytes(sprite: QPixmap) -> int:
+        """
+        Returns the approximate memory used by a sprite
+        """
+        return sprite.width() * sprite.height() * max(sprite.depth(), 8) // 8
+
+    def sprite(self, image: QImage, angle: float) -> QPixmap:
+        """
+        Returns a copy of image rotated clockwise by angle degrees, centered on the center of
+        the original image
+        """
+        steps = int(round(360 / self.ANGLE_STEP))
+        quantized = int(round(angle / self.ANGLE_STEP)) % steps
+        key = (image.cacheKey(), quantized)
+
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            return sprite
+
+        transform = QTransform().rotate(quantized * self.ANGLE_STEP)
+        sprite = QPixmap.fromImage(image.transformed(transform, Qt.TransformationMode.SmoothTransformation))
+        sprite.setDevicePixelRatio(image.devicePixelRatio())
+
+        self._sprites[key] = sprite
+        self._bytes += self._size_in_bytes(sprite)
+        while self._bytes > self.MAX_BYTES and len(self._sprites) > 1:
+            _, evicted = self._sprites.popitem(last=False)
+            self._bytes -= self._size_in_bytes(evicted)
+        return sprite
+
+    @staticmethod
+    def sprite_origin(sprite: QPixmap, center: QPointF) -> QPointF:
+        """
+        Returns the top left position to draw a sprite at so that it is centered on center
+        """
+        return QPointF(center.x() - sprite.width() / sprite.devicePixelRatio() / 2,
+                       center.y() - sprite.height() / sprite.devicePixelRatio() / 2)
+
+    def clear(self):
+        """
+        Removes all cached sprites
+        """
+        self._sprites.clear()
+        self._bytes = 0
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Symbol preview image cache
+
+.. note:: This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation; either version 2 of the License, or
+(at your option) any later version.
+"""
+
+from collections import OrderedDict
+from functools import partial
+
+from qgis.PyQt.QtGui import QImage
+from qgis.core import (
+    QgsExpressionContextUtils,
+    QgsFeature,
+    QgsProperty,
+    QgsRenderContext,
+    QgsSymbol,
+    QgsVectorLayer
+)
+from qgis.gui import QgsMapCanvas
+
+from cartography_tools.gui.gui_utils import GuiUtils
+
+
+class SymbolPreviewCache:
+    """
+    A cache of the big marker preview images shown by the map tools, shared between all tools.
+
+    Images are keyed by the layer ID, the layer's renderer revision, the marker code value, the
+    canvas scale, map units per pixel and device pixel ratio, and the values of any other feature
+    attributes used by the renderer (e.g. by data defined symbol properties or rule filters). The
+    renderer revision is incremented whenever a layer's
+    renderer or style changes, so stale images are never returned. The least recently used
+    images are discarded once the cache holds MAX_IMAGES images.
+
+    Layers are watched until they are deleted, after which a new layer object with the same ID
+    (e.g. from reloading the project) is watched again.
+    """
+
+    MAX_IMAGES = 64
+
+    _instance = None
+
+    def __init__(self):
+        self._images = OrderedDict()
+        self._revisions = {}
+        # IDs of the layers which are currently being watched for renderer changes
+        self._watched = set()
+
+    @staticmethod
+    def instance() -> 'SymbolPreviewCache':
+        """
+        Returns the cache shared by all map tools
+        """
+        if SymbolPreviewCache._instance is None:
+            SymbolPreviewCache._instance = SymbolPreviewCache()
+        return SymbolPreviewCache._instance
+
+    def _revision(self, layer: QgsVectorLayer) -> int:
+        """
+        Returns the renderer revision for a layer, watching the layer for renderer changes
+        if it is not already watched
+        """
+        layer_id = layer.id()
+        if layer_id not in self._watched:
+            self._watched.add(layer_id)
+            self._revisions.setdefault(layer_id, 0)
+            layer.rendererChanged.connect(partial(self.invalidate_layer, layer_id))
+            layer.styleChanged.connect(partial(self.invalidate_layer, layer_id))
+            layer.willBeDeleted.connect(partial(self._layer_deleted, layer_id))
+
+        return self._revisions[layer_id]
+
+    def _layer_deleted(self, layer_id: str):
+        """
+        Discards all cached images for a deleted layer, and stops treating its ID as watched
+        """
+        self.invalidate_layer(layer_id)
+        self._watched.discard(layer_id)
+
+    def invalidate_layer(self, layer_id: str):
+        """
+        Discards all cached images for the layer with matching ID
+        """
+        if layer_id in self._revisions:
+            self._revisions[layer_id] += 1
+
+        for key in [key for key in self._images if key[0] == layer_id]:
+            del self._images[key]
+
+    def clear(self):
+        """
+        Discards all cached images
+        """
+        self._images.clear()
+
+    def preview_image(self, layer: QgsVectorLayer, feature: QgsFeature, code_value, canvas: QgsMapCanvas) -> QImage:
+        """
+        Returns the big marker preview image for the symbol which layer's renderer uses for feature,
+        ignoring any data defined rotation.
+
+        code_value must be the value of feature's code field, or None if no code field is set.
+        """
+        map_settings = canvas.mapSettings()
+        context = QgsRenderContext.fromMapSettings(map_settings)
+        context.expressionContext().appendScope(QgsExpressionContextUtils.layerScope(layer))
+        context.expressionContext().setFeature(feature)
+
+        used_fields = [layer.fields().lookupField(name) for name in sorted(layer.renderer().usedAttributes(context))]
+        used_values = repr([feature.attribute(index) for index in used_fields if index >= 0])
+        key = (layer.id(), self._revision(layer), code_value, map_settings.scale(), map_settings.mapUnitsPerPixel(),
+               canvas.devicePixelRatioF(), used_values)
+
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+
+        # find symbol for feature
+        renderer = layer.renderer().clone()
+        renderer.startRender(context, layer.fields())
+        symbol = renderer.originalSymbolForFeature(feature, context)
+        if symbol is None:
+            # e.g. code which doesn't match existing category
+            if len(renderer.symbols(context)):
+                symbol = renderer.symbols(context)[0]
+            else:
+                symbol = QgsSymbol.defaultSymbol(layer.geometryType())
+
+        renderer.stopRender(context)
+
+        # clear existing data defined rotation
+        symbol.setDataDefinedAngle(QgsProperty())
+
+        # render symbol to image
+        image = GuiUtils.big_marker_preview_image(symbol, context.expressionContext())
+
+        self._images[key] = image
+        if len(self._images) > self.MAX_IMAGES:
+            self._images.popitem(last=False)
+        return image
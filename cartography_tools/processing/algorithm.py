@@ -11,24 +11,52 @@
 ***************************************************************************
 """
 
+# pylint: disable=too-many-lines
+
+import math
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
 from qgis.PyQt.QtCore import QCoreApplication
 from qgis.core import (QgsWkbTypes,
                        QgsExpression,
+                       QgsExpressionContext,
                        QgsProcessing,
                        QgsFeatureSink,
                        QgsSpatialIndex,
                        QgsGeometry,
                        QgsFeature,
+                       QgsFeatureRequest,
+                       QgsLineString,
+                       QgsPoint,
+                       QgsAbstractGeometry,
+                       QgsRectangle,
                        QgsVertexId,
                        QgsMapLayer,
                        QgsProcessingException,
                        QgsProcessingAlgorithm,
+                       QgsProcessingMultiStepFeedback,
+                       QgsProcessingOutputVariant,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterDefinition,
                        QgsProcessingParameterField,
+                       QgsProcessingParameterFile,
+                       QgsProcessingParameterNumber,
                        QgsProcessingParameterFeatureSource,
                        QgsProcessingParameterExpression,
                        QgsProcessingParameterDistance,
                        QgsProcessingParameterFeatureSink)
+from cartography_tools.core.checkpoint import Checkpoint
+from cartography_tools.core.disjoint_set import DisjointSet
 from cartography_tools.core.geometry import GeometryUtils
+from cartography_tools.core.instrumentation import Instrumentation
+from cartography_tools.core.point_grid import PointGrid
+from cartography_tools.core.road_graph import RoadGraph
+from cartography_tools.core.road_network import RoadNetwork
+from cartography_tools.core.road_record import RoadRecord
+from cartography_tools.core.tiling import TileGrid
+from cartography_tools.core.utils import Utils
 
 
 class RemoveRoundaboutsAlgorithm(QgsProcessingAlgorithm):
@@ -37,7 +65,13 @@ class RemoveRoundaboutsAlgorithm(QgsProcessingAlgorithm):
     """
     INPUT = 'INPUT'
     EXPRESSION = 'EXPRESSION'
+    TOLERANCE = 'TOLERANCE'
+    MATCH_TOLERANCE = 'MATCH_TOLERANCE'
+    TILE_SIZE = 'TILE_SIZE'
+    CHECKPOINT_DIRECTORY = 'CHECKPOINT_DIRECTORY'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
     OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
 
     def tr(self, string):  # pylint: disable=missing-function-docstring
         return QCoreApplication.translate('Processing', string)
@@ -58,7 +92,13 @@ class RemoveRoundaboutsAlgorithm(QgsProcessingAlgorithm):
         return 'road'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
-        return self.tr("Generalizes a road network by removing roundabouts")
+        return self.tr("Generalizes a road network by removing roundabouts.\n\n"
+                       "If a tile size is set then the layer is processed in tiles using multiple threads, "
+                       "and only the roads close to the roundabouts in each tile are loaded into memory at once. "
+                       "The results are identical to processing the whole layer at once.\n\n"
+                       "If a checkpoint folder is set then progress is periodically saved to it, and a run which "
+                       "was interrupted is resumed from the last checkpoint. Checkpoints are not used when "
+                       "processing in tiles.")
 
     def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
         self.addParameter(
@@ -77,6 +117,42 @@ class RemoveRoundaboutsAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        tolerance_param = QgsProcessingParameterDistance(
+            self.TOLERANCE,
+            self.tr('Endpoint snapping tolerance'),
+            0, self.INPUT, optional=True, minValue=0)
+        tolerance_param.setFlags(tolerance_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(tolerance_param)
+
+        match_tolerance_param = QgsProcessingParameterDistance(
+            self.MATCH_TOLERANCE,
+            self.tr('Approach road matching tolerance'),
+            0, self.INPUT, optional=True, minValue=0)
+        match_tolerance_param.setFlags(match_tolerance_param.flags() |
+                                       QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(match_tolerance_param)
+
+        tile_size_param = QgsProcessingParameterDistance(
+            self.TILE_SIZE,
+            self.tr('Tile size (0 to process the whole layer at once)'),
+            0, self.INPUT, optional=True, minValue=0)
+        tile_size_param.setFlags(tile_size_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(tile_size_param)
+
+        checkpoint_param = QgsProcessingParameterFile(
+            self.CHECKPOINT_DIRECTORY,
+            self.tr('Checkpoint folder (resume interrupted runs)'),
+            behavior=QgsProcessingParameterFile.Behavior.Folder, optional=True)
+        checkpoint_param.setFlags(checkpoint_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(checkpoint_param)
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 self.OUTPUT,
@@ -84,7 +160,231 @@ class RemoveRoundaboutsAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
-    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-statements,too-many-branches,too-many-locals
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    @staticmethod
+    def _road_parts(feature: QgsFeature) -> List[QgsGeometry]:
+        """
+        Returns the linestring parts of a road feature, which are processed as separate roads
+        """
+        if not feature.geometry().wkbType() == QgsWkbTypes.Type.LineString:
+            return [QgsGeometry(p.clone()) for p in feature.geometry().parts()]
+
+        return [feature.geometry()]
+
+    @staticmethod
+    def _merge_roundabouts(roundabout_geometries: List[QgsGeometry],  # pylint: disable=too-many-locals
+                           feedback,
+                           progress_start: float,
+                           progress_range: float) -> List[QgsAbstractGeometry]:
+        """
+        Merges roundabout parts into complete roundabout rings.
+
+        Parts are first clustered into connected components by matching their endpoints,
+        and then each component is merged separately. This avoids a single expensive union
+        of every roundabout part in the layer.
+        """
+        clusters = DisjointSet(len(roundabout_geometries))
+        parts_by_endpoint = {}
+        for current, geom in enumerate(roundabout_geometries):
+            line = geom.constGet()
+            for point in (line.startPoint(), line.endPoint()):
+                key = (point.x(), point.y())
+                other = parts_by_endpoint.setdefault(key, current)
+                if other != current:
+                    clusters.union(current, other)
+
+        components = clusters.groups()
+        total = progress_range / len(components) if components else 0
+
+        merged = []
+        for current, component in enumerate(components):
+            if feedback.isCanceled():
+                break
+
+            if len(component) == 1 and roundabout_geometries[component[0]].constGet().isClosed():
+                merged.append(roundabout_geometries[component[0]].constGet().clone())
+            else:
+                component_geometry = QgsGeometry.unaryUnion([roundabout_geometries[i] for i in component])
+                component_geometry = component_geometry.mergeLines()
+                merged.extend(p.clone() for p in component_geometry.parts())
+
+            feedback.setProgress(progress_start + int(current * total))
+
+        return merged
+
+    @staticmethod
+    def _roads_touching_roundabout(roundabout: QgsAbstractGeometry,
+                                   network: RoadNetwork,
+                                   match_tolerance: float) -> List[Tuple[QgsPoint, bool, int]]:
+        """
+        Returns all roads which touch a roundabout, as tuples of the road's far end point, whether
+        the road starts at the roundabout, and the road ID.
+
+        Roads which end within match_tolerance of a roundabout vertex are considered to touch
+        the roundabout. Other roads are checked against the roundabout geometry.
+        """
+        vertex_grid = PointGrid(match_tolerance)
+        for vertex in roundabout.vertices():
+            vertex_grid.insert(vertex, True)
+
+        roundabout_engine = None
+        touching = []
+        for t in network.roads_in_rect(roundabout.boundingBox()):
+            touching_road = network.records[t].line
+            if vertex_grid.values_near(touching_road.startPoint()):
+                started_at_roundabout = True
+            elif vertex_grid.values_near(touching_road.endPoint()):
+                started_at_roundabout = False
+            else:
+                # fall back to a geometry check, for roads which touch the roundabout away from its vertices
+                if roundabout_engine is None:
+                    roundabout_engine = QgsGeometry.createGeometryEngine(roundabout)
+                    roundabout_engine.prepareGeometry()
+                if not roundabout_engine.touches(touching_road):
+                    continue
+
+                # work out if start or end of line touched the roundabout
+                started_at_roundabout = (roundabout_engine.distance(touching_road.startPoint()) <=
+                                         roundabout_engine.distance(touching_road.endPoint()))
+
+            other_point = touching_road.endPoint() if started_at_roundabout else touching_road.startPoint()
+            touching.append((other_point, started_at_roundabout, t))
+
+        return touching
+
+    @staticmethod
+    def _move_end_to_point(line: QgsLineString, at_start: bool, point: QgsPoint):
+        """
+        Moves the start or end vertex of a line to point
+        """
+        line.moveVertex(QgsVertexId(0, 0, 0 if at_start else line.numPoints() - 1), point)
+
+    @staticmethod
+    def _collapse_roundabout(roundabout: QgsAbstractGeometry,
+                             network: RoadNetwork,
+                             match_tolerance: float = 0) -> Set[int]:
+        """
+        Collapses a single roundabout ring to its centroid, by moving all touching roads
+        to the centroid and averaging any "V" patterns of roads approaching the roundabout.
+
+        Roads whose far ends are within match_tolerance of each other, directly or via other
+        roads, are clustered. A cluster of two roads forms a "V" pattern, and clusters of more
+        than two roads are left unchanged. Roads which end within match_tolerance of a roundabout
+        vertex are considered to touch the roundabout. If match_tolerance is 0 then points must
+        match exactly.
+
+        The road network is modified in place, and a roundabout is always collapsed completely
+        so that cancellation can only stop processing between roundabouts. Returns the set of IDs
+        of all roads which touched the roundabout, any of which may have been modified or removed.
+        """
+        touching = RemoveRoundaboutsAlgorithm._roads_touching_roundabout(roundabout, network, match_tolerance)
+        if not touching:
+            return set()
+
+        roundabout_centroid = QgsGeometry(roundabout.clone()).centroid()
+
+        # cluster roads with matching far ends, to find "V" patterns
+        other_point_grid = PointGrid(match_tolerance)
+        clusters = DisjointSet(len(touching))
+        for index, (other_point, _, _) in enumerate(touching):
+            for other_index in other_point_grid.values_near(other_point):
+                clusters.union(index, other_index)
+            other_point_grid.insert(other_point, index)
+
+        for cluster in clusters.groups():
+            _, started_at_roundabout, road_id = touching[cluster[0]]
+            if len(cluster) == 1:
+                # not a <O pattern, just a road coming straight to the roundabout
+                line = network.roads[road_id].geometry().constGet().clone()
+            elif len(cluster) == 2:
+                # <O pattern
+                other_id = touching[cluster[1]][2]
+                line = GeometryUtils.average_linestrings(network.roads[road_id].geometry().constGet(),
+                                                         network.roads[other_id].geometry().constGet())
+                network.remove_road(other_id)
+            else:
+                continue
+
+            # extend the line to the roundabout centroid
+            RemoveRoundaboutsAlgorithm._move_end_to_point(line, started_at_roundabout,
+                                                          roundabout_centroid.constGet())
+            network.set_road_geometry(road_id, QgsGeometry(line))
+
+        return {t for _, _, t in touching}
+
+    def remove_roundabouts(self,  # pylint: disable=too-many-locals
+                           network: RoadNetwork,
+                           exp: QgsExpression,
+                           expression_context: QgsExpressionContext,
+                           feedback,
+                           instrumentation: Optional[Instrumentation] = None,
+                           checkpoint: Optional[Checkpoint] = None,
+                           match_tolerance: float = 0):
+        """
+        Removes all roads matching a roundabout expression from a road network, collapsing
+        each roundabout to its centroid. Approach roads are matched using match_tolerance.
+
+        If instrumentation is set, statistics are recorded for the detect and rewrite phases.
+
+        If checkpoint is set, progress is periodically saved to the checkpoint and the collapsing
+        of roundabouts is resumed from any previously saved progress.
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+
+        with instrumentation.phase(Instrumentation.DETECT) as phase:
+            network.explode_multipart()
+
+            roundabouts = []
+            total = 10.0 / len(network.roads) if network.roads else 0
+            for current, (road_id, road) in enumerate(network.roads.items()):
+                if feedback.isCanceled():
+                    return
+
+                expression_context.setFeature(road)
+                if exp.evaluate(expression_context):
+                    roundabouts.append(road_id)
+
+                feedback.setProgress(int(current * total))
+
+            phase.features += len(network.roads)
+            roundabout_geometries = [network.roads[road_id].geometry() for road_id in roundabouts]
+            for road_id in roundabouts:
+                network.remove_road(road_id)
+
+            feedback.pushInfo(self.tr('Found {} roundabout parts').format(len(roundabouts)))
+            feedback.pushInfo(self.tr('Found {} not roundabouts').format(len(network.roads)))
+
+            all_roundabouts = self._merge_roundabouts(roundabout_geometries, feedback, 10, 15)
+            feedback.setProgress(25)
+
+        with instrumentation.phase(Instrumentation.REWRITE) as phase:
+            start = 0
+            if checkpoint is not None:
+                if checkpoint.load():
+                    checkpoint.restore_network(network)
+                    start = checkpoint.position
+                    feedback.pushInfo(self.tr('Resuming from checkpoint at roundabout {} of {}').format(
+                        start, len(all_roundabouts)))
+                network.track_changes()
+
+            total = 75.0 / len(all_roundabouts) if all_roundabouts else 0
+
+            for current, roundabout in enumerate(all_roundabouts[start:], start):
+                if feedback.isCanceled():
+                    if checkpoint is not None:
+                        checkpoint.save(network, current, {})
+                    break
+
+                if checkpoint is not None and checkpoint.is_due():
+                    checkpoint.save(network, current, {})
+
+                phase.features += len(self._collapse_roundabout(roundabout, network, match_tolerance))
+
+                feedback.setProgress(25 + int(current * total))
+
+    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-locals
                          parameters,
                          context,
                          feedback):
@@ -110,169 +410,276 @@ class RemoveRoundaboutsAlgorithm(QgsProcessingAlgorithm):
 
         roundabout_expression_string = self.parameterAsExpression(parameters, self.EXPRESSION, context)
 
-        # step 1 - find all roundabouts
         exp = QgsExpression(roundabout_expression_string)
         expression_context = self.createExpressionContext(parameters, context, source)
         exp.prepare(expression_context)
 
-        roundabouts = []
-        not_roundabouts = {}
-        not_roundabout_index = QgsSpatialIndex()
-
-        total = 10.0 / source.featureCount() if source.featureCount() else 0
-        features = source.getFeatures()
-
-        _id = 1
-        for current, feature in enumerate(features):
-            if feedback.isCanceled():
-                break
-
-            def add_feature(f, _id, geom, is_roundabout):
-                output_feature = QgsFeature(f)
-                output_feature.setGeometry(geom)
-                output_feature.setId(_id)
-                if is_roundabout:
-                    roundabouts.append(output_feature)
-                else:
-                    not_roundabouts[output_feature.id()] = output_feature
-                    not_roundabout_index.addFeature(output_feature)
-
-            expression_context.setFeature(feature)
-
-            is_roundabout = exp.evaluate(expression_context)
-            if not feature.geometry().wkbType() == QgsWkbTypes.Type.LineString:
-                geom = feature.geometry()
-                for p in geom.parts():
-                    add_feature(feature, _id, QgsGeometry(p.clone()), is_roundabout)
-                    _id += 1
-            else:
-                add_feature(feature, _id, feature.geometry(), is_roundabout)
-                _id += 1
-
-            # Update the progress bar
-            feedback.setProgress(int(current * total))
-
-        feedback.pushInfo(self.tr('Found {} roundabout parts'.format(len(roundabouts))))
-        feedback.pushInfo(self.tr('Found {} not roundabouts'.format(len(not_roundabouts))))
-
-        if feedback.isCanceled():
-            return {self.OUTPUT: dest_id}
-
-        all_roundabouts = QgsGeometry.unaryUnion([r.geometry() for r in roundabouts])
-        feedback.setProgress(20)
-        all_roundabouts = all_roundabouts.mergeLines()
-        feedback.setProgress(25)
-
-        total = 70.0 / all_roundabouts.constGet().numGeometries() if all_roundabouts.isMultipart() else 1
-
-        for current, roundabout in enumerate(all_roundabouts.parts()):
-            touching = not_roundabout_index.intersects(roundabout.boundingBox())
-            if not touching:
-                continue
-
+        tolerance = self.parameterAsDouble(parameters, self.TOLERANCE, context)
+        match_tolerance = self.parameterAsDouble(parameters, self.MATCH_TOLERANCE, context)
+        tile_size = self.parameterAsDouble(parameters, self.TILE_SIZE, context)
+        checkpoint_directory = self.parameterAsFile(parameters, self.CHECKPOINT_DIRECTORY, context)
+        instrumentation = Instrumentation()
+        if tile_size > 0:
+            if checkpoint_directory:
+                feedback.pushWarning(self.tr('Checkpoints are not used when processing in tiles'))
+            self._process_tiled(source, sink, exp, expression_context, tolerance, match_tolerance, tile_size,
+                                context, feedback, instrumentation)
+        else:
+            multi_step_feedback = QgsProcessingMultiStepFeedback(3, feedback)
+            with instrumentation.phase(Instrumentation.LOAD) as phase:
+                network = RoadNetwork.from_source(source, tolerance, multi_step_feedback)
+                phase.features += len(network.roads)
             if feedback.isCanceled():
-                break
-
-            roundabout_engine = QgsGeometry.createGeometryEngine(roundabout)
-            roundabout_engine.prepareGeometry()
-            roundabout_geom = QgsGeometry(roundabout.clone())
-            roundabout_centroid = roundabout_geom.centroid()
-
-            other_points = []
-
-            # find all touching roads, and move the touching part to the centroid
-            for t in touching:
-                touching_geom = not_roundabouts[t].geometry()
-                touching_road = touching_geom.constGet().clone()
-                if not roundabout_engine.touches(touching_road):
-                    # print('not touching!!')
+                return {self.OUTPUT: dest_id}
+
+            instrumentation.track_network(network)
+            multi_step_feedback.setCurrentStep(1)
+            checkpoint = None
+            if checkpoint_directory:
+                input_layer = self.parameterAsVectorLayer(parameters, self.INPUT, context)
+                uri = input_layer.source() if input_layer is not None else source.sourceName()
+                checkpoint = Checkpoint(checkpoint_directory, self.name(),
+                                        Checkpoint.create_fingerprint(source, uri, network,
+                                                                      expression=roundabout_expression_string,
+                                                                      tolerance=tolerance,
+                                                                      match_tolerance=match_tolerance))
+            try:
+                self.remove_roundabouts(network, exp, expression_context, multi_step_feedback, instrumentation,
+                                        checkpoint, match_tolerance)
+            finally:
+                if checkpoint is not None:
+                    checkpoint.close()
+
+            multi_step_feedback.setCurrentStep(2)
+            with instrumentation.phase(Instrumentation.WRITE) as phase:
+                network.write_to_sink(sink, multi_step_feedback)
+                phase.features += len(network.roads)
+
+            if checkpoint is not None and not feedback.isCanceled():
+                checkpoint.remove()
+
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
+
+    def _process_tiled(self,  # pylint: disable=too-many-statements,too-many-branches,too-many-locals
+                       source,
+                       sink,
+                       exp: QgsExpression,
+                       expression_context,
+                       tolerance: float,
+                       match_tolerance: float,
+                       tile_size: float,
+                       context,
+                       feedback,
+                       instrumentation: Instrumentation):
+        """
+        Processes the source in tiles.
+
+        Roundabouts are first merged across the whole layer (only roundabout parts are held in memory),
+        and each merged roundabout is owned by the tile containing its centroid. Each tile then fetches
+        just the roads which intersect its roundabouts and collapses them in a worker thread. Roads are
+        identified by their (feature id, part number) key, so that results can be stitched back together
+        while streaming the source to the sink.
+
+        Roundabouts which share roads with roundabouts from another tile are replayed serially, in the same
+        order as a non-tiled run, so that the output is identical.
+        """
+        # pass 1 - find and merge roundabouts
+        with instrumentation.phase(Instrumentation.DETECT) as phase:
+            roundabouts = []
+            total = 10.0 / source.featureCount() if source.featureCount() else 0
+            request = QgsFeatureRequest().setSubsetOfAttributes(exp.referencedColumns(), source.fields())
+            for current, feature in enumerate(source.getFeatures(request)):
+                if feedback.isCanceled():
+                    return
+
+                expression_context.setFeature(feature)
+                if exp.evaluate(expression_context):
+                    roundabouts.extend(self._road_parts(feature))
+
+                phase.features += 1
+                feedback.setProgress(int(current * total))
+
+            feedback.pushInfo(self.tr('Found {} roundabout parts').format(len(roundabouts)))
+
+            all_roundabouts = self._merge_roundabouts(roundabouts, feedback, 10, 15)
+            del roundabouts
+            feedback.setProgress(25)
+
+        # assign each roundabout to the tile containing its centroid
+        grid = TileGrid(source.sourceExtent(), tile_size)
+        tiles = {}
+        for ring_index, roundabout in enumerate(all_roundabouts):
+            centroid = QgsGeometry(roundabout.clone()).centroid().asPoint()
+            tiles.setdefault(grid.tile_for_point(centroid.x(), centroid.y()), []).append(ring_index)
+
+        feedback.pushInfo(self.tr('Processing {} roundabouts in {} tiles').format(len(all_roundabouts), len(tiles)))
+
+        def fetch_roads(request: QgsFeatureRequest) -> Dict[Tuple[int, int], QgsFeature]:
+            """
+            Fetches all non-roundabout road parts matching a request, keyed by (feature id, part number)
+            """
+            roads = {}
+            for feature in source.getFeatures(request):
+                expression_context.setFeature(feature)
+                if exp.evaluate(expression_context):
                     continue
 
-                # work out if start or end of line touched the roundabout
-                nearest = roundabout_geom.nearestPoint(touching_geom)
-                _, v = touching_geom.closestVertexWithContext(nearest.asPoint())
+                for part, geom in enumerate(self._road_parts(feature)):
+                    road = QgsFeature(feature)
+                    road.setGeometry(geom)
+                    roads[(feature.id(), part)] = road
+            return roads
+
+        def collapse_roundabouts(ring_indices: List[int], roads: Dict[Tuple[int, int], QgsFeature]):
+            """
+            Collapses the roundabouts with the specified indices, using only the specified roads.
+
+            Returns a dictionary of the geometries of all roads touching the roundabouts (None for
+            removed roads), the keys of the roads touching each roundabout and the number of index queries.
+            """
+            local_network = RoadNetwork(tolerance)
+            local_keys = {}
+            for local_id, (key, road) in enumerate(roads.items()):
+                road.setId(local_id)
+                local_network.add_road(road)
+                local_keys[local_id] = key
+
+            touching_by_ring = {}
+            for ring_index in ring_indices:
+                if feedback.isCanceled():
+                    break
 
-                if v == 0:
-                    # started at roundabout
-                    other_points.append((touching_road.endPoint(), True, t))
-                else:
-                    # ended at roundabout
-                    other_points.append((touching_road.startPoint(), False, t))
+                touching = self._collapse_roundabout(all_roundabouts[ring_index], local_network, match_tolerance)
+                touching_by_ring[ring_index] = {local_keys[t] for t in touching}
+
+            all_touching = set().union(*touching_by_ring.values())
+            tile_edits = {}
+            for local_id, key in local_keys.items():
+                if key in all_touching:
+                    road = local_network.roads.get(local_id)
+                    tile_edits[key] = road.geometry() if road is not None else None
+
+            return tile_edits, touching_by_ring, local_network.query_count
+
+        max_threads = Utils.maximum_threads(context)
+
+        # pass 2 - collapse roundabouts tile by tile, keeping only a limited number of tiles in memory at once
+        edits = {}
+        touching_by_ring = {}
+        ring_tile = {}
+        total = 60.0 / len(tiles) if tiles else 0
+        completed = 0
+
+        def collect(future):
+            nonlocal completed
+            tile_edits, tile_touching_by_ring, query_count = future.result()
+            edits.update(tile_edits)
+            touching_by_ring.update(tile_touching_by_ring)
+            instrumentation.add_index_queries(query_count)
+            completed += 1
+            feedback.setProgress(25 + int(completed * total))
+
+        with instrumentation.phase(Instrumentation.REWRITE) as phase:
+            with ThreadPoolExecutor(max_workers=max_threads) as executor:
+                pending = set()
+                for tile, ring_indices in tiles.items():
+                    if feedback.isCanceled():
+                        break
+
+                    tile_rect = QgsRectangle()
+                    for ring_index in ring_indices:
+                        ring_tile[ring_index] = tile
+                        if tile_rect.isEmpty():
+                            tile_rect = all_roundabouts[ring_index].boundingBox()
+                        else:
+                            tile_rect.combineExtentWith(all_roundabouts[ring_index].boundingBox())
+
+                    roads = fetch_roads(QgsFeatureRequest().setFilterRect(tile_rect))
+                    pending.add(executor.submit(collapse_roundabouts, ring_indices, roads))
+                    del roads
+
+                    if len(pending) >= max_threads * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future)
+
+                for future in pending:
+                    collect(future)
+
+            phase.features += len(all_roundabouts)
 
-            if not other_points:
+        if feedback.isCanceled():
+            return
+
+        # find roads which touch roundabouts from different tiles. All roundabouts connected
+        # to these roads (directly, or via other shared roads) must be replayed in order
+        rings_by_road = {}
+        for ring_index, touching in touching_by_ring.items():
+            for key in touching:
+                rings_by_road.setdefault(key, set()).add(ring_index)
+
+        replay_rings = set()
+        pending_rings = [ring for rings in rings_by_road.values()
+                         if len({ring_tile[r] for r in rings}) > 1 for ring in rings]
+        while pending_rings:
+            ring_index = pending_rings.pop()
+            if ring_index in replay_rings:
                 continue
-
-            # see if any incoming segments originate at the same place ("V" patterns)
-            averaged = set()
-            for point1, started_at_roundabout1, id1 in other_points:
-                if id1 in averaged:
-                    continue
-
+            replay_rings.add(ring_index)
+            for key in touching_by_ring[ring_index]:
+                pending_rings.extend(rings_by_road[key] - replay_rings)
+
+        if replay_rings:
+            feedback.pushInfo(self.tr('Replaying {} roundabouts which span multiple tiles').format(len(replay_rings)))
+            replay_keys = set()
+            for ring_index in replay_rings:
+                replay_keys.update(touching_by_ring[ring_index])
+
+            roads = fetch_roads(QgsFeatureRequest().setFilterFids(list({key[0] for key in replay_keys})))
+            roads = {key: road for key, road in roads.items() if key in replay_keys}
+            with instrumentation.phase(Instrumentation.REWRITE):
+                replay_edits, _, query_count = collapse_roundabouts(sorted(replay_rings), roads)
+                instrumentation.add_index_queries(query_count)
+            edits.update(replay_edits)
+
+        feedback.setProgress(85)
+
+        # pass 3 - stream roads to the sink, applying the modified geometries
+        with instrumentation.phase(Instrumentation.WRITE) as phase:
+            total = 15.0 / source.featureCount() if source.featureCount() else 0
+            _id = 1
+            for current, feature in enumerate(source.getFeatures()):
                 if feedback.isCanceled():
                     break
 
-                parts_to_average = [id1]
-                for point2, _, id2 in other_points:
-                    if id2 == id1:
-                        continue
-
-                    if point2 != point1:
-                        # todo tolerance?
-                        continue
-
-                    parts_to_average.append(id2)
-
-                if len(parts_to_average) == 1:
-                    # not a <O pattern, just a round coming straight to the roundabout
-                    line = not_roundabouts[id1].geometry().constGet().clone()
-                    if started_at_roundabout1:
-                        # extend start of line to roundabout centroid
-                        line.moveVertex(QgsVertexId(0, 0, 0), roundabout_centroid.constGet())
-                    else:
-                        # extend end of line to roundabout centroid
-                        line.moveVertex(QgsVertexId(0, 0, line.numPoints() - 1), roundabout_centroid.constGet())
-
-                    not_roundabout_index.deleteFeature(not_roundabouts[parts_to_average[0]])
-                    not_roundabouts[parts_to_average[0]].setGeometry(QgsGeometry(line))
-                    not_roundabout_index.addFeature(not_roundabouts[parts_to_average[0]])
-
-                elif len(parts_to_average) == 2:
-                    # <O pattern
-                    src_part, other_part = parts_to_average  # pylint: disable=unbalanced-tuple-unpacking
-                    averaged.add(src_part)
-                    averaged.add(other_part)
-
-                    averaged_line = GeometryUtils.average_linestrings(not_roundabouts[src_part].geometry().constGet(),
-                                                                      not_roundabouts[other_part].geometry().constGet())
-
-                    if started_at_roundabout1:
-                        # extend start of line to roundabout centroid
-                        averaged_line.moveVertex(QgsVertexId(0, 0, 0), roundabout_centroid.constGet())
-                    else:
-                        # extend end of line to roundabout centroid
-                        averaged_line.moveVertex(QgsVertexId(0, 0, averaged_line.numPoints() - 1),
-                                                 roundabout_centroid.constGet())
-
-                    not_roundabout_index.deleteFeature(not_roundabouts[src_part])
-                    not_roundabouts[src_part].setGeometry(QgsGeometry(averaged_line))
-                    not_roundabout_index.addFeature(not_roundabouts[src_part])
-
-                    not_roundabout_index.deleteFeature(not_roundabouts[other_part])
-                    del not_roundabouts[other_part]
-
-            feedback.setProgress(25 + int(current * total))
-
-        total = 5.0 / len(not_roundabouts)
-        current = 0
-        for _, f in not_roundabouts.items():
-            if feedback.isCanceled():
-                break
+                if not RoadNetwork.has_geometry(feature):
+                    # not part of the road network, so passed through unchanged
+                    output_feature = QgsFeature(feature)
+                    output_feature.setId(_id)
+                    sink.addFeature(output_feature, QgsFeatureSink.Flag.FastInsert)
+                    phase.features += 1
+                    _id += 1
+                    continue
 
-            sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
-            current += 1
-            feedback.setProgress(95 + int(current * total))
+                expression_context.setFeature(feature)
+                is_roundabout = exp.evaluate(expression_context)
+                for part, geom in enumerate(self._road_parts(feature)):
+                    if not is_roundabout:
+                        # edited geometries are None for removed roads
+                        geom = edits.get((feature.id(), part), geom)
+                        if geom is not None:
+                            output_feature = QgsFeature(feature)
+                            output_feature.setGeometry(geom)
+                            output_feature.setId(_id)
+                            sink.addFeature(output_feature, QgsFeatureSink.Flag.FastInsert)
+                            phase.features += 1
+                    _id += 1
 
-        return {self.OUTPUT: dest_id}
+                feedback.setProgress(85 + int(current * total))
 
 
 class RemoveCuldesacsAlgorithm(QgsProcessingAlgorithm):
@@ -281,7 +688,12 @@ class RemoveCuldesacsAlgorithm(QgsProcessingAlgorithm):
     """
     INPUT = 'INPUT'
     THRESHOLD = 'THRESHOLD'
+    ITERATE = 'ITERATE'
+    MAX_ITERATIONS = 'MAX_ITERATIONS'
+    TOLERANCE = 'TOLERANCE'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
     OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
 
     def tr(self, string):  # pylint: disable=missing-function-docstring
         return QCoreApplication.translate('Processing', string)
@@ -320,6 +732,35 @@ class RemoveCuldesacsAlgorithm(QgsProcessingAlgorithm):
                 0.0003, self.INPUT, minValue=0)
         )
 
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.ITERATE,
+                self.tr('Repeat until no cul-de-sacs remain'),
+                False, optional=True)
+        )
+
+        max_iterations_param = QgsProcessingParameterNumber(
+            self.MAX_ITERATIONS,
+            self.tr('Maximum number of passes when repeating (0 = no limit)'),
+            QgsProcessingParameterNumber.Type.Integer,
+            0, optional=True, minValue=0)
+        max_iterations_param.setFlags(max_iterations_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(max_iterations_param)
+
+        tolerance_param = QgsProcessingParameterDistance(
+            self.TOLERANCE,
+            self.tr('Endpoint snapping tolerance'),
+            0, self.INPUT, optional=True, minValue=0)
+        tolerance_param.setFlags(tolerance_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(tolerance_param)
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 self.OUTPUT,
@@ -327,7 +768,120 @@ class RemoveCuldesacsAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
-    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-statements,too-many-branches,too-many-locals
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    def _is_culdesac(self, network: RoadNetwork, _id: int, threshold: float) -> bool:
+        """
+        Returns True if the road with matching ID is a cul-de-sac shorter than threshold
+        """
+        record = network.records[_id]
+        if record.length >= threshold:
+            return False
+
+        if record.line is None:
+            if len(network.roads_in_rect(record.bbox)) == 1:
+                # isolated roads are removed without checking their ends, so may have several parts
+                return True
+            raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
+
+        # first check for other roads which start or end at the same node
+        start_node, end_node = network.graph.edge_nodes_for(_id)
+        touching_start = any(t != _id for t, _ in network.graph.node_edges(start_node))
+        touching_end = any(t != _id for t, _ in network.graph.node_edges(end_node))
+
+        if not touching_start or not touching_end:
+            # fall back to a geometry check, for roads which touch the candidate's ends away from their own ends
+            touching_candidates = network.roads_in_rect(record.bbox)
+            if len(touching_candidates) == 1:
+                # small street, touching nothing but itself -- kill it!
+                return True
+
+            start_engine = QgsGeometry.createGeometryEngine(record.start)
+            end_engine = QgsGeometry.createGeometryEngine(record.end)
+            for t in touching_candidates:
+                if t == _id:
+                    continue
+
+                other = network.records[t].geometry.constGet()
+                if not touching_start and start_engine.intersects(other):
+                    touching_start = True
+                if not touching_end and end_engine.intersects(other):
+                    touching_end = True
+
+                if touching_start and touching_end:
+                    break
+
+        # keep it if it joins two roads
+        return not touching_start or not touching_end
+
+    def remove_culdesacs(self,  # pylint: disable=too-many-locals
+                         network: RoadNetwork,
+                         threshold: float,
+                         feedback,
+                         max_iterations: int = 1,
+                         instrumentation: Optional[Instrumentation] = None) -> int:
+        """
+        Removes all cul-de-sacs shorter than threshold from a road network.
+
+        If max_iterations is not 1, roads which become cul-de-sacs after the removal of
+        other cul-de-sacs are removed too, repeating until no new cul-de-sacs are created
+        or max_iterations passes have been made (0 = no limit). Only the roads touching
+        removed roads are rechecked in each subsequent pass.
+
+        If instrumentation is set, statistics are recorded for the detect and rewrite phases.
+
+        Returns the number of removed roads.
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+
+        removed_count = 0
+        candidates = list(network.roads.keys())
+        iteration = 0
+        while candidates:
+            iteration += 1
+            removed = []
+            with instrumentation.phase(Instrumentation.DETECT) as phase:
+                total = 100.0 / len(candidates)
+                for current, _id in enumerate(candidates):
+                    if feedback.isCanceled():
+                        break
+
+                    if iteration == 1:
+                        feedback.setProgress(int(current * total))
+
+                    if self._is_culdesac(network, _id, threshold):
+                        removed.append(_id)
+                    phase.features += 1
+
+            if feedback.isCanceled():
+                break
+
+            with instrumentation.phase(Instrumentation.REWRITE) as phase:
+                # roads are only removed after all candidates have been checked, so that each pass
+                # gives the same result regardless of road order
+                next_candidates = set()
+                repeat = max_iterations == 0 or iteration < max_iterations
+                for _id in removed:
+                    if repeat:
+                        # roads which touched a removed road may now be cul-de-sacs
+                        for node in network.graph.edge_nodes_for(_id):
+                            next_candidates.update(t for t, _ in network.graph.node_edges(node))
+                        next_candidates.update(network.roads_in_rect(network.records[_id].bbox))
+
+                for _id in removed:
+                    network.remove_road(_id)
+                phase.features += len(removed)
+
+            removed_count += len(removed)
+            if max_iterations != 1:
+                feedback.pushInfo(self.tr('Pass {}: removed {} cul-de-sacs').format(iteration, len(removed)))
+
+            candidates = [_id for _id in next_candidates if _id in network.roads]
+
+        return removed_count
+
+    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-locals
                          parameters,
                          context,
                          feedback):
@@ -352,78 +906,35 @@ class RemoveCuldesacsAlgorithm(QgsProcessingAlgorithm):
             raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
 
         threshold = self.parameterAsDouble(parameters, self.THRESHOLD, context)
+        tolerance = self.parameterAsDouble(parameters, self.TOLERANCE, context)
 
-        index = QgsSpatialIndex()
-        roads = {}
-
-        total = 10.0 / source.featureCount() if source.featureCount() else 0
-        features = source.getFeatures()
-
-        for current, feature in enumerate(features):
-            if feedback.isCanceled():
-                break
-
-            index.addFeature(feature)
-            roads[feature.id()] = feature
-
-            feedback.setProgress(int(current * total))
-
-        total = 90.0 / len(roads)
-        removed = 0
-        current = 0
-        for _id, f in roads.items():
-            if feedback.isCanceled():
-                break
-
-            current += 1
-            if f.geometry().length() >= threshold:
-                sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
-                feedback.setProgress(10 + int(current * total))
-                continue
-
-            touching_candidates = index.intersects(f.geometry().boundingBox())
-            if len(touching_candidates) == 1:
-                # small street, touching nothing but itself -- kill it!
-                removed += 1
-                feedback.setProgress(10 + int(current * total))
-                continue
-
-            if not f.geometry().isMultipart():
-                candidate = f.geometry().constGet().clone()
-            else:
-                if f.geometry().constGet().numGeometries() > 1:
-                    raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
-                candidate = f.geometry().constGet().geometryN(0).clone()
-
-            candidate_start = candidate.startPoint()
-            candidate_end = candidate.endPoint()
-            start_engine = QgsGeometry.createGeometryEngine(candidate_start)
-            end_engine = QgsGeometry.createGeometryEngine(candidate_end)
-            touching_start = False
-            touching_end = False
-            for t in touching_candidates:
-                if t == _id:
-                    continue
-
-                if start_engine.intersects(roads[t].geometry().constGet()):
-                    touching_start = True
-                if end_engine.intersects(roads[t].geometry().constGet()):
-                    touching_end = True
-
-                if touching_start and touching_end:
-                    break
+        instrumentation = Instrumentation()
+        multi_step_feedback = QgsProcessingMultiStepFeedback(3, feedback)
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            network = RoadNetwork.from_source(source, tolerance, multi_step_feedback)
+            phase.features += len(network.roads)
+        if feedback.isCanceled():
+            return {self.OUTPUT: dest_id}
 
-            feedback.setProgress(10 + int(current * total))
-            if touching_start and touching_end:
-                # keep it, it joins two roads
-                sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
-                continue
+        instrumentation.track_network(network)
+        multi_step_feedback.setCurrentStep(1)
+        max_iterations = 1
+        if self.parameterAsBool(parameters, self.ITERATE, context):
+            max_iterations = self.parameterAsInt(parameters, self.MAX_ITERATIONS, context)
 
-            removed += 1
+        removed = self.remove_culdesacs(network, threshold, multi_step_feedback, max_iterations, instrumentation)
+        feedback.pushInfo(self.tr('Removed {} cul-de-sacs').format(removed))
 
-        feedback.pushInfo(self.tr('Removed {} cul-de-sacs'.format(removed)))
+        multi_step_feedback.setCurrentStep(2)
+        with instrumentation.phase(Instrumentation.WRITE) as phase:
+            network.write_to_sink(sink, multi_step_feedback)
+            phase.features += len(network.roads)
 
-        return {self.OUTPUT: dest_id}
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
 
 
 class RemoveCrossRoadsAlgorithm(QgsProcessingAlgorithm):
@@ -433,7 +944,11 @@ class RemoveCrossRoadsAlgorithm(QgsProcessingAlgorithm):
     INPUT = 'INPUT'
     FIELDS = 'FIELDS'
     THRESHOLD = 'THRESHOLD'
+    TOLERANCE = 'TOLERANCE'
+    LOW_MEMORY = 'LOW_MEMORY'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
     OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
 
     def tr(self, string):  # pylint: disable=missing-function-docstring
         return QCoreApplication.translate('Processing', string)
@@ -480,6 +995,27 @@ class RemoveCrossRoadsAlgorithm(QgsProcessingAlgorithm):
                 0.0003, self.INPUT, minValue=0)
         )
 
+        tolerance_param = QgsProcessingParameterDistance(
+            self.TOLERANCE,
+            self.tr('Endpoint snapping tolerance'),
+            0, self.INPUT, optional=True, minValue=0)
+        tolerance_param.setFlags(tolerance_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(tolerance_param)
+
+        low_memory_param = QgsProcessingParameterBoolean(
+            self.LOW_MEMORY,
+            self.tr('Low memory mode (reads input twice, plus any roads which need a geometry check)'),
+            False, optional=True)
+        low_memory_param.setFlags(low_memory_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(low_memory_param)
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 self.OUTPUT,
@@ -487,7 +1023,249 @@ class RemoveCrossRoadsAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
-    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-statements,too-many-branches,too-many-locals
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    def remove_cross_roads(self,  # pylint: disable=too-many-locals,too-many-branches
+                           network: RoadNetwork,
+                           field_indices: List[int],
+                           threshold: float,
+                           feedback,
+                           instrumentation: Optional[Instrumentation] = None) -> int:
+        """
+        Removes all cross roads shorter than threshold from a road network. Roads with matching
+        values for the attributes at field_indices are considered to be the same road.
+
+        If instrumentation is set, statistics are recorded for the detect and rewrite phases.
+
+        Returns the number of removed roads.
+        """
+
+        def is_matching_road(other_id: int, candidate_id: int, candidate_key: tuple) -> bool:
+            """
+            Returns True if the road with ID other_id is a long road with identifier attributes matching the candidate
+            """
+            if other_id == candidate_id:
+                return False
+
+            other = network.records[other_id]
+            return other.key == candidate_key and other.length >= threshold
+
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+
+        removed = []
+        with instrumentation.phase(Instrumentation.DETECT) as phase:
+            network.set_key_fields(field_indices)
+
+            total = 100.0 / len(network.roads) if network.roads else 0
+            for current, (_id, record) in enumerate(network.records.items()):
+                if feedback.isCanceled():
+                    break
+
+                feedback.setProgress(int(current * total))
+                if record.length >= threshold:
+                    continue
+
+                # we mark identify a cross road because either side is touched by at least two other features
+                # with matching identifier attributes
+
+                candidate_key = record.key
+
+                if record.line is None:
+                    raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
+
+                # first check for other roads which start or end at the same node
+                start_node, end_node = network.graph.edge_nodes_for(_id)
+                touching_start = {t for t, _ in network.graph.node_edges(start_node)
+                                  if is_matching_road(t, _id, candidate_key)}
+                touching_end = {t for t, _ in network.graph.node_edges(end_node)
+                                if is_matching_road(t, _id, candidate_key)}
+
+                if len(touching_start) < 2 or len(touching_end) < 2:
+                    # fall back to a geometry check, for roads which touch the candidate's ends away from their own ends
+                    touching_candidates = network.roads_with_key(candidate_key, record.bbox)
+                    start_engine = QgsGeometry.createGeometryEngine(record.start)
+                    end_engine = QgsGeometry.createGeometryEngine(record.end)
+                    for t in touching_candidates:
+                        if t in touching_start and t in touching_end:
+                            continue
+
+                        if not is_matching_road(t, _id, candidate_key):
+                            continue
+
+                        other = network.records[t].geometry.constGet()
+                        if t not in touching_start and start_engine.intersects(other):
+                            touching_start.add(t)
+                        if t not in touching_end and end_engine.intersects(other):
+                            touching_end.add(t)
+
+                        if len(touching_start) >= 2 and len(touching_end) >= 2:
+                            break
+
+                if len(touching_start) >= 2 and len(touching_end) >= 2:
+                    # kill it
+                    removed.append(_id)
+
+            phase.features += len(network.roads)
+
+        with instrumentation.phase(Instrumentation.REWRITE) as phase:
+            for _id in removed:
+                network.remove_road(_id)
+            phase.features += len(removed)
+
+        return len(removed)
+
+    def _remove_cross_roads_streaming(self,  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+                                      source,
+                                      sink,
+                                      field_indices: List[int],
+                                      threshold: float,
+                                      tolerance: float,
+                                      feedback,
+                                      instrumentation: Instrumentation) -> int:
+        """
+        Removes cross roads while streaming the source, instead of holding all features in memory.
+
+        The first pass over the source builds only a compact table of road lengths, keys and
+        endpoints (in a road graph) and a bounding box index. Cross roads are identified from
+        this table, with any geometry checks performed by fetching just the required roads.
+        The second pass streams the source again, writing all roads which were not removed.
+
+        The bounding box index is built by inserting roads during the first pass, rather than
+        bulk loading it, so that the source is only read twice in full.
+
+        Returns the number of removed roads.
+        """
+        graph = RoadGraph(tolerance)
+        index = QgsSpatialIndex()
+        rows = {}
+        lengths = array('d')
+        key_ids = array('q')
+        key_lookup = {}
+        # short roads, as tuples of (id, start x, start y, end x, end y)
+        candidates = []
+
+        # pass 1 - build road table
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            request = QgsFeatureRequest().setSubsetOfAttributes(field_indices)
+            total = 40.0 / source.featureCount() if source.featureCount() else 0
+            for current, feature in enumerate(source.getFeatures(request)):
+                if feedback.isCanceled():
+                    return 0
+
+                if not RoadNetwork.has_geometry(feature):
+                    # not part of the road network, and always written to the output
+                    continue
+
+                geometry = feature.geometry()
+                rows[feature.id()] = len(lengths)
+                lengths.append(geometry.length())
+                key = tuple(feature.attribute(i) for i in field_indices)
+                key_ids.append(key_lookup.setdefault(key, len(key_lookup)))
+                graph.add_edge(feature.id(), geometry.constGet())
+                index.addFeature(feature.id(), geometry.boundingBox())
+
+                if lengths[-1] < threshold:
+                    if not geometry.isMultipart():
+                        line = geometry.constGet()
+                    else:
+                        if geometry.constGet().numGeometries() > 1:
+                            raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
+                        line = geometry.constGet().geometryN(0)
+
+                    start = line.startPoint()
+                    end = line.endPoint()
+                    candidates.append((feature.id(), start.x(), start.y(), end.x(), end.y()))
+
+                feedback.setProgress(int(current * total))
+
+            del key_lookup
+            phase.features += len(lengths)
+
+        def is_matching_road(other_id: int, candidate_id: int, candidate_key: int) -> bool:
+            """
+            Returns True if the road with ID other_id is a long road with identifier attributes matching the candidate
+            """
+            if other_id == candidate_id:
+                return False
+
+            row = rows[other_id]
+            return key_ids[row] == candidate_key and lengths[row] >= threshold
+
+        # identify cross roads from the road graph, collecting any roads which need a geometry check
+        with instrumentation.phase(Instrumentation.DETECT) as phase:
+            removed = set()
+            touching = {}
+            geometry_checks = {}
+            total = 20.0 / len(candidates) if candidates else 0
+            for current, (_id, start_x, start_y, end_x, end_y) in enumerate(candidates):
+                if feedback.isCanceled():
+                    return 0
+
+                candidate_key = key_ids[rows[_id]]
+                start_node, end_node = graph.edge_nodes_for(_id)
+                touching_start = {t for t, _ in graph.node_edges(start_node)
+                                  if is_matching_road(t, _id, candidate_key)}
+                touching_end = {t for t, _ in graph.node_edges(end_node)
+                                if is_matching_road(t, _id, candidate_key)}
+
+                if len(touching_start) < 2 or len(touching_end) < 2:
+                    # roads which touch the candidate's ends away from their own ends must have a
+                    # bounding box containing the end
+                    touching[_id] = (touching_start, touching_end)
+                    for is_start, x, y, touching_set in ((True, start_x, start_y, touching_start),
+                                                             (False, end_x, end_y, touching_end)):
+                        instrumentation.add_index_queries(1)
+                        for t in index.intersects(QgsRectangle(x, y, x, y)):
+                            if t not in touching_set and is_matching_road(t, _id, candidate_key):
+                                geometry_checks.setdefault(t, []).append((_id, is_start, x, y))
+                else:
+                    removed.add(_id)
+
+                feedback.setProgress(40 + int(current * total))
+
+            if geometry_checks:
+                feedback.pushInfo(self.tr('Checking {} roads for touching cross road candidates').format(
+                    len(geometry_checks)))
+
+                request = QgsFeatureRequest().setFilterFids(list(geometry_checks.keys())).setNoAttributes()
+                total = 10.0 / len(geometry_checks)
+                for current, feature in enumerate(source.getFeatures(request)):
+                    if feedback.isCanceled():
+                        return 0
+
+                    engine = QgsGeometry.createGeometryEngine(feature.geometry().constGet())
+                    engine.prepareGeometry()
+                    for _id, is_start, x, y in geometry_checks[feature.id()]:
+                        if engine.intersects(QgsPoint(x, y)):
+                            touching[_id][0 if is_start else 1].add(feature.id())
+
+                    feedback.setProgress(60 + int(current * total))
+
+            del geometry_checks
+
+            for _id, (touching_start, touching_end) in touching.items():
+                if len(touching_start) >= 2 and len(touching_end) >= 2:
+                    removed.add(_id)
+
+            phase.features += len(candidates)
+
+        # pass 2 - stream roads to the sink
+        with instrumentation.phase(Instrumentation.WRITE) as phase:
+            total = 30.0 / source.featureCount() if source.featureCount() else 0
+            for current, feature in enumerate(source.getFeatures()):
+                if feedback.isCanceled():
+                    break
+
+                if feature.id() not in removed:
+                    sink.addFeature(feature, QgsFeatureSink.Flag.FastInsert)
+                    phase.features += 1
+
+                feedback.setProgress(70 + int(current * total))
+
+        return len(removed)
+
+    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-locals
                          parameters,
                          context,
                          feedback):
@@ -514,86 +1292,37 @@ class RemoveCrossRoadsAlgorithm(QgsProcessingAlgorithm):
         threshold = self.parameterAsDouble(parameters, self.THRESHOLD, context)
         fields = self.parameterAsFields(parameters, self.FIELDS, context)
         field_indices = [source.fields().lookupField(f) for f in fields]
-        index = QgsSpatialIndex()
-        roads = {}
-
-        total = 10.0 / source.featureCount() if source.featureCount() else 0
-        features = source.getFeatures()
-
-        for current, feature in enumerate(features):
-            if feedback.isCanceled():
-                break
-
-            index.addFeature(feature)
-            roads[feature.id()] = feature
-
-            feedback.setProgress(int(current * total))
-
-        total = 90.0 / len(roads)
-        current = 0
-        removed = 0
-        for _id, f in roads.items():
+        tolerance = self.parameterAsDouble(parameters, self.TOLERANCE, context)
+
+        instrumentation = Instrumentation()
+        if self.parameterAsBool(parameters, self.LOW_MEMORY, context):
+            removed = self._remove_cross_roads_streaming(source, sink, field_indices, threshold, tolerance, feedback,
+                                                         instrumentation)
+            feedback.pushInfo(self.tr('Removed {} cross roads').format(removed))
+        else:
+            multi_step_feedback = QgsProcessingMultiStepFeedback(3, feedback)
+            with instrumentation.phase(Instrumentation.LOAD) as phase:
+                network = RoadNetwork.from_source(source, tolerance, multi_step_feedback)
+                phase.features += len(network.roads)
             if feedback.isCanceled():
-                break
-
-            current += 1
-
-            if f.geometry().length() >= threshold:
-                sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
-                feedback.setProgress(10 + int(current * total))
-                continue
-
-            # we mark identify a cross road because either side is touched by at least two other features
-            # with matching identifier attributes
-
-            candidate_attrs = [f.attributes()[i] for i in field_indices]
-
-            touching_candidates = index.intersects(f.geometry().boundingBox())
-            if not f.geometry().isMultipart():
-                candidate = f.geometry().constGet().clone()
-            else:
-                if f.geometry().constGet().numGeometries() > 1:
-                    raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
-                candidate = f.geometry().constGet().geometryN(0).clone()
-
-            candidate_start = candidate.startPoint()
-            candidate_end = candidate.endPoint()
-            start_engine = QgsGeometry.createGeometryEngine(candidate_start)
-            end_engine = QgsGeometry.createGeometryEngine(candidate_end)
-            touching_start_count = 0
-            touching_end_count = 0
-            for t in touching_candidates:
-                if t == _id:
-                    continue
-
-                other = roads[t]
-
-                other_attrs = [other.attributes()[i] for i in field_indices]
-                if other_attrs != candidate_attrs:
-                    continue
-
-                if other.geometry().length() < threshold:
-                    continue
-
-                if start_engine.intersects(roads[t].geometry().constGet()):
-                    touching_start_count += 1
-                if end_engine.intersects(roads[t].geometry().constGet()):
-                    touching_end_count += 1
-
-                if touching_start_count >= 2 and touching_end_count >= 2:
-                    break
-
-            feedback.setProgress(10 + int(current * total))
+                return {self.OUTPUT: dest_id}
 
-            if touching_start_count >= 2 and touching_end_count >= 2:
-                # kill it
-                removed += 1
-            else:
-                sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
+            instrumentation.track_network(network)
+            multi_step_feedback.setCurrentStep(1)
+            removed = self.remove_cross_roads(network, field_indices, threshold, multi_step_feedback,
+                                              instrumentation)
+            feedback.pushInfo(self.tr('Removed {} cross roads').format(removed))
 
-        feedback.pushInfo(self.tr('Removed {} cross roads'.format(removed)))
+            multi_step_feedback.setCurrentStep(2)
+            with instrumentation.phase(Instrumentation.WRITE) as phase:
+                network.write_to_sink(sink, multi_step_feedback)
+                phase.features += len(network.roads)
 
-        return {self.OUTPUT: dest_id}
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
 
 
 class CollapseDualCarriagewayAlgorithm(QgsProcessingAlgorithm):
@@ -603,7 +1332,11 @@ class CollapseDualCarriagewayAlgorithm(QgsProcessingAlgorithm):
     INPUT = 'INPUT'
     FIELDS = 'FIELDS'
     THRESHOLD = 'THRESHOLD'
+    TOLERANCE = 'TOLERANCE'
+    CHECKPOINT_DIRECTORY = 'CHECKPOINT_DIRECTORY'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
     OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
 
     def tr(self, string):  # pylint: disable=missing-function-docstring
         return QCoreApplication.translate('Processing', string)
@@ -624,7 +1357,9 @@ class CollapseDualCarriagewayAlgorithm(QgsProcessingAlgorithm):
         return 'road'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
-        return self.tr("Generalizes a road network by collapsing dual carriageways")
+        return self.tr("Generalizes a road network by collapsing dual carriageways.\n\n"
+                       "If a checkpoint folder is set then progress is periodically saved to it, and a run which "
+                       "was interrupted is resumed from the last checkpoint.")
 
     def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
         self.addParameter(
@@ -650,6 +1385,27 @@ class CollapseDualCarriagewayAlgorithm(QgsProcessingAlgorithm):
                 0.0003, self.INPUT, minValue=0)
         )
 
+        tolerance_param = QgsProcessingParameterDistance(
+            self.TOLERANCE,
+            self.tr('Endpoint snapping tolerance'),
+            0, self.INPUT, optional=True, minValue=0)
+        tolerance_param.setFlags(tolerance_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(tolerance_param)
+
+        checkpoint_param = QgsProcessingParameterFile(
+            self.CHECKPOINT_DIRECTORY,
+            self.tr('Checkpoint folder (resume interrupted runs)'),
+            behavior=QgsProcessingParameterFile.Behavior.Folder, optional=True)
+        checkpoint_param.setFlags(checkpoint_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(checkpoint_param)
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 self.OUTPUT,
@@ -657,7 +1413,344 @@ class CollapseDualCarriagewayAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
-    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-statements,too-many-branches,too-many-locals
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    # number of interior vertices from each line checked before computing an exact Hausdorff distance
+    HAUSDORFF_SAMPLE_COUNT = 5
+
+    @staticmethod
+    def _max_vertex_distance(line: QgsLineString, other: QgsLineString, vertices: List[int]) -> float:
+        """
+        Returns the maximum distance from the specified vertices of line to other
+        """
+        max_distance = 0
+        for vertex in vertices:
+            sqr_dist, _, _, _ = other.closestSegment(line.pointN(vertex))
+            max_distance = max(max_distance, sqr_dist)
+        return math.sqrt(max_distance)
+
+    @staticmethod
+    def _hausdorff_rejection_stage(candidate: RoadRecord, other: RoadRecord, threshold: float) -> int:
+        """
+        Tests whether the Hausdorff distance between two lines is less than threshold, using a
+        sequence of increasingly expensive checks.
+
+        Each check before the exact distance is a lower bound of the (discrete) Hausdorff distance,
+        so a pair is never rejected unless the exact distance is also too large.
+
+        Returns the index of the stage which rejected the pair (0 = bounding box, 1 = endpoints,
+        2 = sampled vertices, 3 = exact distance), or -1 if the lines are within threshold.
+        """
+        box1 = candidate.bbox
+        box2 = other.bbox
+        dx = max(0, box2.xMinimum() - box1.xMaximum(), box1.xMinimum() - box2.xMaximum())
+        dy = max(0, box2.yMinimum() - box1.yMaximum(), box1.yMinimum() - box2.yMaximum())
+        if math.sqrt(dx * dx + dy * dy) >= threshold:
+            return 0
+
+        line1 = candidate.line
+        line2 = other.line
+        end1 = line1.numPoints() - 1
+        end2 = line2.numPoints() - 1
+        if CollapseDualCarriagewayAlgorithm._max_vertex_distance(line1, line2, [0, end1]) >= threshold \
+                or CollapseDualCarriagewayAlgorithm._max_vertex_distance(line2, line1, [0, end2]) >= threshold:
+            return 1
+
+        samples = CollapseDualCarriagewayAlgorithm.HAUSDORFF_SAMPLE_COUNT + 1
+        samples1 = sorted({round(i * end1 / samples) for i in range(1, samples)} - {0, end1})
+        samples2 = sorted({round(i * end2 / samples) for i in range(1, samples)} - {0, end2})
+        if CollapseDualCarriagewayAlgorithm._max_vertex_distance(line1, line2, samples1) >= threshold \
+                or CollapseDualCarriagewayAlgorithm._max_vertex_distance(line2, line1, samples2) >= threshold:
+            return 2
+
+        if candidate.geometry.hausdorffDistance(other.geometry) >= threshold:
+            return 3
+
+        return -1
+
+    # number of roads, in processing order, for which the Hausdorff distance tests are submitted together
+    HAUSDORFF_BATCH_SIZE = 2000
+    # number of candidate pairs tested by each worker task
+    HAUSDORFF_CHUNK_SIZE = 256
+
+    def _submit_hausdorff_batch(self,
+                                executor: ThreadPoolExecutor,
+                                network: RoadNetwork,
+                                road_ids: List[int],
+                                positions: Dict[int, int],
+                                batch_start: int,
+                                threshold: float,
+                                feedback) -> List[Future]:
+        """
+        Submits the Hausdorff distance tests for the candidate pairs of a batch of roads, in
+        chunks, to executor. Each pair is only tested for the road which is processed first.
+
+        The road records are captured when the tests are submitted, so the network can be
+        modified while the tests run.
+
+        Returns the futures for the submitted chunks, which each result in a list of tuples of
+        ((smaller road id, larger road id), rejection stage).
+        """
+
+        def check_pairs(chunk: List[Tuple[Tuple[int, int], RoadRecord, RoadRecord]]) -> List[Tuple[Tuple[int, int], int]]:
+            """
+            Returns the rejection stage for each pair in a chunk
+            """
+            return [(pair, self._hausdorff_rejection_stage(record1, record2, threshold))
+                    for pair, record1, record2 in chunk]
+
+        futures = []
+        chunk = []
+        for _id in road_ids[batch_start:batch_start + self.HAUSDORFF_BATCH_SIZE]:
+            if feedback.isCanceled():
+                break
+
+            record = network.records.get(_id)
+            if record is None:
+                continue
+
+            box = QgsRectangle(record.bbox)
+            box.grow(threshold)
+            for t in network.roads_with_key(record.key, box):
+                if positions[t] > positions[_id]:
+                    chunk.append(((min(_id, t), max(_id, t)), record, network.records[t]))
+
+            if len(chunk) >= self.HAUSDORFF_CHUNK_SIZE:
+                futures.append(executor.submit(check_pairs, chunk))
+                chunk = []
+
+        if chunk:
+            futures.append(executor.submit(check_pairs, chunk))
+
+        return futures
+
+    def collapse_dual_carriageways(self,  # pylint: disable=too-many-statements,too-many-branches,too-many-locals
+                                   network: RoadNetwork,
+                                   field_indices: List[int],
+                                   threshold: float,
+                                   touch_tolerance: float,
+                                   feedback,
+                                   max_threads: int = 1,
+                                   instrumentation: Optional[Instrumentation] = None,
+                                   checkpoint: Optional[Checkpoint] = None):
+        """
+        Collapses all pairs of roads from a road network which are separated by less than threshold
+        into a single averaged road. Roads with matching values for the attributes at field_indices
+        are considered to be the same road. Roads with ends within touch_tolerance of a collapsed road
+        are reconnected to the averaged road.
+
+        If max_threads is greater than 1, the distance tests for the candidate pairs of each batch of
+        roads are run in parallel while the previous batch is processed. Results are only reused for
+        roads which are unmodified when the pair is reached, so the output is identical to a serial run.
+        Results are discarded once both roads in a pair have been reached.
+
+        If instrumentation is set, statistics are recorded for the detect and rewrite phases.
+
+        If checkpoint is set, progress is periodically saved to the checkpoint and processing is
+        resumed from any previously saved progress.
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+
+        with instrumentation.phase(Instrumentation.REWRITE) as rewrite_phase:
+            for _id, f in network.roads.items():
+                if f.geometry().isMultipart():
+                    if f.geometry().constGet().numGeometries() > 1:
+                        raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
+                    network.set_road_geometry(_id, QgsGeometry(f.geometry().constGet().geometryN(0).clone()))
+                    rewrite_phase.features += 1
+
+        with instrumentation.phase(Instrumentation.DETECT) as detect_phase:
+            network.set_key_fields(field_indices)
+            road_ids = list(network.roads.keys())
+
+            collapsed = set()
+            processed = set()
+            # roads which have been modified, for which precomputed distance tests are outdated
+            modified = set()
+            # number of candidate pairs rejected by each stage of the Hausdorff distance test
+            rejections = [0, 0, 0, 0]
+
+            start = 0
+            if checkpoint is not None:
+                if checkpoint.load():
+                    checkpoint.restore_network(network)
+                    start = checkpoint.position
+                    rejections = checkpoint.state['rejections']
+                    feedback.pushInfo(self.tr('Resuming from checkpoint at road {} of {}').format(start, len(road_ids)))
+                # the sets are saved incrementally, as they can hold every road in the network
+                collapsed = checkpoint.load_set('collapsed')
+                processed = checkpoint.load_set('processed')
+                modified = checkpoint.load_set('modified')
+                network.track_changes()
+
+            def save_checkpoint(position: int):
+                """
+                Saves the loop state to the checkpoint
+                """
+                checkpoint.save(network, position, {'rejections': rejections},
+                                {'collapsed': collapsed, 'processed': processed, 'modified': modified})
+
+            # precomputed rejection stages, by (smaller road id, larger road id)
+            precomputed = {}
+            positions = {_id: position for position, _id in enumerate(road_ids)}
+            executor = ThreadPoolExecutor(max_workers=max_threads) if max_threads > 1 else None
+            pending = []
+            if executor is not None:
+                pending = self._submit_hausdorff_batch(executor, network, road_ids, positions, start, threshold,
+                                                       feedback)
+
+            total = 100.0 / len(road_ids) if road_ids else 0
+            for current, _id in enumerate(road_ids[start:], start):
+                if feedback.isCanceled():
+                    if checkpoint is not None:
+                        save_checkpoint(current)
+                    break
+
+                if checkpoint is not None and checkpoint.is_due():
+                    save_checkpoint(current)
+
+                if executor is not None and (current - start) % self.HAUSDORFF_BATCH_SIZE == 0:
+                    # collect the tests for this batch, and queue the tests for the next batch
+                    for future in pending:
+                        if feedback.isCanceled():
+                            break
+                        precomputed.update(future.result())
+                    pending = self._submit_hausdorff_batch(executor, network, road_ids, positions,
+                                                           current + self.HAUSDORFF_BATCH_SIZE, threshold, feedback)
+
+                feedback.setProgress(int(current * total))
+
+                if _id in processed:
+                    continue
+
+                detect_phase.features += 1
+                record = network.records[_id]
+                box = QgsRectangle(record.bbox)
+                box.grow(threshold)
+
+                # only roads with matching identifier attributes are considered
+                similar_candidates = network.roads_with_key(record.key, box)
+                if not similar_candidates:
+                    collapsed.add(_id)
+                    processed.add(_id)
+                    continue
+
+                candidate = record.geometry
+
+                parts = []
+
+                for t in similar_candidates:
+                    if t == _id:
+                        continue
+
+                    pair = (min(_id, t), max(_id, t))
+                    # the pair's result is not needed again once the second road is reached
+                    rejection_stage = precomputed.pop(pair, None) if positions[t] < current else precomputed.get(pair)
+                    if rejection_stage is None or _id in modified or t in modified:
+                        rejection_stage = self._hausdorff_rejection_stage(record, network.records[t], threshold)
+                    if rejection_stage >= 0:
+                        rejections[rejection_stage] += 1
+                    else:
+                        parts.append(t)
+
+                if len(parts) == 0:
+                    collapsed.add(_id)
+                    continue
+
+                # a road with more than one parallel road can't be collapsed into a single averaged road
+                if len(parts) > 1:
+                    continue
+                assert len(parts) == 1, len(parts)
+
+                with instrumentation.phase(Instrumentation.REWRITE) as rewrite_phase:
+                    other_record = network.records[parts[0]]
+                    other = other_record.geometry
+                    averaged = QgsGeometry(GeometryUtils.average_linestrings(record.line, other_record.line))
+
+                    # reconnect touching lines
+                    bbox = QgsRectangle(record.bbox)
+                    bbox.combineExtentWith(other_record.bbox)
+                    touching_candidates = network.roads_in_rect(bbox)
+
+                    # roads which start or end at the ends of the collapsed roads
+                    connected_ends = {}
+                    for node in network.graph.edge_nodes_for(_id) + network.graph.edge_nodes_for(parts[0]):
+                        for t, is_start in network.graph.node_edges(node):
+                            connected_ends.setdefault(t, set()).add(is_start)
+
+                    for touching_candidate in touching_candidates:
+                        if touching_candidate in (_id, parts[0]):
+                            continue
+
+                        touching_record = network.records[touching_candidate]
+                        # either the start or end of the touching road touches candidate
+                        start = QgsGeometry(touching_record.line.startPoint())
+                        end = QgsGeometry(touching_record.line.endPoint())
+                        # a separate copy of the geometry, which is modified below
+                        touching_candidate_geom = QgsGeometry(touching_record.geometry)
+
+                        moved_start = True in connected_ends.get(touching_candidate, ())
+                        moved_end = False in connected_ends.get(touching_candidate, ())
+                        if not moved_start or not moved_end:
+                            # fall back to a geometry check, for roads which touch the interior of the collapsed roads
+                            for cc in [candidate, other]:
+                                if not moved_start and start.shortestLine(cc).length() < touch_tolerance:
+                                    moved_start = True
+                                elif not moved_end and end.shortestLine(cc).length() < touch_tolerance:
+                                    moved_end = True
+
+                        if moved_start:
+                            # start touches, move to touch averaged line
+                            averaged_line = start.shortestLine(averaged)
+                            new_start = averaged_line.constGet().endPoint()
+                            touching_candidate_geom.get().moveVertex(QgsVertexId(0, 0, 0), new_start)
+                        if moved_end:
+                            # end touches, move to touch averaged line
+                            averaged_line = end.shortestLine(averaged)
+                            new_end = averaged_line.constGet().endPoint()
+                            touching_candidate_geom.get().moveVertex(
+                                QgsVertexId(0, 0, touching_candidate_geom.constGet().numPoints() - 1), new_end)
+
+                        if moved_start and moved_end:
+                            collapsed.discard(touching_candidate)
+                            processed.add(touching_candidate)
+                            network.remove_road(touching_candidate)
+                            modified.add(touching_candidate)
+                            rewrite_phase.features += 1
+                        elif moved_start or moved_end:
+                            network.set_road_geometry(touching_candidate, touching_candidate_geom)
+                            modified.add(touching_candidate)
+                            rewrite_phase.features += 1
+
+                    network.set_road_geometry(parts[0], averaged)
+                    modified.add(parts[0])
+                    modified.add(_id)
+                    network.set_road_geometry(_id, averaged)
+
+                    collapsed.add(_id)
+                    processed.add(_id)
+                    processed.add(parts[0])
+                    rewrite_phase.features += 2
+
+            if executor is not None:
+                # don't run any queued tests after cancellation
+                for future in pending:
+                    future.cancel()
+                executor.shutdown()
+
+        # only the collapsed roads are retained
+        with instrumentation.phase(Instrumentation.REWRITE) as rewrite_phase:
+            for _id in [_id for _id in network.roads if _id not in collapsed]:
+                network.remove_road(_id)
+                rewrite_phase.features += 1
+
+        feedback.pushInfo(self.tr('Candidates rejected by bounding box distance: {}').format(rejections[0]))
+        feedback.pushInfo(self.tr('Candidates rejected by endpoint distance: {}').format(rejections[1]))
+        feedback.pushInfo(self.tr('Candidates rejected by sampled vertex distance: {}').format(rejections[2]))
+        feedback.pushInfo(self.tr('Candidates rejected by exact Hausdorff distance: {}').format(rejections[3]))
+
+    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-locals
                          parameters,
                          context,
                          feedback):
@@ -684,160 +1777,48 @@ class CollapseDualCarriagewayAlgorithm(QgsProcessingAlgorithm):
         threshold = self.parameterAsDouble(parameters, self.THRESHOLD, context)
         fields = self.parameterAsFields(parameters, self.FIELDS, context)
         field_indices = [source.fields().lookupField(f) for f in fields]
-        index = QgsSpatialIndex()
-        roads = {}
-
-        total = 10.0 / source.featureCount() if source.featureCount() else 0
-        features = source.getFeatures()
-
-        for current, feature in enumerate(features):
-            if feedback.isCanceled():
-                break
-
-            if feature.geometry().isMultipart():
-                if feature.geometry().constGet().numGeometries() > 1:
-                    raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
-                part1 = feature.geometry().constGet().geometryN(0).clone()
-                feature.setGeometry(part1)
-
-            index.addFeature(feature)
-            roads[feature.id()] = feature
-
-            feedback.setProgress(int(current * total))
-
-        collapsed = {}
-        processed = set()
-
-        total = 85.0 / len(roads)
-        current = 0
-        for _id, f in roads.items():
-            if feedback.isCanceled():
-                break
-
-            current += 1
-            feedback.setProgress(10 + current * total)
-
-            if _id in processed:
-                continue
-
-            box = f.geometry().boundingBox()
-            box.grow(threshold)
-
-            similar_candidates = index.intersects(box)
-            if not similar_candidates:
-                collapsed[_id] = f
-                processed.add(_id)
-                continue
-
-            candidate = f.geometry()
-            candidate_attrs = [f.attributes()[i] for i in field_indices]
-
-            parts = []
-
-            for t in similar_candidates:
-                if t == _id:
-                    continue
-
-                other = roads[t]
-                other_attrs = [other.attributes()[i] for i in field_indices]
-                if other_attrs != candidate_attrs:
-                    continue
-
-                dist = candidate.hausdorffDistance(other.geometry())
-                if dist < threshold:
-                    parts.append(t)
-
-            if len(parts) == 0:
-                collapsed[_id] = f
-                continue
-
-            # todo fix this
-            if len(parts) > 1:
-                continue
-            assert len(parts) == 1, len(parts)
-
-            other = roads[parts[0]].geometry()
-            averaged = QgsGeometry(GeometryUtils.average_linestrings(candidate.constGet(), other.constGet()))
-
-            # reconnect touching lines
-            bbox = candidate.boundingBox()
-            bbox.combineExtentWith(other.boundingBox())
-            touching_candidates = index.intersects(bbox)
-
-            for touching_candidate in touching_candidates:
-                if touching_candidate in (_id, parts[0]):
-                    continue
-
-                # print(touching_candidate)
-
-                touching_candidate_geom = roads[touching_candidate].geometry()
-                # either the start or end of touching_candidate_geom touches candidate
-                start = QgsGeometry(touching_candidate_geom.constGet().startPoint())
-                end = QgsGeometry(touching_candidate_geom.constGet().endPoint())
-
-                moved_start = False
-                moved_end = False
-                for cc in [candidate, other]:
-                    #  if start.touches(cc):
-                    start_line = start.shortestLine(cc)
-                    if start_line.length() < 0.00000001:
-                        # start touches, move to touch averaged line
-                        averaged_line = start.shortestLine(averaged)
-                        new_start = averaged_line.constGet().endPoint()
-                        touching_candidate_geom.get().moveVertex(QgsVertexId(0, 0, 0), new_start)
-                        # print('moved start')
-                        moved_start = True
-                        continue
-                    end_line = end.shortestLine(cc)
-                    if end_line.length() < 0.00000001:
-                        # endtouches, move to touch averaged line
-                        averaged_line = end.shortestLine(averaged)
-                        new_end = averaged_line.constGet().endPoint()
-                        touching_candidate_geom.get().moveVertex(
-                            QgsVertexId(0, 0, touching_candidate_geom.constGet().numPoints() - 1), new_end)
-                        # print('moved end')
-                        moved_end = True
-                        # break
-
-                index.deleteFeature(roads[touching_candidate])
-                if moved_start and moved_end:
-                    if touching_candidate in collapsed:
-                        del collapsed[touching_candidate]
-                    processed.add(touching_candidate)
-                else:
-                    roads[touching_candidate].setGeometry(touching_candidate_geom)
-                    index.addFeature(roads[touching_candidate])
-                    if touching_candidate in collapsed:
-                        collapsed[touching_candidate].setGeometry(touching_candidate_geom)
-
-            index.deleteFeature(f)
-            index.deleteFeature(roads[parts[0]])
-
-            ff = QgsFeature(roads[parts[0]])
-            ff.setGeometry(averaged)
-            index.addFeature(ff)
-            roads[ff.id()] = ff
-
-            ff = QgsFeature(f)
-            ff.setGeometry(averaged)
-            index.addFeature(ff)
-            roads[_id] = ff
-
-            collapsed[_id] = ff
-            processed.add(_id)
-            processed.add(parts[0])
-
-        total = 5.0 / len(processed)
-        current = 0
-        for _, f in collapsed.items():
-            if feedback.isCanceled():
-                break
-
-            sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
-            current += 1
-            feedback.setProgress(95 + int(current * total))
+        tolerance = self.parameterAsDouble(parameters, self.TOLERANCE, context)
+        # roads are considered connected if their ends are within this distance
+        touch_tolerance = tolerance if tolerance > 0 else 0.00000001
+
+        instrumentation = Instrumentation()
+        multi_step_feedback = QgsProcessingMultiStepFeedback(3, feedback)
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            network = RoadNetwork.from_source(source, tolerance, multi_step_feedback)
+            phase.features += len(network.roads)
+        if feedback.isCanceled():
+            return {self.OUTPUT: dest_id}
 
-        return {self.OUTPUT: dest_id}
+        instrumentation.track_network(network)
+        multi_step_feedback.setCurrentStep(1)
+        checkpoint = None
+        checkpoint_directory = self.parameterAsFile(parameters, self.CHECKPOINT_DIRECTORY, context)
+        if checkpoint_directory:
+            input_layer = self.parameterAsVectorLayer(parameters, self.INPUT, context)
+            uri = input_layer.source() if input_layer is not None else source.sourceName()
+            checkpoint = Checkpoint(checkpoint_directory, self.name(),
+                                    Checkpoint.create_fingerprint(source, uri, network, fields=fields,
+                                                                  threshold=threshold, tolerance=tolerance))
+        try:
+            self.collapse_dual_carriageways(network, field_indices, threshold, touch_tolerance, multi_step_feedback,
+                                            Utils.maximum_threads(context), instrumentation, checkpoint)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        multi_step_feedback.setCurrentStep(2)
+        with instrumentation.phase(Instrumentation.WRITE) as phase:
+            network.write_to_sink(sink, multi_step_feedback)
+            phase.features += len(network.roads)
+
+        if checkpoint is not None and not feedback.isCanceled():
+            checkpoint.remove()
+
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
 
 
 class AverageLinesAlgorithm(QgsProcessingAlgorithm):
@@ -846,7 +1827,10 @@ class AverageLinesAlgorithm(QgsProcessingAlgorithm):
     """
 
     INPUT = 'INPUT'
+    RESOLUTION = 'RESOLUTION'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
     OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
 
     def tr(self, string):  # pylint: disable=missing-function-docstring
         return QCoreApplication.translate('Processing', string)
@@ -872,7 +1856,10 @@ class AverageLinesAlgorithm(QgsProcessingAlgorithm):
         return 'general'
 
     def shortHelpString(self):  # pylint: disable=missing-function-docstring
-        return self.tr("Creates an average of a set of linestring inputs")
+        return self.tr("Creates an average of a set of linestring inputs.\n\n"
+                       "If a resolution is set, all inputs are averaged together in a single pass, with output "
+                       "vertices spaced by the resolution. This is much faster for large numbers of inputs. "
+                       "Otherwise inputs are averaged one at a time, retaining every input vertex.")
 
     def supportInPlaceEdit(self, layer):  # pylint: disable=missing-function-docstring
         return layer.type() == QgsMapLayer.LayerType.VectorLayer and layer.geometryType() == QgsWkbTypes.GeometryType.LineGeometry
@@ -886,6 +1873,20 @@ class AverageLinesAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addParameter(
+            QgsProcessingParameterDistance(
+                self.RESOLUTION,
+                self.tr('Resolution'),
+                0, self.INPUT, optional=True, minValue=0)
+        )
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
         self.addParameter(
             QgsProcessingParameterFeatureSink(
                 self.OUTPUT,
@@ -893,6 +1894,77 @@ class AverageLinesAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    def _linestrings(self, source, feedback, phase) -> Iterator[Tuple[QgsFeature, QgsLineString]]:
+        """
+        Yields each feature from source with its linestring geometry, skipping features without a geometry
+        """
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        for current, feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                break
+
+            feedback.setProgress(current * total)
+            phase.features += 1
+            if not feature.hasGeometry():
+                continue
+
+            if not feature.geometry().isMultipart():
+                yield feature, feature.geometry().constGet().clone()
+            else:
+                if feature.geometry().constGet().numGeometries() > 1:
+                    raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
+                yield feature, feature.geometry().constGet().geometryN(0).clone()
+
+    def _average_incrementally(self, source, feedback,
+                               instrumentation: Instrumentation) -> Tuple[Optional[QgsFeature], QgsLineString]:
+        """
+        Averages the linestrings from source one at a time, retaining every input vertex.
+
+        Returns the first feature, or None if there were no linestrings, and the averaged linestring.
+        """
+        f = None
+        linestring = None
+        weight = 0
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            for feature, candidate in self._linestrings(source, feedback, phase):
+                if f is None:
+                    f = QgsFeature(feature)
+                    linestring = candidate
+                    continue
+
+                weight += 1
+                with instrumentation.phase(Instrumentation.REWRITE) as rewrite_phase:
+                    linestring = GeometryUtils.average_linestrings(linestring, candidate, weight)
+                    rewrite_phase.features += 1
+
+        return f, linestring
+
+    def _average_by_chainage(self, source, resolution: float, feedback,
+                             instrumentation: Instrumentation) -> Tuple[Optional[QgsFeature], QgsLineString]:
+        """
+        Averages all the linestrings from source in a single pass, with vertices spaced by resolution.
+
+        Returns the first feature, or None if there were no linestrings, and the averaged linestring.
+        """
+        f = None
+        candidates = []
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            for feature, candidate in self._linestrings(source, feedback, phase):
+                if f is None:
+                    f = QgsFeature(feature)
+                candidates.append(candidate)
+
+        if f is None:
+            return None, None
+
+        with instrumentation.phase(Instrumentation.REWRITE) as phase:
+            linestring = GeometryUtils.average_linestrings_by_chainage(candidates, resolution)
+            phase.features += len(candidates)
+
+        return f, linestring
+
     def processAlgorithm(self, parameters, context, feedback):  # pylint: disable=missing-function-docstring
         source = self.parameterAsSource(
             parameters,
@@ -914,33 +1986,24 @@ class AverageLinesAlgorithm(QgsProcessingAlgorithm):
         if sink is None:
             raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
 
-        total = 100.0 / source.featureCount() if source.featureCount() else 0
-        features = source.getFeatures()
+        resolution = self.parameterAsDouble(parameters, self.RESOLUTION, context)
 
-        linestring = None
-        f = None
-        weight = 0
-        for current, feature in enumerate(features):
-            if feedback.isCanceled():
-                break
+        instrumentation = Instrumentation()
+        if resolution > 0:
+            f, linestring = self._average_by_chainage(source, resolution, feedback, instrumentation)
+        else:
+            f, linestring = self._average_incrementally(source, feedback, instrumentation)
 
-            feedback.setProgress(current * total)
-
-            if not feature.geometry().isMultipart():
-                candidate = feature.geometry().constGet().clone()
-            else:
-                if feature.geometry().constGet().numGeometries() > 1:
-                    raise QgsProcessingException(self.tr('Only single-part geometries are supported'))
-                candidate = feature.geometry().constGet().geometryN(0).clone()
-
-            if linestring is None:
-                linestring = candidate.clone()
-                f = QgsFeature(feature)
-            else:
-                weight += 1
-                linestring = GeometryUtils.average_linestrings(linestring, candidate, weight)
+        if f is None:
+            return {self.OUTPUT: dest_id}
 
-        f.setGeometry(linestring)
-        sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
+        with instrumentation.phase(Instrumentation.WRITE) as phase:
+            f.setGeometry(linestring)
+            sink.addFeature(f, QgsFeatureSink.Flag.FastInsert)
+            phase.features += 1
 
-        return {self.OUTPUT: dest_id}
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
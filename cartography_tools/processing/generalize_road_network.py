@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (QgsWkbTypes,
+                       QgsExpression,
+                       QgsProcessing,
+                       QgsProcessingException,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingMultiStepFeedback,
+                       QgsProcessingOutputVariant,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterField,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterExpression,
+                       QgsProcessingParameterDistance,
+                       QgsProcessingParameterFeatureSink)
+from cartography_tools.core.instrumentation import Instrumentation
+from cartography_tools.core.road_network import RoadNetwork
+from cartography_tools.core.utils import Utils
+from cartography_tools.processing.algorithm import (
+    RemoveRoundaboutsAlgorithm,
+    RemoveCuldesacsAlgorithm,
+    RemoveCrossRoadsAlgorithm,
+    CollapseDualCarriagewayAlgorithm
+)
+
+
+class GeneralizeRoadNetworkAlgorithm(QgsProcessingAlgorithm):
+    """
+    Runs a sequence of road network generalization steps, sharing a single
+    in-memory copy of the network between the steps
+    """
+    INPUT = 'INPUT'
+    STEPS = 'STEPS'
+    ROUNDABOUT_EXPRESSION = 'ROUNDABOUT_EXPRESSION'
+    CULDESAC_THRESHOLD = 'CULDESAC_THRESHOLD'
+    FIELDS = 'FIELDS'
+    CROSSROAD_THRESHOLD = 'CROSSROAD_THRESHOLD'
+    DUAL_CARRIAGEWAY_THRESHOLD = 'DUAL_CARRIAGEWAY_THRESHOLD'
+    TOLERANCE = 'TOLERANCE'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
+    OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
+
+    STEP_ROUNDABOUTS = 0
+    STEP_CULDESACS = 1
+    STEP_CROSSROADS = 2
+    STEP_DUAL_CARRIAGEWAYS = 3
+
+    def tr(self, string):  # pylint: disable=missing-function-docstring
+        return QCoreApplication.translate('Processing', string)
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return GeneralizeRoadNetworkAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'generalizeroadnetwork'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Generalize road network')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Road networks')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'road'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr("Generalizes a road network by running a sequence of generalization steps. The selected "
+                       "steps are always run in the listed order, and the network is only read and written once.")
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT,
+                self.tr('Input layer'),
+                [QgsProcessing.SourceType.TypeVectorLine]
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.STEPS,
+                self.tr('Generalization steps'),
+                options=[self.tr('Remove roundabouts'),
+                         self.tr('Remove cul-de-sacs'),
+                         self.tr('Remove cross roads'),
+                         self.tr('Collapse dual carriageways')],
+                allowMultiple=True,
+                defaultValue=[self.STEP_ROUNDABOUTS, self.STEP_CULDESACS, self.STEP_CROSSROADS,
+                              self.STEP_DUAL_CARRIAGEWAYS]
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterExpression(
+                self.ROUNDABOUT_EXPRESSION,
+                self.tr('Expression which identifies roundabout parts'),
+                parentLayerParameterName=self.INPUT,
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterDistance(
+                self.CULDESAC_THRESHOLD,
+                self.tr('Minimum length of cul-de-sacs to retain'),
+                0.0003, self.INPUT, minValue=0)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterField(
+                self.FIELDS,
+                self.tr('Attributes which identify unique roads'), allowMultiple=True,
+                parentLayerParameterName=self.INPUT, optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterDistance(
+                self.CROSSROAD_THRESHOLD,
+                self.tr('Maximum length for cross road candidates'),
+                0.0003, self.INPUT, minValue=0)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterDistance(
+                self.DUAL_CARRIAGEWAY_THRESHOLD,
+                self.tr('Maximum separation to collapse dual carriageways'),
+                0.0003, self.INPUT, minValue=0)
+        )
+
+        tolerance_param = QgsProcessingParameterDistance(
+            self.TOLERANCE,
+            self.tr('Endpoint snapping tolerance'),
+            0, self.INPUT, optional=True, minValue=0)
+        tolerance_param.setFlags(tolerance_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(tolerance_param)
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT,
+                self.tr('Output layer')
+            )
+        )
+
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-locals,too-many-statements
+                         parameters,
+                         context,
+                         feedback):
+        source = self.parameterAsSource(
+            parameters,
+            self.INPUT,
+            context
+        )
+
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, self.INPUT))
+
+        steps = sorted(set(self.parameterAsEnums(parameters, self.STEPS, context)))
+        if not steps:
+            raise QgsProcessingException(self.tr('At least one generalization step must be selected'))
+
+        roundabout_expression_string = self.parameterAsExpression(parameters, self.ROUNDABOUT_EXPRESSION, context)
+        if self.STEP_ROUNDABOUTS in steps and not roundabout_expression_string:
+            raise QgsProcessingException(self.tr('An expression which identifies roundabouts is required'))
+
+        (sink, dest_id) = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            source.fields(),
+            QgsWkbTypes.Type.LineString if self.STEP_ROUNDABOUTS in steps else source.wkbType(),
+            source.sourceCrs()
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        fields = self.parameterAsFields(parameters, self.FIELDS, context)
+        field_indices = [source.fields().lookupField(f) for f in fields]
+        tolerance = self.parameterAsDouble(parameters, self.TOLERANCE, context)
+
+        instrumentation = Instrumentation()
+        multi_step_feedback = QgsProcessingMultiStepFeedback(len(steps) + 2, feedback)
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            network = RoadNetwork.from_source(source, tolerance, multi_step_feedback)
+            phase.features += len(network.roads)
+        instrumentation.track_network(network)
+
+        for current, step in enumerate(steps):
+            if feedback.isCanceled():
+                return {self.OUTPUT: dest_id}
+
+            multi_step_feedback.setCurrentStep(current + 1)
+            if step == self.STEP_ROUNDABOUTS:
+                feedback.pushInfo(self.tr('Removing roundabouts'))
+                exp = QgsExpression(roundabout_expression_string)
+                expression_context = self.createExpressionContext(parameters, context, source)
+                exp.prepare(expression_context)
+                RemoveRoundaboutsAlgorithm().remove_roundabouts(network, exp, expression_context,
+                                                                multi_step_feedback, instrumentation)
+            elif step == self.STEP_CULDESACS:
+                feedback.pushInfo(self.tr('Removing cul-de-sacs'))
+                threshold = self.parameterAsDouble(parameters, self.CULDESAC_THRESHOLD, context)
+                removed = RemoveCuldesacsAlgorithm().remove_culdesacs(network, threshold, multi_step_feedback,
+                                                                      instrumentation=instrumentation)
+                feedback.pushInfo(self.tr('Removed {} cul-de-sacs').format(removed))
+            elif step == self.STEP_CROSSROADS:
+                feedback.pushInfo(self.tr('Removing cross roads'))
+                threshold = self.parameterAsDouble(parameters, self.CROSSROAD_THRESHOLD, context)
+                removed = RemoveCrossRoadsAlgorithm().remove_cross_roads(network, field_indices, threshold,
+                                                                         multi_step_feedback, instrumentation)
+                feedback.pushInfo(self.tr('Removed {} cross roads').format(removed))
+            elif step == self.STEP_DUAL_CARRIAGEWAYS:
+                feedback.pushInfo(self.tr('Collapsing dual carriageways'))
+                threshold = self.parameterAsDouble(parameters, self.DUAL_CARRIAGEWAY_THRESHOLD, context)
+                # roads are considered connected if their ends are within this distance
+                touch_tolerance = tolerance if tolerance > 0 else 0.00000001
+                CollapseDualCarriagewayAlgorithm().collapse_dual_carriageways(network, field_indices, threshold,
+                                                                              touch_tolerance, multi_step_feedback,
+                                                                              Utils.maximum_threads(context),
+                                                                              instrumentation)
+
+        multi_step_feedback.setCurrentStep(len(steps) + 1)
+        with instrumentation.phase(Instrumentation.WRITE) as phase:
+            network.write_to_sink(sink, multi_step_feedback)
+            phase.features += len(network.roads)
+
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
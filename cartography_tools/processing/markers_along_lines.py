@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+from qgis.PyQt.QtCore import QCoreApplication, QMetaType, QVariant
+from qgis.core import (QgsWkbTypes,
+                       QgsExpression,
+                       QgsFeature,
+                       QgsFeatureSink,
+                       QgsField,
+                       QgsFields,
+                       QgsGeometry,
+                       QgsPoint,
+                       QgsPointXY,
+                       QgsProcessing,
+                       QgsProcessingException,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingOutputVariant,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterString,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingParameterExpression,
+                       QgsProcessingParameterDistance,
+                       QgsProcessingParameterFeatureSink,
+                       QgsProcessingUtils)
+from cartography_tools.core.geometry import GeometryUtils
+from cartography_tools.core.instrumentation import Instrumentation
+
+
+class PlaceMarkersAlongLinesAlgorithm(QgsProcessingAlgorithm):
+    """
+    Places templated markers along line features
+    """
+    INPUT = 'INPUT'
+    SPACING = 'SPACING'
+    COUNT = 'COUNT'
+    DISTANCE = 'DISTANCE'
+    ORIENTATION = 'ORIENTATION'
+    INCLUDE_ENDPOINTS = 'INCLUDE_ENDPOINTS'
+    CODE_FIELD = 'CODE_FIELD'
+    CODE = 'CODE'
+    ROTATION_FIELD = 'ROTATION_FIELD'
+    REPORT_STATISTICS = 'REPORT_STATISTICS'
+    OUTPUT = 'OUTPUT'
+    STATISTICS = 'STATISTICS'
+
+    SPACING_COUNT = 0
+    SPACING_DISTANCE = 1
+
+    ORIENTATIONS = [0.0, 90.0, 180.0, 270.0]
+
+    def tr(self, string):  # pylint: disable=missing-function-docstring
+        return QCoreApplication.translate('Processing', string)
+
+    def createInstance(self):  # pylint: disable=missing-function-docstring
+        return PlaceMarkersAlongLinesAlgorithm()
+
+    def name(self):  # pylint: disable=missing-function-docstring
+        return 'placemarkersalonglines'
+
+    def displayName(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Place markers along lines')
+
+    def group(self):  # pylint: disable=missing-function-docstring
+        return self.tr('Markers')
+
+    def groupId(self):  # pylint: disable=missing-function-docstring
+        return 'markers'
+
+    def shortHelpString(self):  # pylint: disable=missing-function-docstring
+        return self.tr("Places rotated point markers along line features, matching the placement of the "
+                       "multi-point templated marker tools. Each marker is given a feature code and a "
+                       "rotation following the direction of the line.")
+
+    def initAlgorithm(self, config=None):  # pylint: disable=missing-function-docstring,unused-argument
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.INPUT,
+                self.tr('Input layer'),
+                [QgsProcessing.SourceType.TypeVectorLine]
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.SPACING,
+                self.tr('Spacing'),
+                options=[self.tr('Via count'), self.tr('Via distance')],
+                defaultValue=self.SPACING_COUNT
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterNumber(
+                self.COUNT,
+                self.tr('Marker count'),
+                QgsProcessingParameterNumber.Type.Integer,
+                2, minValue=1)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterDistance(
+                self.DISTANCE,
+                self.tr('Minimum spacing'),
+                1000, self.INPUT, minValue=0)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.ORIENTATION,
+                self.tr('Orientation'),
+                options=[f'{int(o)}°' for o in self.ORIENTATIONS],
+                defaultValue=0
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.INCLUDE_ENDPOINTS,
+                self.tr('Include endpoints'),
+                True)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.CODE_FIELD,
+                self.tr('Code field name'),
+                'code', optional=True)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterExpression(
+                self.CODE,
+                self.tr('Marker code'),
+                parentLayerParameterName=self.INPUT,
+                optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.ROTATION_FIELD,
+                self.tr('Rotation field name'),
+                'rotation', optional=True)
+        )
+
+        statistics_param = QgsProcessingParameterBoolean(
+            self.REPORT_STATISTICS,
+            self.tr('Return phase statistics'),
+            False, optional=True)
+        statistics_param.setFlags(statistics_param.flags() | QgsProcessingParameterDefinition.Flag.FlagAdvanced)
+        self.addParameter(statistics_param)
+
+        self.addParameter(
+            QgsProcessingParameterFeatureSink(
+                self.OUTPUT,
+                self.tr('Markers'),
+                QgsProcessing.SourceType.TypeVectorPoint
+            )
+        )
+
+        self.addOutput(QgsProcessingOutputVariant(self.STATISTICS, self.tr('Phase statistics')))
+
+    @staticmethod
+    def _create_field(name: str, is_string: bool) -> QgsField:
+        """
+        Creates a string or double field with the specified name
+        """
+        try:
+            return QgsField(name, QMetaType.Type.QString if is_string else QMetaType.Type.Double)
+        except (AttributeError, TypeError):
+            # QGIS < 3.38
+            return QgsField(name, QVariant.String if is_string else QVariant.Double)
+
+    def processAlgorithm(self,  # pylint: disable=missing-function-docstring,too-many-locals,too-many-branches,too-many-statements
+                         parameters,
+                         context,
+                         feedback):
+        source = self.parameterAsSource(
+            parameters,
+            self.INPUT,
+            context
+        )
+
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, self.INPUT))
+
+        code_field_name = self.parameterAsString(parameters, self.CODE_FIELD, context)
+        rotation_field_name = self.parameterAsString(parameters, self.ROTATION_FIELD, context)
+
+        marker_fields = QgsFields()
+        if code_field_name:
+            marker_fields.append(self._create_field(code_field_name, True))
+        if rotation_field_name:
+            marker_fields.append(self._create_field(rotation_field_name, False))
+
+        fields = QgsProcessingUtils.combineFields(source.fields(), marker_fields)
+
+        (sink, dest_id) = self.parameterAsSink(
+            parameters,
+            self.OUTPUT,
+            context,
+            fields,
+            QgsWkbTypes.Type.Point,
+            source.sourceCrs()
+        )
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, self.OUTPUT))
+
+        if self.parameterAsEnum(parameters, self.SPACING, context) == self.SPACING_DISTANCE:
+            point_count = None
+            point_distance = self.parameterAsDouble(parameters, self.DISTANCE, context)
+            if point_distance <= 0:
+                raise QgsProcessingException(self.tr('Minimum spacing must be greater than 0'))
+        else:
+            point_count = self.parameterAsInt(parameters, self.COUNT, context)
+            point_distance = None
+
+        orientation = self.ORIENTATIONS[self.parameterAsEnum(parameters, self.ORIENTATION, context)]
+        include_endpoints = self.parameterAsBool(parameters, self.INCLUDE_ENDPOINTS, context)
+
+        code_expression_string = self.parameterAsExpression(parameters, self.CODE, context)
+        expression_context = self.createExpressionContext(parameters, context, source)
+        code_exp = None
+        if code_field_name and code_expression_string:
+            code_exp = QgsExpression(code_expression_string)
+            code_exp.prepare(expression_context)
+
+        instrumentation = Instrumentation()
+        created = 0
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        with instrumentation.phase(Instrumentation.LOAD) as load_phase:
+            for current, feature in enumerate(source.getFeatures()):
+                if feedback.isCanceled():
+                    break
+
+                feedback.setProgress(int(current * total))
+                load_phase.features += 1
+                if not feature.hasGeometry():
+                    continue
+
+                markers = []
+                with instrumentation.phase(Instrumentation.REWRITE) as rewrite_phase:
+                    code = None
+                    if code_exp is not None:
+                        expression_context.setFeature(feature)
+                        code = code_exp.evaluate(expression_context)
+
+                    for part in feature.geometry().constParts():
+                        xs, ys, angles = GeometryUtils.generate_rotated_point_arrays_along_path(
+                            [QgsPointXY(p) for p in part.points()],
+                            point_count=point_count,
+                            point_distance=point_distance,
+                            orientation=-orientation,
+                            include_endpoints=include_endpoints)
+
+                        for x, y, angle in zip(xs, ys, angles):
+                            attributes = feature.attributes()
+                            if code_field_name:
+                                attributes.append(code)
+                            if rotation_field_name:
+                                attributes.append(angle)
+
+                            marker = QgsFeature(fields)
+                            marker.setAttributes(attributes)
+                            marker.setGeometry(QgsGeometry(QgsPoint(x, y)))
+                            markers.append(marker)
+
+                    rewrite_phase.features += 1
+
+                with instrumentation.phase(Instrumentation.WRITE) as write_phase:
+                    sink.addFeatures(markers, QgsFeatureSink.Flag.FastInsert)
+                    write_phase.features += len(markers)
+                created += len(markers)
+
+        feedback.pushInfo(self.tr('Created {} markers').format(created))
+
+        instrumentation.push_summary(feedback)
+        results = {self.OUTPUT: dest_id}
+        if self.parameterAsBool(parameters, self.REPORT_STATISTICS, context):
+            results[self.STATISTICS] = instrumentation.as_dict()
+        return results
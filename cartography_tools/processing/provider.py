@@ -27,6 +27,8 @@ from cartography_tools.processing.algorithm import (
     AverageLinesAlgorithm,
     CollapseDualCarriagewayAlgorithm
 )
+from cartography_tools.processing.generalize_road_network import GeneralizeRoadNetworkAlgorithm
+from cartography_tools.processing.markers_along_lines import PlaceMarkersAlongLinesAlgorithm
 from cartography_tools.gui.gui_utils import GuiUtils
 
 
@@ -77,7 +79,9 @@ class CartographyToolsProvider(QgsProcessingProvider):
                   RemoveCuldesacsAlgorithm,
                   RemoveCrossRoadsAlgorithm,
                   AverageLinesAlgorithm,
-                  CollapseDualCarriagewayAlgorithm]:
+                  CollapseDualCarriagewayAlgorithm,
+                  GeneralizeRoadNetworkAlgorithm,
+                  PlaceMarkersAlongLinesAlgorithm]:
             self.addAlgorithm(a())
 
     def tr(self, string, context=''):
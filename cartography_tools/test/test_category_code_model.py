@@ -0,0 +1,72 @@
+# coding=utf-8
+"""Category Code Model Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.PyQt.QtCore import Qt
+from qgis.core import (QgsMarkerSymbol,
+                       QgsRendererCategory,
+                       NULL)
+
+from cartography_tools.gui.category_code_model import CategoryCodeModel
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class CategoryCodeModelTest(unittest.TestCase):
+    """Test CategoryCodeModel works."""
+
+    def testModel(self):
+        """
+        Tests the category code model
+        """
+        red = QgsMarkerSymbol.createSimple({'color': '255,0,0'})
+        blue = QgsMarkerSymbol.createSimple({'color': '0,0,255'})
+
+        model = CategoryCodeModel(16)
+        model.set_categories([QgsRendererCategory('a', red, 'a'),
+                              QgsRendererCategory('b', blue, 'Bridge'),
+                              QgsRendererCategory(NULL, blue, 'other'),
+                              QgsRendererCategory('c', red.clone(), 'Church')])
+
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual([model.data(model.index(row, 0)) for row in range(3)],
+                         ['a', 'Bridge - (b)', 'Church - (c)'])
+        self.assertEqual(model.data(model.index(1, 0), Qt.ItemDataRole.UserRole), 'b')
+
+        self.assertEqual(model.row_for_value('c'), 2)
+        self.assertEqual(model.row_for_value('x'), -1)
+        self.assertEqual(model.row_for_label('Bridge - (b)'), 1)
+        self.assertEqual(model.value_for_label('Bridge - (b)'), 'b')
+        self.assertIsNone(model.value_for_label('Bridge'))
+
+        # identical symbols should share a single rendered icon
+        red_icon = model.data(model.index(0, 0), Qt.ItemDataRole.DecorationRole)
+        self.assertFalse(red_icon.isNull())
+        self.assertEqual(model.data(model.index(2, 0), Qt.ItemDataRole.DecorationRole).cacheKey(),
+                         red_icon.cacheKey())
+        self.assertNotEqual(model.data(model.index(1, 0), Qt.ItemDataRole.DecorationRole).cacheKey(),
+                            red_icon.cacheKey())
+
+        # icons are discarded when the model is reset
+        model.set_categories([QgsRendererCategory('d', red.clone(), 'd')])
+        self.assertEqual(model.rowCount(), 1)
+        self.assertEqual(model.row_for_value('d'), 0)
+        self.assertEqual(model.row_for_value('c'), -1)
+        self.assertFalse(model.data(model.index(0, 0), Qt.ItemDataRole.DecorationRole).isNull())
+        self.assertNotEqual(model.data(model.index(0, 0), Qt.ItemDataRole.DecorationRole).cacheKey(),
+                            red_icon.cacheKey())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CategoryCodeModelTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
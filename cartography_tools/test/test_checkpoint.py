@@ -0,0 +1,165 @@
+# coding=utf-8
+"""Checkpoint Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import os
+import tempfile
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsFeedback,
+                       QgsGeometry,
+                       QgsVectorLayer)
+
+from cartography_tools.core.checkpoint import Checkpoint, TrackedSet
+from cartography_tools.core.road_network import RoadNetwork
+
+
+class CheckpointTest(unittest.TestCase):
+    """Test Checkpoint works."""
+
+    @staticmethod
+    def create_network() -> RoadNetwork:
+        """
+        Creates a small road network for testing
+        """
+        network = RoadNetwork()
+        for i in range(3):
+            road = QgsFeature(i + 1)
+            road.setGeometry(QgsGeometry.fromWkt(f'LineString({i} 0, {i + 1} 0)'))
+            network.add_road(road)
+        return network
+
+    def testTrackChanges(self):
+        """
+        Tests tracking changed roads in a network
+        """
+        network = self.create_network()
+        self.assertIsNone(network.changed)
+
+        network.track_changes()
+        network.set_road_geometry(1, QgsGeometry.fromWkt('LineString(0 1, 1 1)'))
+        network.remove_road(2)
+        self.assertEqual(network.changed, {1, 2})
+
+    def testSaveAndRestore(self):
+        """
+        Tests saving a checkpoint and restoring it to a new network
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            network = self.create_network()
+            network.track_changes()
+            checkpoint = Checkpoint(directory, 'test', 'fingerprint')
+            self.assertFalse(checkpoint.load())
+
+            network.set_road_geometry(1, QgsGeometry.fromWkt('LineString(0 1, 1 1)'))
+            network.remove_road(2)
+            checkpoint.save(network, 5, {'processed': [1, 2]})
+            self.assertFalse(network.changed)
+
+            checkpoint = Checkpoint(directory, 'test', 'fingerprint')
+            self.assertTrue(checkpoint.load())
+            self.assertEqual(checkpoint.position, 5)
+            self.assertEqual(checkpoint.state, {'processed': [1, 2]})
+
+            restored = self.create_network()
+            checkpoint.restore_network(restored)
+            self.assertEqual(sorted(restored.roads.keys()), [1, 3])
+            self.assertEqual(restored.roads[1].geometry().asWkt(), 'LineString (0 1, 1 1)')
+            self.assertEqual(restored.roads[3].geometry().asWkt(), 'LineString (2 0, 3 0)')
+
+            checkpoint.remove()
+            self.assertFalse(os.path.exists(checkpoint.path))
+
+    def testSets(self):
+        """
+        Tests saving the changes to sets of road IDs
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            network = self.create_network()
+            network.track_changes()
+            checkpoint = Checkpoint(directory, 'test', 'fingerprint')
+            processed = checkpoint.load_set('processed')
+            self.assertEqual(processed, set())
+
+            processed.add(1)
+            processed.add(2)
+            checkpoint.save(network, 1, {}, {'processed': processed})
+            self.assertFalse(processed.changes)
+
+            processed.discard(1)
+            processed.add(3)
+            self.assertEqual(processed.changes, {1: False, 3: True})
+            checkpoint.save(network, 2, {}, {'processed': processed})
+            checkpoint.close()
+
+            checkpoint = Checkpoint(directory, 'test', 'fingerprint')
+            self.assertTrue(checkpoint.load())
+            self.assertEqual(checkpoint.load_set('processed'), {2, 3})
+            self.assertIsInstance(checkpoint.load_set('processed'), TrackedSet)
+            self.assertEqual(checkpoint.load_set('collapsed'), set())
+            checkpoint.remove()
+
+    def testFingerprintMismatch(self):
+        """
+        Tests that a checkpoint with a different fingerprint is discarded
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            network = self.create_network()
+            network.track_changes()
+            network.remove_road(1)
+            checkpoint = Checkpoint(directory, 'test', 'fingerprint')
+            checkpoint.save(network, 1, {})
+
+            checkpoint = Checkpoint(directory, 'test', 'other fingerprint')
+            self.assertFalse(checkpoint.load())
+
+            restored = self.create_network()
+            checkpoint.restore_network(restored)
+            self.assertEqual(len(restored.roads), 3)
+            checkpoint.remove()
+
+    def testFingerprintAttributeEdit(self):
+        """
+        Tests that editing only an attribute of the input invalidates a checkpoint
+        """
+        layer = QgsVectorLayer('LineString?field=name:string', 'roads', 'memory')
+        for i in range(3):
+            road = QgsFeature(layer.fields())
+            road.setAttributes([f'road {i}'])
+            road.setGeometry(QgsGeometry.fromWkt(f'LineString({i} 0, {i + 1} 0)'))
+            self.assertTrue(layer.dataProvider().addFeature(road))
+
+        def fingerprint():
+            network = RoadNetwork.from_source(layer, 0, QgsFeedback())
+            return Checkpoint.create_fingerprint(layer, layer.source(), network, threshold=1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            network = self.create_network()
+            network.track_changes()
+            checkpoint = Checkpoint(directory, 'test', fingerprint())
+            checkpoint.save(network, 1, {})
+            checkpoint.close()
+
+            # unchanged input
+            checkpoint = Checkpoint(directory, 'test', fingerprint())
+            self.assertTrue(checkpoint.load())
+            checkpoint.close()
+
+            road_id = next(layer.getFeatures()).id()
+            self.assertTrue(layer.dataProvider().changeAttributeValues({road_id: {0: 'renamed'}}))
+            checkpoint = Checkpoint(directory, 'test', fingerprint())
+            self.assertFalse(checkpoint.load())
+            checkpoint.remove()
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CheckpointTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,76 @@
+# coding=utf-8
+"""Collapse Dual Carriageway Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import random
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsLineString,
+                       QgsPoint)
+
+from cartography_tools.core.road_record import RoadRecord
+from cartography_tools.processing.algorithm import CollapseDualCarriagewayAlgorithm
+
+
+def random_road(rng: random.Random, offset_x: float, offset_y: float) -> RoadRecord:
+    """
+    Creates a record for a random road heading roughly east from offset_x, offset_y
+    """
+    x = offset_x
+    y = offset_y
+    points = []
+    for _ in range(rng.randint(2, 20)):
+        points.append(QgsPoint(x, y))
+        x += rng.uniform(0, 2)
+        y += rng.uniform(-1, 1)
+    feature = QgsFeature()
+    feature.setGeometry(QgsGeometry(QgsLineString(points)))
+    return RoadRecord(feature)
+
+
+class CollapseDualCarriagewayTest(unittest.TestCase):
+    """Test CollapseDualCarriagewayAlgorithm works."""
+
+    def testHausdorffRejection(self):
+        """
+        Tests that the Hausdorff distance prefilters only reject pairs which the exact distance also rejects
+        """
+        rng = random.Random(1)
+        stages = set()
+        for _ in range(500):
+            road1 = random_road(rng, 0, 0)
+            road2 = random_road(rng, rng.uniform(-3, 3), rng.uniform(-3, 3))
+            threshold = rng.uniform(0.5, 8)
+
+            stage = CollapseDualCarriagewayAlgorithm._hausdorff_rejection_stage(  # pylint: disable=protected-access
+                road1, road2, threshold)
+            stages.add(stage)
+            distance = road1.geometry.hausdorffDistance(road2.geometry)
+            if stage >= 0:
+                self.assertGreaterEqual(distance, threshold, stage)
+            else:
+                self.assertLess(distance, threshold)
+
+        self.assertEqual(stages, {-1, 0, 1, 2})
+
+        # a spike at a vertex which isn't sampled is only rejected by the exact distance
+        straight = QgsFeature()
+        straight.setGeometry(QgsGeometry(QgsLineString([QgsPoint(x, 0) for x in range(21)])))
+        spike = QgsFeature()
+        spike.setGeometry(QgsGeometry(QgsLineString([QgsPoint(x, 5 if x == 1 else 0) for x in range(21)])))
+        self.assertEqual(CollapseDualCarriagewayAlgorithm._hausdorff_rejection_stage(  # pylint: disable=protected-access
+            RoadRecord(straight), RoadRecord(spike), 2), 3)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CollapseDualCarriagewayTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,46 @@
+# coding=utf-8
+"""Disjoint Set Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+from cartography_tools.core.disjoint_set import DisjointSet
+
+
+class DisjointSetTest(unittest.TestCase):
+    """Test DisjointSet works."""
+
+    def testSingletons(self):
+        """
+        Tests that items start in their own sets
+        """
+        s = DisjointSet(3)
+        self.assertEqual([s.find(i) for i in range(3)], [0, 1, 2])
+        self.assertEqual(s.groups(), [[0], [1], [2]])
+
+    def testUnion(self):
+        """
+        Tests merging sets
+        """
+        s = DisjointSet(6)
+        s.union(0, 3)
+        s.union(4, 5)
+        s.union(5, 3)
+        self.assertEqual(s.find(0), s.find(4))
+        self.assertNotEqual(s.find(1), s.find(0))
+        self.assertEqual(s.groups(), [[0, 3, 4, 5], [1], [2]])
+
+        # already merged
+        root = s.find(0)
+        self.assertEqual(s.union(3, 4), root)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(DisjointSetTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
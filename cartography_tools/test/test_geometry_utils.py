@@ -0,0 +1,163 @@
+# coding=utf-8
+"""Geometry Utils Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import random
+import unittest
+
+from qgis.core import (QgsGeometry,
+                       QgsLineString,
+                       QgsPoint,
+                       QgsPointXY,
+                       QgsVertexId)
+
+from cartography_tools.core.geometry import GeometryUtils
+
+
+def closest_segment_average(line1: QgsLineString, line2: QgsLineString, weight: float = 1) -> QgsLineString:
+    """
+    The original implementation of GeometryUtils.average_linestrings(), which inserts the closest point
+    on line1 to each vertex of line2 into line1 using closestSegment()
+    """
+    g1 = line1.clone()
+    for n in range(line2.numPoints()):
+        _, pt, after, _ = g1.closestSegment(line2.pointN(n))
+        g1.insertVertex(QgsVertexId(0, 0, after.vertex), pt)
+
+    out = []
+    for n in range(g1.numPoints()):
+        vertex = g1.pointN(n)
+        _, pt, _, _ = line2.closestSegment(vertex)
+        out.append(QgsPoint((vertex.x() * weight + pt.x()) / (weight + 1),
+                            (vertex.y() * weight + pt.y()) / (weight + 1)))
+    return QgsLineString(out)
+
+
+def random_walk(rng: random.Random, vertex_count: int, offset: float) -> QgsLineString:
+    """
+    Creates a random line heading roughly east, offset to the north by offset
+    """
+    x = 0
+    y = offset
+    points = []
+    for _ in range(vertex_count):
+        points.append(QgsPoint(x, y))
+        x += rng.uniform(-0.5, 2)
+        y += rng.uniform(-1, 1)
+    return QgsLineString(points)
+
+
+class GeometryUtilsTest(unittest.TestCase):
+    """Test GeometryUtils works."""
+
+    def testPointsAlongPath(self):
+        """
+        Tests generating rotated points along a path
+        """
+        path = [QgsPointXY(0, 0), QgsPointXY(10, 0), QgsPointXY(10, 0), QgsPointXY(10, 10)]
+        self.assertEqual([(p.x(), p.y(), a) for p, a in
+                          GeometryUtils.generate_rotated_points_along_path(path, point_count=5)],
+                         [(0, 0, 90), (5, 0, 90), (10, 0, 45), (10, 5, 0), (10, 10, 0)])
+
+        res = GeometryUtils.generate_rotated_points_along_path(path, point_distance=3, orientation=90,
+                                                               include_endpoints=False)
+        self.assertEqual(len(res), 6)
+        self.assertAlmostEqual(res[0][0].x(), 1.6666667, 5)
+        self.assertEqual(res[0][1], 0)
+        self.assertAlmostEqual(res[5][0].y(), 8.3333333, 5)
+        self.assertEqual(res[5][1], -90)
+
+        self.assertFalse(GeometryUtils.generate_rotated_points_along_path(path[:1], point_count=5))
+        self.assertFalse(GeometryUtils.generate_rotated_points_along_path(path, point_distance=0))
+
+    def testPointsAlongPathMatchesInterpolate(self):
+        """
+        Tests that generated points match QgsGeometry.interpolate and interpolateAngle
+        """
+        path = [QgsPointXY(1, 2), QgsPointXY(4, 7), QgsPointXY(-3, 9), QgsPointXY(-2, -5)]
+        geom = QgsGeometry.fromPolylineXY(path)
+        xs, ys, angles = GeometryUtils.generate_rotated_point_arrays_along_path(path, point_count=17)
+        for i in range(17):
+            distance = geom.length() * i / 16
+            self.assertAlmostEqual(xs[i], geom.interpolate(distance).asPoint().x(), 6)
+            self.assertAlmostEqual(ys[i], geom.interpolate(distance).asPoint().y(), 6)
+            self.assertAlmostEqual(angles[i], geom.interpolateAngle(distance) * 180 / 3.141592653589793, 6)
+
+    def testPointsAlongAppendedVertices(self):
+        """
+        Tests generating points along a path built incrementally from vertices
+        """
+        path = [QgsPointXY(1, 2), QgsPointXY(4, 7), QgsPointXY(-3, 9), QgsPointXY(-2, -5)]
+        vertex_x = []
+        vertex_y = []
+        cumulative_length = []
+        segment_angles = []
+        for p in path:
+            GeometryUtils.append_path_vertex(vertex_x, vertex_y, cumulative_length, segment_angles, p.x(), p.y())
+
+        self.assertEqual(len(cumulative_length), 4)
+        self.assertEqual(len(segment_angles), 3)
+        self.assertEqual(GeometryUtils.generate_rotated_point_arrays_along_vertices(vertex_x, vertex_y,
+                                                                                    cumulative_length,
+                                                                                    segment_angles,
+                                                                                    point_distance=1.5),
+                         GeometryUtils.generate_rotated_point_arrays_along_path(path, point_distance=1.5))
+
+    def testAverageLinestrings(self):
+        """
+        Tests averaging two linestrings
+        """
+        line1 = QgsLineString([QgsPoint(0, 0), QgsPoint(10, 0)])
+        line2 = QgsLineString([QgsPoint(0, 2), QgsPoint(4, 2), QgsPoint(10, 2)])
+        self.assertEqual(GeometryUtils.average_linestrings(line1, line2).asWkt(),
+                         'LineString (0 1, 0 1, 4 1, 10 1, 10 1)')
+        self.assertEqual(GeometryUtils.average_linestrings(line1, line2, 3).asWkt(),
+                         'LineString (0 0.5, 0 0.5, 4 0.5, 10 0.5, 10 0.5)')
+
+        # lines of different lengths are matched by closest points
+        line2 = QgsLineString([QgsPoint(2, 2), QgsPoint(6, 2)])
+        self.assertEqual(GeometryUtils.average_linestrings(line1, line2).asWkt(),
+                         'LineString (1 1, 2 1, 6 1, 8 1)')
+
+    def testAverageLinestringsMatchesClosestSegment(self):
+        """
+        Tests that averaging random lines, short and long, matches the original closestSegment() implementation
+        """
+        rng = random.Random(1)
+        for _ in range(200):
+            # vertex counts either side of the threshold for using segment indexes
+            line1 = random_walk(rng, rng.randint(2, 400), 0)
+            line2 = random_walk(rng, rng.randint(2, 400), rng.uniform(-3, 3))
+            weight = rng.choice([1, 3])
+
+            expected = closest_segment_average(line1, line2, weight)
+            averaged = GeometryUtils.average_linestrings(line1, line2, weight)
+            self.assertEqual(averaged.numPoints(), expected.numPoints())
+            for n in range(expected.numPoints()):
+                self.assertAlmostEqual(averaged.xAt(n), expected.xAt(n), 6)
+                self.assertAlmostEqual(averaged.yAt(n), expected.yAt(n), 6)
+
+    def testAverageLinestringsByChainage(self):
+        """
+        Tests averaging many linestrings in a single pass
+        """
+        lines = [QgsLineString([QgsPoint(0, 0), QgsPoint(10, 0)]),
+                 QgsLineString([QgsPoint(10, 2), QgsPoint(5, 2), QgsPoint(0, 2)]),
+                 QgsLineString([QgsPoint(0, 4), QgsPoint(10, 4)])]
+        self.assertEqual(GeometryUtils.average_linestrings_by_chainage(lines, 2.5).asWkt(),
+                         'LineString (0 2, 2.5 2, 5 2, 7.5 2, 10 2)')
+        self.assertEqual(GeometryUtils.average_linestrings_by_chainage(lines, 0).asWkt(),
+                         'LineString (0 2, 10 2)')
+        self.assertTrue(GeometryUtils.average_linestrings_by_chainage([], 1).isEmpty())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(GeometryUtilsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
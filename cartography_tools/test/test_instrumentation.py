@@ -0,0 +1,100 @@
+# coding=utf-8
+"""Instrumentation Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import time
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsProcessingFeedback,
+                       QgsRectangle)
+
+from cartography_tools.core.instrumentation import Instrumentation
+from cartography_tools.core.road_network import RoadNetwork
+
+
+class InstrumentationTest(unittest.TestCase):
+    """Test Instrumentation works."""
+
+    def testPhases(self):
+        """
+        Tests recording statistics for phases
+        """
+        instrumentation = Instrumentation()
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            phase.features += 5
+        with instrumentation.phase(Instrumentation.DETECT) as phase:
+            phase.features += 2
+        with instrumentation.phase(Instrumentation.LOAD) as phase:
+            phase.features += 1
+
+        self.assertEqual(list(instrumentation.phases.keys()), ['load', 'detect'])
+        self.assertEqual(instrumentation.phases['load'].features, 6)
+        self.assertEqual(instrumentation.phases['detect'].features, 2)
+
+        statistics = instrumentation.as_dict()
+        self.assertEqual(statistics['load']['features'], 6)
+        self.assertEqual(statistics['detect']['index_queries'], 0)
+        self.assertGreaterEqual(statistics['load']['time'], 0)
+
+        summary = instrumentation.summary()
+        self.assertEqual(len(summary), 3)
+        self.assertTrue(summary[0].startswith('load: '))
+        self.assertTrue(summary[2].startswith('total: '))
+
+        # should not raise
+        instrumentation.push_summary(QgsProcessingFeedback())
+
+    def testNestedPhases(self):
+        """
+        Tests that time is only counted for the innermost phase
+        """
+        instrumentation = Instrumentation()
+        start = time.perf_counter()
+        with instrumentation.phase(Instrumentation.DETECT):
+            time.sleep(0.01)
+            with instrumentation.phase(Instrumentation.REWRITE):
+                time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        detect = instrumentation.phases['detect'].time
+        rewrite = instrumentation.phases['rewrite'].time
+        self.assertGreaterEqual(detect, 0.01)
+        self.assertGreaterEqual(rewrite, 0.01)
+        self.assertLessEqual(detect + rewrite, elapsed)
+
+    def testIndexQueries(self):
+        """
+        Tests counting index queries
+        """
+        network = RoadNetwork()
+        road = QgsFeature(1)
+        road.setGeometry(QgsGeometry.fromWkt('LineString(0 0, 1 0)'))
+        network.add_road(road)
+        network.roads_in_rect(QgsRectangle(0, 0, 1, 1))
+
+        instrumentation = Instrumentation()
+        instrumentation.track_network(network)
+        with instrumentation.phase(Instrumentation.DETECT):
+            network.roads_in_rect(QgsRectangle(0, 0, 1, 1))
+            network.roads_with_key((), QgsRectangle(0, 0, 1, 1))
+            with instrumentation.phase(Instrumentation.REWRITE):
+                network.roads_in_rect(QgsRectangle(0, 0, 1, 1))
+                instrumentation.add_index_queries(2)
+
+        self.assertEqual(network.query_count, 4)
+        self.assertEqual(instrumentation.phases['detect'].index_queries, 2)
+        self.assertEqual(instrumentation.phases['rewrite'].index_queries, 3)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(InstrumentationTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
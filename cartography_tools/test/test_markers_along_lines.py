@@ -0,0 +1,97 @@
+# coding=utf-8
+"""Place Markers Along Lines Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsVectorLayer)
+
+from cartography_tools.processing.markers_along_lines import PlaceMarkersAlongLinesAlgorithm
+from .utilities import get_qgis_app, run_algorithm
+
+QGIS_APP = get_qgis_app()
+
+
+def line_layer() -> QgsVectorLayer:
+    """
+    Creates a layer with a single part line, a multipart line and a line without a geometry
+    """
+    layer = QgsVectorLayer('MultiLineString?field=name:string', 'lines', 'memory')
+    features = []
+    for name, wkt in (('a', 'MultiLineString((0 0, 10 0))'),
+                      ('b', 'MultiLineString((0 5, 4 5),(10 5, 10 9))'),
+                      ('c', None)):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([name])
+        if wkt:
+            feature.setGeometry(QgsGeometry.fromWkt(wkt))
+        features.append(feature)
+    assert layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class PlaceMarkersAlongLinesTest(unittest.TestCase):
+    """Test PlaceMarkersAlongLinesAlgorithm works."""
+
+    @staticmethod
+    def run_markers(**parameters) -> list:
+        """
+        Runs the algorithm, returning the markers as a sorted list of attributes and coordinates
+        """
+        _, features = run_algorithm(PlaceMarkersAlongLinesAlgorithm(),
+                                    dict({'INPUT': line_layer(),
+                                          'CODE': '"name"'}, **parameters))
+        return sorted((f['name'], f['code'], round(f['rotation'], 6),
+                       round(f.geometry().asPoint().x(), 6), round(f.geometry().asPoint().y(), 6))
+                      for f in features)
+
+    def testDistance(self):
+        """
+        Tests placing markers by distance, along each part of multipart lines
+        """
+        self.assertEqual(self.run_markers(SPACING=PlaceMarkersAlongLinesAlgorithm.SPACING_DISTANCE, DISTANCE=2),
+                         [('a', 'a', 90, 0, 0), ('a', 'a', 90, 2, 0), ('a', 'a', 90, 4, 0),
+                          ('a', 'a', 90, 6, 0), ('a', 'a', 90, 8, 0), ('a', 'a', 90, 10, 0),
+                          ('b', 'b', 0, 10, 5), ('b', 'b', 0, 10, 7), ('b', 'b', 0, 10, 9),
+                          ('b', 'b', 90, 0, 5), ('b', 'b', 90, 2, 5), ('b', 'b', 90, 4, 5)])
+
+    def testStartDistance(self):
+        """
+        Tests that excluding endpoints starts the markers half the spacing along each part
+        """
+        self.assertEqual(self.run_markers(SPACING=PlaceMarkersAlongLinesAlgorithm.SPACING_DISTANCE, DISTANCE=2,
+                                          INCLUDE_ENDPOINTS=False),
+                         [('a', 'a', 90, 1, 0), ('a', 'a', 90, 3, 0), ('a', 'a', 90, 5, 0),
+                          ('a', 'a', 90, 7, 0), ('a', 'a', 90, 9, 0),
+                          ('b', 'b', 0, 10, 6), ('b', 'b', 0, 10, 8),
+                          ('b', 'b', 90, 1, 5), ('b', 'b', 90, 3, 5)])
+
+    def testCount(self):
+        """
+        Tests placing a fixed number of markers along each part
+        """
+        self.assertEqual(self.run_markers(SPACING=PlaceMarkersAlongLinesAlgorithm.SPACING_COUNT, COUNT=3),
+                         [('a', 'a', 90, 0, 0), ('a', 'a', 90, 5, 0), ('a', 'a', 90, 10, 0),
+                          ('b', 'b', 0, 10, 5), ('b', 'b', 0, 10, 7), ('b', 'b', 0, 10, 9),
+                          ('b', 'b', 90, 0, 5), ('b', 'b', 90, 2, 5), ('b', 'b', 90, 4, 5)])
+
+    def testNullGeometry(self):
+        """
+        Tests that features without a geometry are skipped
+        """
+        markers = self.run_markers(SPACING=PlaceMarkersAlongLinesAlgorithm.SPACING_COUNT, COUNT=1)
+        self.assertEqual(markers, [('a', 'a', 90, 5, 0), ('b', 'b', 0, 10, 7), ('b', 'b', 90, 2, 5)])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(PlaceMarkersAlongLinesTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
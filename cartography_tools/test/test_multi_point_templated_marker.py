@@ -0,0 +1,101 @@
+# coding=utf-8
+"""Multi Point Templated Marker Tool Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsPointXY,
+                       QgsVectorLayer)
+from qgis.gui import QgsAdvancedDigitizingDockWidget
+from qgis.PyQt.QtWidgets import QAction
+
+from cartography_tools.tools.multi_point_templated_marker import MultiPointTemplatedMarkerTool
+from .utilities import get_qgis_app
+
+QGIS_APP, CANVAS, IFACE, PARENT = get_qgis_app()
+
+
+class MarkerSettings:  # pylint: disable=missing-function-docstring
+    """
+    Fixed marker settings, in place of the tool's settings widget
+    """
+
+    def __init__(self, code_field: str, rotation_field: str):
+        self._code_field = code_field
+        self._rotation_field = rotation_field
+
+    def code_field(self):
+        return self._code_field
+
+    def code_value(self):
+        return 'a'
+
+    def rotation_field(self):
+        return self._rotation_field
+
+    def marker_count(self):
+        return 3
+
+    def marker_distance(self):
+        return 0
+
+    def orientation(self):
+        return 0
+
+    def is_fixed_distance(self):
+        return False
+
+    def include_endpoints(self):
+        return True
+
+
+class MultiPointTemplatedMarkerToolTest(unittest.TestCase):
+    """Test MultiPointTemplatedMarkerTool works."""
+
+    @staticmethod
+    def create_markers(code_field: str, rotation_field: str) -> QgsVectorLayer:
+        """
+        Creates markers along a line with the tool, returning the marker layer
+        """
+        layer = QgsVectorLayer('Point?field=code:string&field=rotation:double', 'markers', 'memory')
+        layer.startEditing()
+
+        tool = MultiPointTemplatedMarkerTool(CANVAS, QgsAdvancedDigitizingDockWidget(CANVAS), IFACE, QAction(PARENT))
+        tool._layer = layer  # pylint: disable=protected-access
+        tool.widget = MarkerSettings(code_field, rotation_field)
+        tool.points = [QgsPointXY(0, 0), QgsPointXY(10, 0)]
+        tool.create_features()
+        return layer
+
+    def testCreateFeatures(self):
+        """
+        Tests creating markers along a line
+        """
+        IFACE.messageBar().clearWidgets()
+        layer = self.create_markers('code', 'rotation')
+        self.assertEqual(sorted((f['code'], f['rotation'], f.geometry().asWkt()) for f in layer.getFeatures()),
+                         [('a', 90, 'Point (0 0)'), ('a', 90, 'Point (10 0)'), ('a', 90, 'Point (5 0)')])
+        self.assertFalse(IFACE.messageBar().items())
+
+    def testMissingField(self):
+        """
+        Tests that no markers are created if the code or rotation field is missing, and a warning is shown
+        """
+        for code_field, rotation_field in (('missing', 'rotation'), ('code', 'missing')):
+            IFACE.messageBar().clearWidgets()
+            layer = self.create_markers(code_field, rotation_field)
+            self.assertEqual(layer.featureCount(), 0)
+            self.assertEqual(len(IFACE.messageBar().items()), 1)
+            self.assertIn('missing', IFACE.messageBar().currentItem().text())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MultiPointTemplatedMarkerToolTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
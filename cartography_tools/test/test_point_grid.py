@@ -0,0 +1,53 @@
+# coding=utf-8
+"""Point Grid Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import QgsPoint
+
+from cartography_tools.core.point_grid import PointGrid
+
+
+class PointGridTest(unittest.TestCase):
+    """Test PointGrid works."""
+
+    def testExact(self):
+        """
+        Tests matching points exactly
+        """
+        grid = PointGrid()
+        grid.insert(QgsPoint(1, 2), 'a')
+        grid.insert(QgsPoint(1, 2), 'b')
+        grid.insert(QgsPoint(1.0001, 2), 'c')
+
+        self.assertEqual(grid.values_near(QgsPoint(1, 2)), ['a', 'b'])
+        self.assertEqual(grid.values_near(QgsPoint(1.0001, 2)), ['c'])
+        self.assertEqual(grid.values_near(QgsPoint(3, 4)), [])
+
+    def testTolerance(self):
+        """
+        Tests matching points within a tolerance, including across cell boundaries
+        """
+        grid = PointGrid(1)
+        grid.insert(QgsPoint(0.9, 0.9), 'a')
+        grid.insert(QgsPoint(1.1, 1.1), 'b')
+        grid.insert(QgsPoint(2.5, 0.9), 'c')
+        grid.insert(QgsPoint(-0.05, 0), 'd')
+
+        self.assertEqual(sorted(grid.values_near(QgsPoint(1, 1))), ['a', 'b'])
+        self.assertEqual(sorted(grid.values_near(QgsPoint(0, 0))), ['d'])
+        self.assertEqual(sorted(grid.values_near(QgsPoint(2, 1))), ['b', 'c'])
+        self.assertEqual(grid.values_near(QgsPoint(10, 10)), [])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(PointGridTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,59 @@
+# coding=utf-8
+"""Point Rotation Item Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.PyQt.QtCore import (Qt,
+                              QSizeF)
+from qgis.PyQt.QtGui import (QColor,
+                             QImage,
+                             QPainter)
+
+from cartography_tools.tools.point_rotation_item import PointRotationItem
+from .utilities import get_qgis_app
+
+QGIS_APP, CANVAS, IFACE, PARENT = get_qgis_app()
+
+
+class PointRotationItemTest(unittest.TestCase):
+    """Test PointRotationItem works."""
+
+    def testHighDpiSymbol(self):
+        """
+        Tests that a high DPI symbol is centered using its logical size
+        """
+        symbol = QImage(48, 48, QImage.Format.Format_ARGB32_Premultiplied)
+        symbol.fill(QColor(0, 0, 255))
+        symbol.setDevicePixelRatio(2)
+
+        item = PointRotationItem(CANVAS)
+        item.set_symbol(symbol)
+        self.assertEqual(item.symbol_size, QSizeF(24, 24))
+
+        image = QImage(100, 100, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        painter.translate(20, 20)
+        item.paint(painter, None, None)
+        painter.end()
+
+        # the symbol covers the 24x24 logical pixels from the item origin, clear of the arrow and label
+        blue = QColor(0, 0, 255).rgba()
+        self.assertEqual(image.pixel(21, 21), blue)
+        self.assertEqual(image.pixel(42, 42), blue)
+        self.assertEqual(image.pixel(21, 42), blue)
+        self.assertNotEqual(image.pixel(21, 46), blue)
+        self.assertNotEqual(image.pixel(46, 42), blue)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(PointRotationItemTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,86 @@
+# coding=utf-8
+"""Remove Cross Roads Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsVectorLayer)
+
+from cartography_tools.processing.algorithm import RemoveCrossRoadsAlgorithm
+from .utilities import get_qgis_app, run_algorithm
+
+QGIS_APP = get_qgis_app()
+
+
+def road_layer() -> QgsVectorLayer:
+    """
+    Creates a layer with two parallel roads joined by cross roads
+    """
+    layer = QgsVectorLayer('MultiLineString?field=name:string', 'roads', 'memory')
+    features = []
+    for name, wkt in (('main', 'MultiLineString((0 0, 10 0))'),
+                      ('main', 'MultiLineString((10 0, 20 0))'),
+                      ('main', 'MultiLineString((0 1, 10 1))'),
+                      ('main', 'MultiLineString((10 1, 20 1))'),
+                      # cross road between road ends
+                      ('main', 'MultiLineString((10 0, 10 1))'),
+                      # cross road touching the middle of the parallel roads, next to roads ending there
+                      ('main', 'MultiLineString((5 -5, 5 0))'),
+                      ('main', 'MultiLineString((5 1, 5 6))'),
+                      ('main', 'MultiLineString((5 0, 5 1))'),
+                      # short roads which are not cross roads
+                      ('side', 'MultiLineString((15 0, 15 1))'),
+                      ('main', 'MultiLineString((2 0, 2 1))'),
+                      ('main', 'MultiLineString((12 1, 12 1.5))'),
+                      ('main', None)):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([name])
+        if wkt:
+            feature.setGeometry(QgsGeometry.fromWkt(wkt))
+        features.append(feature)
+    assert layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class RemoveCrossRoadsTest(unittest.TestCase):
+    """Test RemoveCrossRoadsAlgorithm works."""
+
+    @staticmethod
+    def run_cross_roads(layer: QgsVectorLayer, low_memory: bool) -> list:
+        """
+        Runs the algorithm, returning the output as a sorted list of attributes and geometry WKT
+        """
+        _, features = run_algorithm(RemoveCrossRoadsAlgorithm(),
+                                    {'INPUT': layer,
+                                     'FIELDS': ['name'],
+                                     'THRESHOLD': 2,
+                                     'LOW_MEMORY': low_memory})
+        return sorted((f.attributes(), f.geometry().asWkt() if f.hasGeometry() else '') for f in features)
+
+    def testLowMemoryMatchesInMemory(self):
+        """
+        Tests that low memory mode removes the same cross roads as holding the network in memory
+        """
+        layer = road_layer()
+        in_memory = self.run_cross_roads(layer, False)
+        self.assertEqual(len(in_memory), layer.featureCount() - 2)
+        self.assertNotIn((['main'], 'MultiLineString ((10 0, 10 1))'), in_memory)
+        self.assertNotIn((['main'], 'MultiLineString ((5 0, 5 1))'), in_memory)
+        self.assertIn((['side'], 'MultiLineString ((15 0, 15 1))'), in_memory)
+        self.assertIn((['main'], ''), in_memory)
+
+        self.assertEqual(self.run_cross_roads(layer, True), in_memory)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RemoveCrossRoadsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Remove Cul-de-sacs Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsProcessingException,
+                       QgsVectorLayer)
+
+from cartography_tools.processing.algorithm import RemoveCuldesacsAlgorithm
+from .utilities import get_qgis_app, run_algorithm
+
+QGIS_APP = get_qgis_app()
+
+
+def road_layer(roads) -> QgsVectorLayer:
+    """
+    Creates a layer of roads from a list of names and WKT geometries
+    """
+    layer = QgsVectorLayer('MultiLineString?field=name:string', 'roads', 'memory')
+    features = []
+    for name, wkt in roads:
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([name])
+        if wkt:
+            feature.setGeometry(QgsGeometry.fromWkt(wkt))
+        features.append(feature)
+    assert layer.dataProvider().addFeatures(features)
+    return layer
+
+
+ROADS = [('main', 'MultiLineString((0 0, 10 0))'),
+         ('top', 'MultiLineString((0 1.5, 10 1.5))'),
+         # joins the interiors of two roads
+         ('connector', 'MultiLineString((8 0, 8 1.5))'),
+         ('spur', 'MultiLineString((5 0, 5 1))'),
+         # a chain of short roads leaving the end of a road, which only becomes a cul-de-sac once
+         # the end of the chain is removed
+         ('chain 1', 'MultiLineString((10 0, 11 0))'),
+         ('chain 2', 'MultiLineString((11 0, 12 0))'),
+         # an isolated multipart road
+         ('isolated', 'MultiLineString((20 20, 20.5 20),(21 20, 21.5 20))'),
+         ('no geometry', None)]
+
+
+class RemoveCuldesacsTest(unittest.TestCase):
+    """Test RemoveCuldesacsAlgorithm works."""
+
+    @staticmethod
+    def run_culdesacs(layer: QgsVectorLayer, iterate: bool) -> list:
+        """
+        Runs the algorithm, returning the sorted names of the remaining roads
+        """
+        _, features = run_algorithm(RemoveCuldesacsAlgorithm(),
+                                    {'INPUT': layer,
+                                     'THRESHOLD': 2,
+                                     'ITERATE': iterate})
+        return sorted(f['name'] for f in features)
+
+    def testSinglePass(self):
+        """
+        Tests removing cul-de-sacs in a single pass
+        """
+        self.assertEqual(self.run_culdesacs(road_layer(ROADS), False),
+                         ['chain 1', 'connector', 'main', 'no geometry', 'top'])
+
+    def testIterate(self):
+        """
+        Tests repeating until no cul-de-sacs remain
+        """
+        self.assertEqual(self.run_culdesacs(road_layer(ROADS), True),
+                         ['connector', 'main', 'no geometry', 'top'])
+
+    def testMultipart(self):
+        """
+        Tests that short multipart roads are rejected, unless they are isolated
+        """
+        layer = road_layer(ROADS + [('multipart', 'MultiLineString((3 0, 3 0.5),(3 0.6, 3 1))')])
+        with self.assertRaises(QgsProcessingException):
+            self.run_culdesacs(layer, False)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RemoveCuldesacsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
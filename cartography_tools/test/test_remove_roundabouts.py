@@ -0,0 +1,116 @@
+# coding=utf-8
+"""Remove Roundabouts Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import math
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsLineString,
+                       QgsPoint,
+                       QgsVectorLayer)
+
+from cartography_tools.processing.algorithm import RemoveRoundaboutsAlgorithm
+from .utilities import get_qgis_app, run_algorithm
+
+QGIS_APP = get_qgis_app()
+
+# spacing of the road grid, and radius of the roundabouts at grid nodes
+SPACING = 10
+RADIUS = 1.5
+
+
+def ring_point(cx: float, cy: float, angle: int) -> QgsPoint:
+    """
+    Returns the point on a roundabout ring at an angle in degrees, exactly on the ring's axes for multiples of 90
+    """
+    offsets = {0: (RADIUS, 0), 90: (0, RADIUS), 180: (-RADIUS, 0), 270: (0, -RADIUS)}
+    if angle % 360 in offsets:
+        dx, dy = offsets[angle % 360]
+    else:
+        dx = RADIUS * math.cos(math.radians(angle))
+        dy = RADIUS * math.sin(math.radians(angle))
+    return QgsPoint(cx + dx, cy + dy)
+
+
+def grid_layer() -> QgsVectorLayer:
+    """
+    Creates a grid of roads, with a roundabout split into four parts at every other grid node
+    """
+    layer = QgsVectorLayer('LineString?field=name:string&field=type:string', 'roads', 'memory')
+    nodes = range(SPACING, 5 * SPACING, SPACING)
+
+    def has_roundabout(x: float, y: float) -> bool:
+        return (x + y) // SPACING % 2 == 0
+
+    def end_point(x: float, y: float, angle: int) -> QgsPoint:
+        return ring_point(x, y, angle) if has_roundabout(x, y) else QgsPoint(x, y)
+
+    features = []
+
+    def add(line: QgsLineString, name: str, road_type: str):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes([name, road_type])
+        feature.setGeometry(QgsGeometry(line))
+        features.append(feature)
+
+    for x in nodes:
+        for y in nodes:
+            if has_roundabout(x, y):
+                for start in range(0, 360, 90):
+                    add(QgsLineString([ring_point(x, y, angle) for angle in range(start, start + 91, 15)]),
+                        '', 'roundabout')
+            if x + SPACING in nodes:
+                add(QgsLineString([end_point(x, y, 0), end_point(x + SPACING, y, 180)]), f'{y} street', 'road')
+            if y + SPACING in nodes:
+                add(QgsLineString([end_point(x, y, 90), end_point(x, y + SPACING, 270)]), f'{x} avenue', 'road')
+
+    # a dead end road leaving a roundabout
+    add(QgsLineString([end_point(SPACING, SPACING, 225), QgsPoint(0, 0)]), 'spur', 'road')
+
+    assert layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class RemoveRoundaboutsTest(unittest.TestCase):
+    """Test RemoveRoundaboutsAlgorithm works."""
+
+    @staticmethod
+    def run_roundabouts(layer: QgsVectorLayer, tile_size: float) -> list:
+        """
+        Runs the algorithm, returning the output as a sorted list of attributes and geometry WKT
+        """
+        _, features = run_algorithm(RemoveRoundaboutsAlgorithm(),
+                                    {'INPUT': layer,
+                                     'EXPRESSION': '"type" = \'roundabout\'',
+                                     'TILE_SIZE': tile_size})
+        return sorted((f.attributes(), f.geometry().asWkt(6)) for f in features)
+
+    def testTiledMatchesSerial(self):
+        """
+        Tests that processing in tiles gives the same result as processing the whole layer,
+        including roundabouts which span tile edges
+        """
+        layer = grid_layer()
+        serial = self.run_roundabouts(layer, 0)
+        self.assertTrue(serial)
+        self.assertFalse([attributes for attributes, _ in serial if attributes[1] == 'roundabout'])
+        # roads leaving roundabouts are moved to the roundabout centroids
+        self.assertIn((['10 street', 'road'], 'LineString (10 10, 20 10)'), serial)
+
+        # the layer extent starts at 0, so tile edges at 10.5 and 21 cross roundabouts
+        for tile_size in (10.5, 7, 25):
+            self.assertEqual(self.run_roundabouts(layer, tile_size), serial, tile_size)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RemoveRoundaboutsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,125 @@
+# coding=utf-8
+"""Road Graph Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsLineString,
+                       QgsMultiLineString,
+                       QgsPoint)
+
+from cartography_tools.core.road_graph import RoadGraph
+
+
+class RoadGraphTest(unittest.TestCase):
+    """Test RoadGraph works."""
+
+    def testExact(self):
+        """
+        Tests building a graph with exact endpoint matching
+        """
+        graph = RoadGraph()
+        graph.add_edge(1, QgsLineString([QgsPoint(0, 0), QgsPoint(1, 0)]))
+        graph.add_edge(2, QgsLineString([QgsPoint(1, 0), QgsPoint(1, 1)]))
+        graph.add_edge(3, QgsLineString([QgsPoint(2, 1), QgsPoint(1, 1)]))
+
+        self.assertEqual(graph.node_count(), 4)
+        self.assertEqual(graph.edge_count(), 3)
+
+        self.assertEqual(graph.edges_at(QgsPoint(0, 0)), [(1, True)])
+        self.assertEqual(sorted(graph.edges_at(QgsPoint(1, 0))), [(1, False), (2, True)])
+        self.assertEqual(sorted(graph.edges_at(QgsPoint(1, 1))), [(2, False), (3, False)])
+        self.assertEqual(graph.edges_at(QgsPoint(1.0000001, 1)), [])
+        # interior of a line is not a node
+        self.assertEqual(graph.edges_at(QgsPoint(0.5, 0)), [])
+
+        start, end = graph.edge_nodes_for(2)
+        self.assertEqual(graph.node_at(QgsPoint(1, 0)), start)
+        self.assertEqual(graph.node_at(QgsPoint(1, 1)), end)
+        self.assertEqual(graph.degree(start), 2)
+        self.assertEqual(graph.degree(graph.node_at(QgsPoint(0, 0))), 1)
+
+    def testClosedAndMultipart(self):
+        """
+        Tests closed and multi-part edges
+        """
+        graph = RoadGraph()
+        graph.add_edge(1, QgsLineString([QgsPoint(0, 0), QgsPoint(1, 0), QgsPoint(0, 1), QgsPoint(0, 0)]))
+        self.assertEqual(graph.edges_at(QgsPoint(0, 0)), [(1, True), (1, False)])
+        self.assertEqual(graph.degree(graph.node_at(QgsPoint(0, 0))), 2)
+
+        multi = QgsMultiLineString()
+        multi.addGeometry(QgsLineString([QgsPoint(5, 5), QgsPoint(6, 5)]))
+        multi.addGeometry(QgsLineString([QgsPoint(7, 5), QgsPoint(8, 5)]))
+        graph.add_edge(2, multi)
+        self.assertEqual(graph.edges_at(QgsPoint(5, 5)), [(2, True)])
+        self.assertEqual(graph.edges_at(QgsPoint(8, 5)), [(2, False)])
+
+    def testRemoveAndUpdate(self):
+        """
+        Tests removing and updating edges
+        """
+        graph = RoadGraph()
+        graph.add_edge(1, QgsLineString([QgsPoint(0, 0), QgsPoint(1, 0)]))
+        graph.add_edge(2, QgsLineString([QgsPoint(1, 0), QgsPoint(1, 1)]))
+
+        graph.remove_edge(1)
+        self.assertFalse(graph.has_edge(1))
+        self.assertEqual(graph.edges_at(QgsPoint(0, 0)), [])
+        self.assertEqual(graph.edges_at(QgsPoint(1, 0)), [(2, True)])
+
+        graph.update_edge(2, QgsLineString([QgsPoint(5, 5), QgsPoint(1, 1)]))
+        self.assertEqual(graph.edges_at(QgsPoint(1, 0)), [])
+        self.assertEqual(graph.edges_at(QgsPoint(5, 5)), [(2, True)])
+        self.assertEqual(graph.edges_at(QgsPoint(1, 1)), [(2, False)])
+        self.assertEqual(graph.edge_count(), 1)
+
+        # removing a missing edge is a no-op
+        graph.remove_edge(10)
+
+    def testRowsReused(self):
+        """
+        Tests that repeatedly updating edges reuses the rows of removed edges
+        """
+        graph = RoadGraph()
+        graph.add_edge(1, QgsLineString([QgsPoint(0, 0), QgsPoint(1, 0)]))
+        graph.add_edge(2, QgsLineString([QgsPoint(1, 0), QgsPoint(1, 1)]))
+        for i in range(100):
+            graph.update_edge(1, QgsLineString([QgsPoint(0, i), QgsPoint(1, 0)]))
+        self.assertEqual(len(graph.edge_ids), 2)
+        self.assertEqual(len(graph.edge_nodes), 4)
+        self.assertEqual(sorted(graph.edges_at(QgsPoint(1, 0))), [(1, False), (2, True)])
+        self.assertEqual(graph.edges_at(QgsPoint(0, 99)), [(1, True)])
+
+        graph.remove_edge(2)
+        graph.add_edge(3, QgsLineString([QgsPoint(1, 1), QgsPoint(2, 2)]))
+        self.assertEqual(len(graph.edge_ids), 2)
+        self.assertEqual(graph.edges_at(QgsPoint(1, 0)), [(1, False)])
+        self.assertEqual(graph.edges_at(QgsPoint(1, 1)), [(3, True)])
+        self.assertEqual(graph.edge_count(), 2)
+
+    def testTolerance(self):
+        """
+        Tests snapping endpoints to nodes
+        """
+        graph = RoadGraph(0.1)
+        graph.add_edge(1, QgsLineString([QgsPoint(0, 0), QgsPoint(1, 0)]))
+        graph.add_edge(2, QgsLineString([QgsPoint(1.05, 0.02), QgsPoint(2, 0)]))
+
+        self.assertEqual(graph.node_count(), 3)
+        self.assertEqual(sorted(graph.edges_at(QgsPoint(1, 0))), [(1, False), (2, True)])
+        # across a cell boundary
+        self.assertEqual(graph.edges_at(QgsPoint(-0.05, 0.01)), [(1, True)])
+        self.assertEqual(graph.edges_at(QgsPoint(0.5, 0)), [])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RoadGraphTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,205 @@
+# coding=utf-8
+"""Road Network Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsFeatureStore,
+                       QgsFeedback,
+                       QgsField,
+                       QgsFields,
+                       QgsGeometry,
+                       QgsRectangle,
+                       QgsVectorLayer)
+from qgis.PyQt.QtCore import QVariant
+
+from cartography_tools.core.road_network import RoadNetwork
+
+
+def make_road(road_id: int, wkt: str, name: str = '') -> QgsFeature:
+    """
+    Creates a road feature from WKT
+    """
+    fields = QgsFields()
+    fields.append(QgsField('name', QVariant.String))
+    road = QgsFeature(fields, road_id)
+    road.setAttributes([name])
+    road.setGeometry(QgsGeometry.fromWkt(wkt))
+    return road
+
+
+class CountingSource:
+    """
+    A feature source which counts the number of times its features are read
+    """
+
+    def __init__(self, layer: QgsVectorLayer):
+        self.layer = layer
+        self.reads = 0
+
+    def featureCount(self) -> int:  # pylint: disable=missing-function-docstring
+        return self.layer.featureCount()
+
+    def getFeatures(self, *args):  # pylint: disable=missing-function-docstring
+        self.reads += 1
+        return self.layer.getFeatures(*args)
+
+
+class RoadNetworkTest(unittest.TestCase):
+    """Test RoadNetwork works."""
+
+    def testModify(self):
+        """
+        Tests that the index and graph are kept in sync with the roads
+        """
+        network = RoadNetwork()
+        network.add_road(make_road(1, 'LineString(0 0, 1 0)'))
+        network.add_road(make_road(2, 'LineString(1 0, 1 1)'))
+        self.assertEqual(network.next_id(), 3)
+        self.assertEqual(sorted(network.index.intersects(QgsRectangle(0.5, -1, 2, 2))), [1, 2])
+        self.assertEqual(network.graph.degree(network.graph.edge_nodes_for(1)[1]), 2)
+
+        network.set_road_geometry(2, QgsGeometry.fromWkt('LineString(5 5, 6 6)'))
+        self.assertEqual(network.index.intersects(QgsRectangle(0.5, -1, 2, 2)), [1])
+        self.assertEqual(network.graph.degree(network.graph.edge_nodes_for(1)[1]), 1)
+        self.assertEqual(network.roads[2].geometry().asWkt(), 'LineString (5 5, 6 6)')
+
+        network.remove_road(1)
+        self.assertEqual(list(network.roads.keys()), [2])
+        self.assertFalse(network.index.intersects(QgsRectangle(0.5, -1, 2, 2)))
+        self.assertFalse(network.graph.has_edge(1))
+
+    def testExplodeMultipart(self):
+        """
+        Tests exploding multipart roads
+        """
+        network = RoadNetwork()
+        network.add_road(make_road(1, 'LineString(0 0, 1 0)'))
+        network.add_road(make_road(2, 'MultiLineString((1 0, 1 1),(2 2, 3 3))'))
+        network.add_road(make_road(3, 'LineString(3 3, 4 4)'))
+        network.explode_multipart()
+
+        self.assertEqual(list(network.roads.keys()), [1, 4, 5, 3])
+        self.assertEqual(network.roads[5].geometry().asWkt(), 'LineString (2 2, 3 3)')
+        self.assertEqual(network.graph.edge_count(), 4)
+        self.assertFalse(network.graph.has_edge(2))
+        self.assertEqual(sorted(network.index.intersects(QgsRectangle(2.5, 2.5, 3.5, 3.5))), [3, 5])
+
+    def testRecords(self):
+        """
+        Tests that cached road records are kept in sync with the roads
+        """
+        network = RoadNetwork()
+        network.add_road(make_road(1, 'LineString(0 0, 3 0)'))
+        network.add_road(make_road(2, 'MultiLineString((1 0, 1 1),(2 2, 3 3))'))
+        network.add_road(make_road(3, 'MultiLineString((5 5, 5 6))'))
+
+        record = network.records[1]
+        self.assertEqual(record.length, 3)
+        self.assertEqual(record.bbox, QgsRectangle(0, 0, 3, 0))
+        self.assertEqual(record.line.asWkt(), 'LineString (0 0, 3 0)')
+        self.assertEqual((record.start.x(), record.start.y()), (0, 0))
+        self.assertEqual((record.end.x(), record.end.y()), (3, 0))
+        self.assertIsNone(network.records[2].line)
+        self.assertIsNone(network.records[2].start)
+        self.assertEqual(network.records[3].line.asWkt(), 'LineString (5 5, 5 6)')
+
+        network.set_road_geometry(1, QgsGeometry.fromWkt('LineString(0 0, 0 5)'))
+        self.assertEqual(network.records[1].length, 5)
+        self.assertEqual((network.records[1].end.x(), network.records[1].end.y()), (0, 5))
+
+        network.explode_multipart()
+        self.assertNotIn(2, network.records)
+        self.assertEqual(sorted(network.records.keys()), sorted(network.roads.keys()))
+
+        network.remove_road(1)
+        self.assertNotIn(1, network.records)
+
+    def testKeys(self):
+        """
+        Tests partitioning roads by key
+        """
+        network = RoadNetwork()
+        network.add_road(make_road(1, 'LineString(0 0, 1 0)', 'a'))
+        network.add_road(make_road(2, 'LineString(1 0, 1 1)', 'b'))
+        self.assertIsNone(network.road_key(1))
+
+        network.set_key_fields([0])
+        network.add_road(make_road(3, 'LineString(1 1, 2 1)', 'a'))
+        self.assertEqual(network.road_key(1), ('a',))
+        self.assertEqual(network.road_key(3), ('a',))
+        rect = QgsRectangle(-1, -1, 3, 3)
+        self.assertEqual(sorted(network.roads_with_key(('a',), rect)), [1, 3])
+        self.assertEqual(network.roads_with_key(('b',), rect), [2])
+        self.assertFalse(network.roads_with_key(('c',), rect))
+
+        network.set_road_geometry(3, QgsGeometry.fromWkt('LineString(5 5, 6 6)'))
+        self.assertEqual(network.roads_with_key(('a',), rect), [1])
+        network.remove_road(1)
+        self.assertFalse(network.roads_with_key(('a',), rect))
+
+        # no key fields
+        network.set_key_fields([])
+        self.assertEqual(network.road_key(2), ())
+        self.assertEqual(network.roads_with_key((), rect), [2])
+
+    def testNullGeometry(self):
+        """
+        Tests that roads without a geometry are kept out of the network, but written to the output
+        """
+        layer = QgsVectorLayer('LineString?field=name:string', 'roads', 'memory')
+        no_geometry = make_road(2, 'LineString(0 0, 1 0)', 'b')
+        no_geometry.clearGeometry()
+        empty_geometry = make_road(3, 'LineString(0 0, 1 0)', 'c')
+        empty_geometry.setGeometry(QgsGeometry.fromWkt('LineString EMPTY'))
+        self.assertTrue(layer.dataProvider().addFeatures([make_road(1, 'LineString(0 0, 1 0)', 'a'),
+                                                          no_geometry,
+                                                          empty_geometry]))
+
+        network = RoadNetwork.from_source(layer, 0, QgsFeedback())
+        self.assertEqual(list(network.roads.keys()), [1])
+        self.assertEqual(sorted(network.null_roads.keys()), [2, 3])
+        self.assertEqual(network.graph.edge_count(), 1)
+        self.assertEqual(network.index.intersects(QgsRectangle(-1, -1, 2, 2)), [1])
+        self.assertEqual(network.next_id(), 4)
+
+        network.add_road(make_road(4, 'LineString(1 0, 1 1)', 'd'))
+        network.add_road(no_geometry)
+        self.assertEqual(sorted(network.roads.keys()), [1, 4])
+        self.assertEqual(network.graph.edge_count(), 2)
+
+        store = QgsFeatureStore()
+        network.write_to_sink(store, QgsFeedback())
+        self.assertEqual(sorted(f['name'] for f in store.features()), ['a', 'b', 'c', 'd'])
+
+    def testFromSource(self):
+        """
+        Tests that loading a network reads the source once, and indexes only roads with a geometry
+        """
+        layer = QgsVectorLayer('LineString?field=name:string', 'roads', 'memory')
+        no_geometry = make_road(2, 'LineString(0 0, 1 0)', 'b')
+        no_geometry.clearGeometry()
+        self.assertTrue(layer.dataProvider().addFeatures([make_road(1, 'LineString(0 0, 1 0)', 'a'),
+                                                          no_geometry,
+                                                          make_road(3, 'LineString(1 0, 1 1)', 'c')]))
+        source = CountingSource(layer)
+
+        network = RoadNetwork.from_source(source, 0, QgsFeedback())
+        self.assertEqual(source.reads, 1)
+        self.assertEqual(list(network.roads.keys()), [1, 3])
+        self.assertEqual(list(network.null_roads.keys()), [2])
+        self.assertEqual(sorted(network.index.intersects(QgsRectangle(-10, -10, 10, 10))), [1, 3])
+        self.assertEqual(network.index.intersects(QgsRectangle(0.9, 0.5, 1.1, 1.5)), [3])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RoadNetworkTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,48 @@
+# coding=utf-8
+"""Segment Index Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsLineString,
+                       QgsPoint)
+
+from cartography_tools.core.segment_index import SegmentIndex
+
+
+class SegmentIndexTest(unittest.TestCase):
+    """Test SegmentIndex works."""
+
+    def testClosestPoint(self):
+        """
+        Tests finding the closest point on a line
+        """
+        index = SegmentIndex(QgsLineString([QgsPoint(0, 0), QgsPoint(10, 0), QgsPoint(10, 10), QgsPoint(0, 10)]))
+        self.assertEqual(index.cumulative_length, [0, 10, 20, 30])
+        self.assertEqual(index.closest_point(4, -1), (4, 0, 4))
+        self.assertEqual(index.closest_point(12, 5), (10, 5, 15))
+        self.assertEqual(index.closest_point(3, 8), (3, 10, 27))
+        self.assertEqual(index.closest_point(-5, -5), (0, 0, 0))
+
+        # the point is inside the bounding box of the diagonal segment, but closest to the last segment
+        index = SegmentIndex(QgsLineString([QgsPoint(0, 0), QgsPoint(10, 10), QgsPoint(0, 10)]))
+        self.assertEqual(index.closest_point(2, 8)[:2], (2, 10))
+
+    def testSinglePoint(self):
+        """
+        Tests a line with a single vertex
+        """
+        index = SegmentIndex(QgsLineString([QgsPoint(1, 2)]))
+        self.assertEqual(index.closest_point(5, 5), (1, 2, 0))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SegmentIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,75 @@
+# coding=utf-8
+"""Sprite Cache Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.PyQt.QtCore import QPointF
+from qgis.PyQt.QtGui import QImage
+
+from cartography_tools.gui.sprite_cache import SpriteCache
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class SpriteCacheTest(unittest.TestCase):
+    """Test SpriteCache works."""
+
+    def testSprite(self):
+        """
+        Tests generating and caching rotated sprites
+        """
+        image = QImage(40, 20, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(0)
+
+        cache = SpriteCache()
+        sprite = cache.sprite(image, 0)
+        self.assertEqual((sprite.width(), sprite.height()), (40, 20))
+        # angles are quantized, so these should be served from the cache
+        self.assertEqual(cache.sprite(image, 0.2).cacheKey(), sprite.cacheKey())
+        self.assertEqual(cache.sprite(image, 360).cacheKey(), sprite.cacheKey())
+
+        sprite = cache.sprite(image, 90)
+        self.assertEqual((sprite.width(), sprite.height()), (20, 40))
+        self.assertEqual(SpriteCache.sprite_origin(sprite, QPointF(50, 50)), QPointF(40, 30))
+
+        # sprites keep the resolution of high DPI images, rather than being scaled up
+        image = QImage(80, 40, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(0)
+        image.setDevicePixelRatio(2)
+        sprite = cache.sprite(image, 90)
+        self.assertEqual((sprite.width(), sprite.height()), (40, 80))
+        self.assertEqual(sprite.devicePixelRatio(), 2)
+        self.assertEqual(SpriteCache.sprite_origin(sprite, QPointF(50, 50)), QPointF(40, 30))
+
+    def testEviction(self):
+        """
+        Tests that the least recently used sprites are discarded
+        """
+        image = QImage(20, 20, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(0)
+
+        cache = SpriteCache()
+        # room for two 20x20 sprites, which right angle rotations keep the size of
+        cache.MAX_BYTES = 2 * 20 * 20 * 4
+        first = cache.sprite(image, 0)
+        cache.sprite(image, 90)
+        # use the first sprite again, so that the second is the least recently used
+        cache.sprite(image, 0)
+        cache.sprite(image, 180)
+
+        self.assertEqual(len(cache._sprites), 2)  # pylint: disable=protected-access
+        self.assertEqual(cache.sprite(image, 0).cacheKey(), first.cacheKey())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SpriteCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,80 @@
+# coding=utf-8
+"""Symbol Preview Cache Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+import unittest
+
+from qgis.core import (QgsFeature,
+                       QgsMarkerSymbol,
+                       QgsProperty,
+                       QgsRectangle,
+                       QgsSingleSymbolRenderer,
+                       QgsVectorLayer)
+
+from cartography_tools.gui.symbol_preview_cache import SymbolPreviewCache
+from .utilities import get_qgis_app
+
+QGIS_APP, CANVAS, IFACE, PARENT = get_qgis_app()
+
+
+class SymbolPreviewCacheTest(unittest.TestCase):
+    """Test SymbolPreviewCache works."""
+
+    def testPreviewImage(self):
+        """
+        Tests caching preview images, and invalidating them when the renderer changes
+        """
+        layer = QgsVectorLayer('Point?field=code:string', 'markers', 'memory')
+        feature = QgsFeature(layer.fields())
+        feature['code'] = 'a'
+
+        cache = SymbolPreviewCache()
+        image = cache.preview_image(layer, feature, 'a', CANVAS)
+        self.assertFalse(image.isNull())
+        self.assertEqual(cache.preview_image(layer, feature, 'a', CANVAS).cacheKey(), image.cacheKey())
+
+        feature['code'] = 'b'
+        self.assertNotEqual(cache.preview_image(layer, feature, 'b', CANVAS).cacheKey(), image.cacheKey())
+
+        layer.setRenderer(QgsSingleSymbolRenderer(QgsMarkerSymbol.createSimple({'color': '255,0,0'})))
+        feature['code'] = 'a'
+        self.assertNotEqual(cache.preview_image(layer, feature, 'a', CANVAS).cacheKey(), image.cacheKey())
+
+    def testDataDefinedSymbol(self):
+        """
+        Tests that images for data defined symbols are keyed by the attributes they use and the map scale
+        """
+        layer = QgsVectorLayer('Point?field=code:string&field=size:double&field=note:string', 'markers', 'memory')
+        symbol = QgsMarkerSymbol.createSimple({'color': '255,0,0'})
+        symbol.setDataDefinedSize(QgsProperty.fromField('size'))
+        layer.setRenderer(QgsSingleSymbolRenderer(symbol))
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes(['a', 2, 'x'])
+
+        CANVAS.setExtent(QgsRectangle(0, 0, 10, 10))
+        cache = SymbolPreviewCache()
+        image = cache.preview_image(layer, feature, 'a', CANVAS)
+
+        # attributes which the renderer doesn't use don't affect the image
+        feature['note'] = 'y'
+        self.assertEqual(cache.preview_image(layer, feature, 'a', CANVAS).cacheKey(), image.cacheKey())
+
+        feature['size'] = 8
+        larger = cache.preview_image(layer, feature, 'a', CANVAS)
+        self.assertNotEqual(larger.cacheKey(), image.cacheKey())
+        self.assertNotEqual(larger, image)
+
+        CANVAS.setExtent(QgsRectangle(0, 0, 100, 100))
+        self.assertNotEqual(cache.preview_image(layer, feature, 'a', CANVAS).cacheKey(), larger.cacheKey())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SymbolPreviewCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -6,7 +6,9 @@ import logging
 import os
 import atexit
 
-from qgis.core import QgsApplication
+from qgis.core import (QgsApplication,
+                       QgsProcessingContext,
+                       QgsProcessingFeedback)
 from qgis.utils import iface
 from qgis.gui import QgsMapCanvas
 from qgis.PyQt.QtCore import QSize
@@ -102,3 +104,21 @@ def get_qgis_app(cleanup=True):
         IFACE = QgisInterface(CANVAS)
 
     return QGISAPP, CANVAS, IFACE, PARENT
+
+
+def run_algorithm(algorithm, parameters: dict):
+    """
+    Runs a processing algorithm with its OUTPUT parameter set to a temporary layer.
+
+    :returns: The algorithm results and a list of the features in the output layer.
+        Exceptions raised by the algorithm are not caught.
+    """
+    if not algorithm.parameterDefinitions():
+        algorithm.initAlgorithm()
+
+    context = QgsProcessingContext()
+    results, ok = algorithm.run(dict(parameters, OUTPUT='memory:'), context, QgsProcessingFeedback(),
+                                catchExceptions=False)
+    assert ok
+    layer = context.takeResultLayer(results['OUTPUT'])
+    return results, list(layer.getFeatures())
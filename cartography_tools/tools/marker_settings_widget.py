@@ -9,15 +9,14 @@ the Free Software Foundation; either version 2 of the License, or
 from qgis.PyQt import uic
 from qgis.PyQt.QtCore import QSize, pyqtSignal
 from qgis.PyQt.QtGui import QFontMetrics
-from qgis.PyQt.QtWidgets import QSizePolicy
+from qgis.PyQt.QtWidgets import QComboBox, QSizePolicy
 from qgis.core import (
     QgsFieldProxyModel,
     QgsVectorLayer,
-    QgsCategorizedSymbolRenderer,
-    QgsSymbolLayerUtils,
-    NULL
+    QgsCategorizedSymbolRenderer
 )
 
+from cartography_tools.gui.category_code_model import CategoryCodeCompleter, CategoryCodeModel
 from cartography_tools.gui.gui_utils import GuiUtils
 
 WIDGET, BASE = uic.loadUiType(
@@ -35,7 +34,16 @@ class MarkerSettingsWidget(BASE, WIDGET):
         super(MarkerSettingsWidget, self).__init__(parent)
         self.setupUi(self)
 
+        # category icons are only rendered for visible rows, so avoid anything which needs the
+        # icons or sizes for every row (such as sizing the combo to its contents)
+        icon_size = GuiUtils.scale_icon_size(16)
+        self.code_model = CategoryCodeModel(icon_size, self)
+        self.code_combo.setModel(self.code_model)
+        self.code_combo.setIconSize(QSize(icon_size, icon_size))
+        self.code_combo.view().setUniformItemSizes(True)
         self.code_combo.setEditable(True)
+        self.code_combo.setCompleter(CategoryCodeCompleter(self.code_model, self.code_combo))
+        self.code_combo.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
         self.code_combo.setSizePolicy(QSizePolicy.Policy.MinimumExpanding, QSizePolicy.Policy.Preferred)
         self.code_combo.setMinimumWidth(QFontMetrics(self.font()).horizontalAdvance('X') * 40)
 
@@ -133,12 +141,7 @@ class MarkerSettingsWidget(BASE, WIDGET):
             self.set_code_value(prev_code)
 
     def set_code_value(self, value):
-        index = -1
-
-        for i in range(self.code_combo.count()):
-            if self.code_combo.itemData(i) == value:
-                index = i
-                break
+        index = self.code_model.row_for_value(value)
 
         if index >= 0:
             self.code_combo.setCurrentIndex(index)
@@ -149,25 +152,12 @@ class MarkerSettingsWidget(BASE, WIDGET):
         if not self.layer:
             return
 
-        icon_size = GuiUtils.scale_icon_size(16)
-
         renderer = self.layer.renderer()
         if isinstance(renderer, QgsCategorizedSymbolRenderer):
             prev_value = self.code_combo.currentText()
-            self.code_combo.clear()
-
-            prev_index = -1
-
-            for category in renderer.categories():
-                if category.value() is not None and category.value() != NULL:
-                    if category.value() == prev_value:
-                        prev_index = self.code_combo.count()
-                    icon = QgsSymbolLayerUtils.symbolPreviewIcon(category.symbol(), QSize(icon_size, icon_size))
-
-                    item_label = f'{category.label()} - ({category.value()})' if category.label() != category.value() else category.value()
-                    self.code_combo.addItem(icon, item_label)
-                    self.code_combo.setItemData(self.code_combo.count() - 1, category.value())
+            self.code_model.set_categories(renderer.categories())
 
+            prev_index = self.code_model.row_for_value(prev_value)
             if prev_index >= 0:
                 self.code_combo.setCurrentIndex(prev_index)
             else:
@@ -249,12 +239,7 @@ class MarkerSettingsWidget(BASE, WIDGET):
 
     def code_value(self):
         text = self.code_combo.currentText()
-
-        for i in range(self.code_combo.count()):
-            if self.code_combo.itemText(i) == text:
-                return self.code_combo.itemData(i) or text
-        else:
-            return text
+        return self.code_model.value_for_label(text) or text
 
     def rotation_field(self):
         return self.field_rotation_combo.currentField()
@@ -18,11 +18,7 @@ from qgis.core import (
     QgsFeature,
     QgsGeometry,
     QgsPointXY,
-    QgsRenderContext,
-    QgsExpressionContextUtils,
-    QgsProperty,
     QgsApplication,
-    QgsSymbol,
     QgsPoint
 )
 from qgis.gui import (
@@ -31,7 +27,7 @@ from qgis.gui import (
 )
 
 from cartography_tools.core.geometry import GeometryUtils
-from cartography_tools.gui.gui_utils import GuiUtils
+from cartography_tools.gui.symbol_preview_cache import SymbolPreviewCache
 from cartography_tools.tools.map_tool import Tool
 from cartography_tools.tools.marker_settings_widget import MarkerSettingsWidget
 from cartography_tools.tools.points_along_line_item import PointsAlongLineItem
@@ -84,29 +80,8 @@ class MultiPointTemplatedMarkerTool(Tool):
 
     def set_line_item_symbol(self):
         f = self.create_point_feature()
-
-        # find symbol for feature
-        renderer = self.current_layer().renderer().clone()
-        context = QgsRenderContext.fromMapSettings(self.canvas().mapSettings())
-        context.expressionContext().appendScope(QgsExpressionContextUtils.layerScope(self.current_layer()))
-        context.expressionContext().setFeature(f)
-
-        renderer.startRender(context, self.current_layer().fields())
-        symbol = renderer.originalSymbolForFeature(f, context)
-        if symbol is None:
-            # e.g. code which doesn't match existing category
-            if len(renderer.symbols(context)):
-                symbol = renderer.symbols(context)[0]
-            else:
-                symbol = QgsSymbol.defaultSymbol(self.current_layer().geometryType())
-
-        renderer.stopRender(context)
-
-        # clear existing data defined rotation
-        symbol.setDataDefinedAngle(QgsProperty())
-
-        # render symbol to image
-        symbol_image = GuiUtils.big_marker_preview_image(symbol, context.expressionContext())
+        symbol_image = SymbolPreviewCache.instance().preview_image(
+            self.current_layer(), f, self.widget.code_value() if self.widget.code_field() else None, self.canvas())
         self.line_item.set_symbol(symbol_image)
         self.line_item.update()
 
@@ -193,24 +168,60 @@ class MultiPointTemplatedMarkerTool(Tool):
             self.remove_line_item()
 
     def create_features(self):
-        if not self.current_layer():
+        """
+        Creates marker features along the digitized line.
+
+        The features are built in a single pass and added with a single addFeatures call, so
+        that lines with thousands of markers don't stall the canvas. The caller is responsible
+        for repainting the layer.
+
+        If the code or rotation field is missing from the layer, a warning is shown in the
+        message bar and no markers are created.
+        """
+        layer = self.current_layer()
+        if not layer:
             return
 
-        res = GeometryUtils.generate_rotated_points_along_path(self.points,
-                                                               point_count=self.fixed_number_points or (
-                                                                   self.widget.marker_count() if not self.widget.is_fixed_distance() else None),
-                                                               point_distance=self.widget.marker_distance() if not self.fixed_number_points and self.widget.is_fixed_distance() else None,
-                                                               orientation=-self.widget.orientation(),
-                                                               include_endpoints=self.widget.include_endpoints())
-        if not res:
+        xs, ys, angles = GeometryUtils.generate_rotated_point_arrays_along_path(
+            self.points,
+            point_count=self.fixed_number_points or (
+                self.widget.marker_count() if not self.widget.is_fixed_distance() else None),
+            point_distance=self.widget.marker_distance() if not self.fixed_number_points and self.widget.is_fixed_distance() else None,
+            orientation=-self.widget.orientation(),
+            include_endpoints=self.widget.include_endpoints())
+        if not xs:
             return
 
-        self.current_layer().beginEditCommand(self.tr('Create Markers Along Line'))
-        for point, angle in res:
-            f = self.create_point_feature(point=point, angle=angle)
-            self.current_layer().addFeature(f)
-        self.current_layer().endEditCommand()
-        self.current_layer().triggerRepaint()
+        fields = layer.fields()
+        code_field = self.widget.code_field()
+        code_index = fields.lookupField(code_field) if code_field else -1
+        rotation_field = self.widget.rotation_field()
+        rotation_index = fields.lookupField(rotation_field) if rotation_field else -1
+        for field, index in ((code_field, code_index), (rotation_field, rotation_index)):
+            if field and index < 0:
+                self.iface.messageBar().pushWarning(self.tr('Create Markers Along Line'),
+                                                    self.tr('Field {} does not exist in layer {}').format(
+                                                        field, layer.name()))
+                return
+
+        # the attributes are the same for every marker, except for the rotation
+        attributes = QgsFeature(fields).attributes()
+        if code_index >= 0:
+            attributes[code_index] = self.widget.code_value()
+
+        features = []
+        for x, y, angle in zip(xs, ys, angles):
+            if rotation_index >= 0:
+                attributes[rotation_index] = angle
+
+            f = QgsFeature(fields)
+            f.setAttributes(attributes)
+            f.setGeometry(QgsGeometry(QgsPoint(x, y)))
+            features.append(f)
+
+        layer.beginEditCommand(self.tr('Create Markers Along Line'))
+        layer.addFeatures(features)
+        layer.endEditCommand()
 
     def keyPressEvent(self, e):
         if (self.points or self.line_segment_start is not None) and e.key() == Qt.Key.Key_Escape and not e.isAutoRepeat():
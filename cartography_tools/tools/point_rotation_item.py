@@ -13,6 +13,7 @@ from qgis.gui import QgsMapCanvasItem
 
 from qgis.PyQt.QtCore import (
     Qt,
+    QPointF,
     QSizeF
 )
 from qgis.PyQt.QtGui import (
@@ -28,6 +29,7 @@ from qgis.PyQt.QtGui import (
 )
 
 from cartography_tools.gui.gui_utils import GuiUtils
+from cartography_tools.gui.sprite_cache import SpriteCache
 
 
 class PointRotationItem(QgsMapCanvasItem):
@@ -40,6 +42,9 @@ class PointRotationItem(QgsMapCanvasItem):
 
         self.rotation = 0
         self.pixmap = QPixmap()
+        # size of the symbol in logical (device independent) pixels
+        self.symbol_size = QSizeF()
+        self.symbol_image = QImage()
         self.item_size = QSizeF()
 
         self.marker_font = QFont()
@@ -59,21 +64,26 @@ class PointRotationItem(QgsMapCanvasItem):
         painter.save()
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
 
-        # do a bit of trigonometry to find out how to transform a rotated item such
-        # that the center point is at the point feature
+        # draw the pre-rotated symbol, centered on the point feature
+        sprite = SpriteCache.instance().sprite(self.symbol_image, self.rotation)
+        painter.drawPixmap(SpriteCache.sprite_origin(sprite, QPointF(self.symbol_size.width() / 2.0,
+                                                                     self.symbol_size.height() / 2.0)),
+                           sprite)
+
+        # do a bit of trigonometry to find out how to transform the rotated arrow such
+        # that its center point is at the point feature
         x = 0.0
         y = 0.0
 
-        if self.pixmap.width() > 0 and self.pixmap.height() > 0:
+        if self.symbol_size.width() > 0 and self.symbol_size.height() > 0:
             half_item_diagonal = math.sqrt(
-                self.pixmap.width() * self.pixmap.width() + self.pixmap.height() * self.pixmap.height()) / 2
-            diagonal_angle = math.acos(self.pixmap.width() / (half_item_diagonal * 2)) * 180 / math.pi
+                self.symbol_size.width() * self.symbol_size.width() + self.symbol_size.height() * self.symbol_size.height()) / 2
+            diagonal_angle = math.acos(self.symbol_size.width() / (half_item_diagonal * 2)) * 180 / math.pi
             x = half_item_diagonal * math.cos((self.rotation - diagonal_angle) * math.pi / 180)
             y = half_item_diagonal * math.sin((self.rotation - diagonal_angle) * math.pi / 180)
 
         painter.rotate(self.rotation)
-        painter.translate(x - self.pixmap.width() / 2.0, -y - self.pixmap.height() / 2.0)
-        painter.drawPixmap(0, 0, self.pixmap)
+        painter.translate(x - self.symbol_size.width() / 2.0, -y - self.symbol_size.height() / 2.0)
 
         # draw arrow, using a red line over a thicker white line so that the arrow is visible
         # against a range of backgrounds
@@ -97,7 +107,7 @@ class PointRotationItem(QgsMapCanvasItem):
         buffer_pen.setWidthF(GuiUtils.scale_icon_size(4))
         fm = QFontMetricsF(self.marker_font)
         label = QPainterPath()
-        label.addText(self.pixmap.width(), self.pixmap.height() / 2.0 + fm.height() / 2.0, self.marker_font,
+        label.addText(self.symbol_size.width(), self.symbol_size.height() / 2.0 + fm.height() / 2.0, self.marker_font,
                       str(round(self.rotation, 1)))
         painter.setPen(buffer_pen)
         painter.setBrush(Qt.BrushStyle.NoBrush)
@@ -110,30 +120,32 @@ class PointRotationItem(QgsMapCanvasItem):
 
     def set_point_location(self, p):
         transformed_point = self.toCanvasCoordinates(p)
-        self.setPos(transformed_point.x() - self.pixmap.width() / 2.0,
-                    transformed_point.y() - self.pixmap.height() / 2.0)
+        self.setPos(transformed_point.x() - self.symbol_size.width() / 2.0,
+                    transformed_point.y() - self.symbol_size.height() / 2.0)
 
     def set_symbol_rotation(self, rotation: float):
         self.rotation = rotation
 
     def set_symbol(self, symbol_image: QImage):
+        self.symbol_image = symbol_image
         self.pixmap = QPixmap.fromImage(symbol_image)
+        self.symbol_size = QSizeF(self.pixmap.width(), self.pixmap.height()) / self.pixmap.devicePixelRatio()
         fm = QFontMetricsF(self.marker_font)
 
         # set item size
-        self.item_size.setWidth(self.pixmap.width() + fm.horizontalAdvance("360"))
+        self.item_size.setWidth(self.symbol_size.width() + fm.horizontalAdvance("360"))
 
-        pixmap_height = self.pixmap.height()
+        pixmap_height = self.symbol_size.height()
         font_height = fm.height()
         if pixmap_height >= font_height:
-            self.item_size.setHeight(self.pixmap.height())
+            self.item_size.setHeight(self.symbol_size.height())
         else:
             self.item_size.setHeight(fm.height())
 
-        half_item_width = self.pixmap.width() / 2.0
+        half_item_width = self.symbol_size.width() / 2.0
         self.arrow_path = QPainterPath()
         self.arrow_path.moveTo(half_item_width, pixmap_height)
         self.arrow_path.lineTo(half_item_width, 0)
-        self.arrow_path.moveTo(self.pixmap.width() * 0.25, pixmap_height * 0.25)
+        self.arrow_path.moveTo(self.symbol_size.width() * 0.25, pixmap_height * 0.25)
         self.arrow_path.lineTo(half_item_width, 0)
-        self.arrow_path.lineTo(self.pixmap.width() * 0.75, pixmap_height * 0.25)
+        self.arrow_path.lineTo(self.symbol_size.width() * 0.75, pixmap_height * 0.25)
@@ -10,7 +10,8 @@ the Free Software Foundation; either version 2 of the License, or
 from typing import Optional
 
 from qgis.PyQt.QtCore import (
-    Qt
+    Qt,
+    QPointF
 )
 from qgis.PyQt.QtGui import (
     QImage,
@@ -29,6 +30,7 @@ from qgis.gui import QgsMapCanvasItem
 from cartography_tools.core.geometry import GeometryUtils
 from cartography_tools.core.utils import Utils
 from cartography_tools.gui.gui_utils import GuiUtils
+from cartography_tools.gui.sprite_cache import SpriteCache
 
 
 class PointsAlongLineItem(QgsMapCanvasItem):
@@ -44,6 +46,7 @@ class PointsAlongLineItem(QgsMapCanvasItem):
         self.orientation = 0
         self.include_endpoints = True
         self.pixmap = QPixmap()
+        self.symbol_image = QImage()
 
         im = QImage(24, 24, QImage.Format.Format_ARGB32)
         im.fill(Qt.GlobalColor.transparent)
@@ -63,9 +66,56 @@ class PointsAlongLineItem(QgsMapCanvasItem):
         self.marker_count = 2
         self.marker_distance = None
 
+        # cached path through the unique committed points, as map coordinate, cumulative length
+        # and segment azimuth lists plus a painter path in canvas coordinates. Only the final
+        # hover segment is recalculated when the mouse moves.
+        self._path_x = None
+        self._path_y = None
+        self._path_lengths = None
+        self._path_angles = None
+        self._path_point_set = None
+        self._canvas_path = None
+        # cached pixel bounds of the committed points
+        self._points_rect = None
+
         self.update_rect()
         self.update()
 
+    def invalidate_cache(self):
+        """
+        Clears the cached path, which will be rebuilt on the next paint
+        """
+        self._path_x = None
+        self._points_rect = None
+        self.update()
+
+    def _update_cache(self):
+        """
+        Rebuilds the cached path through the committed points
+        """
+        self._path_x = []
+        self._path_y = []
+        self._path_lengths = []
+        self._path_angles = []
+        self._canvas_path = QPainterPath()
+
+        unique_points = Utils.unique_ordered_list(self.points)
+        self._path_point_set = set(unique_points)
+        for p in unique_points:
+            GeometryUtils.append_path_vertex(self._path_x, self._path_y, self._path_lengths, self._path_angles,
+                                             p.x(), p.y())
+            self._add_canvas_vertex(self._canvas_path, p)
+
+    def _add_canvas_vertex(self, path: QPainterPath, point: QgsPointXY):
+        """
+        Adds a map point to the end of a painter path in canvas coordinates
+        """
+        canvas_point = QPointF(self.toCanvasCoordinates(point))
+        if path.elementCount():
+            path.lineTo(canvas_point)
+        else:
+            path.moveTo(canvas_point)
+
     def set_segment_start(self, point: QgsPointXY):
         self.segment_start_point = point
         self.update_rect()
@@ -78,6 +128,8 @@ class PointsAlongLineItem(QgsMapCanvasItem):
 
     def add_point(self, point: QgsPointXY):
         self.points.append(point)
+        self._path_x = None
+        self._points_rect = None
         self.update_rect()
         self.update()
 
@@ -90,19 +142,23 @@ class PointsAlongLineItem(QgsMapCanvasItem):
 
         width = self.pen.width() + (self.pixmap.width() / 2 if self.pixmap else 0)
 
-        all_points = self.points + ([self.hover_point] if self.hover_point else []) + (
-            [self.segment_start_point] if self.segment_start_point else [])
+        def combine_points(r: QgsRectangle, points) -> QgsRectangle:
+            for p in points:
+                transformed_point = map_to_pixel.transform(p)
+                point_rect = QgsRectangle(transformed_point.x() - width, transformed_point.y() - width,
+                                          transformed_point.x() + width, transformed_point.y() + width)
+                if r.isEmpty():
+                    r = point_rect
+                else:
+                    r.combineExtentWith(point_rect)
+            return r
 
-        r = QgsRectangle()
+        if self._points_rect is None:
+            self._points_rect = combine_points(QgsRectangle(), self.points)
 
-        for p in all_points:
-            transformed_point = map_to_pixel.transform(p)
-            point_rect = QgsRectangle(transformed_point.x() - width, transformed_point.y() - width,
-                                      transformed_point.x() + width, transformed_point.y() + width)
-            if r.isEmpty():
-                r = point_rect
-            else:
-                r.combineExtentWith(point_rect)
+        r = combine_points(QgsRectangle(self._points_rect),
+                           ([self.hover_point] if self.hover_point else []) + (
+                               [self.segment_start_point] if self.segment_start_point else []))
 
         res = map_to_pixel.mapUnitsPerPixel()
         top_left = map_to_pixel.toMapCoordinates(int(r.xMinimum()), int(r.yMinimum()))
@@ -113,15 +169,22 @@ class PointsAlongLineItem(QgsMapCanvasItem):
         self.setVisible(True)
 
     def updatePosition(self):
+        # the canvas extent has changed, so the cached canvas path and bounds are out of date
+        self._path_x = None
+        self._points_rect = None
         self.update_rect()
 
     def paint(self, painter, option, widget):
         if not painter:
             return
 
-        all_points = self.points[:]
+        if self._path_x is None:
+            self._update_cache()
+
+        # the point following the committed points, which changes as the mouse moves
+        tail_point = None
         if self.hover_point and self.segment_start_point is None:
-            all_points += [self.hover_point]
+            tail_point = self.hover_point
 
         painter.save()
         painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
@@ -143,21 +206,23 @@ class PointsAlongLineItem(QgsMapCanvasItem):
             painter.setPen(pen)
             painter.drawPath(segment_path)
 
-            if all_points:
-                all_points.append(QgsPointXY(0.5 * (self.segment_start_point.x() + self.hover_point.x()),
-                                             0.5 * (self.segment_start_point.y() + self.hover_point.y())))
+            if self.points:
+                tail_point = QgsPointXY(0.5 * (self.segment_start_point.x() + self.hover_point.x()),
+                                        0.5 * (self.segment_start_point.y() + self.hover_point.y()))
+
+        if tail_point in self._path_point_set:
+            tail_point = None
 
-        all_points = Utils.unique_ordered_list(all_points)
-        if len(all_points) < 2:
+        if len(self._path_x) + (1 if tail_point is not None else 0) < 2:
             painter.restore()
             return
 
-        canvas_points = [QgsPointXY(self.toCanvasCoordinates(p) - self.pos()) for p in all_points]
+        # paint in canvas coordinates, so that the cached path can be used as is
+        painter.translate(-self.pos())
 
-        line_path = QPainterPath()
-        line_path.moveTo(canvas_points[0].x(), canvas_points[0].y())
-        for p in canvas_points[1:]:
-            line_path.lineTo(p.x(), p.y())
+        line_path = QPainterPath(self._canvas_path)
+        if tail_point is not None:
+            self._add_canvas_vertex(line_path, tail_point)
 
         # draw arrow, using a red line over a thicker white line so that the arrow is visible
         # against a range of backgrounds
@@ -173,36 +238,50 @@ class PointsAlongLineItem(QgsMapCanvasItem):
         painter.drawPath(line_path)
 
         if self.pixmap:
-            generated_points = GeometryUtils.generate_rotated_points_along_path(all_points,
-                                                                                point_count=self.marker_count,
-                                                                                point_distance=self.marker_distance,
-                                                                                orientation=self.orientation,
-                                                                                include_endpoints=self.include_endpoints)
-
-            for marker_point, angle in generated_points:
-                canvas_point = self.toCanvasCoordinates(marker_point) - self.pos()
-                painter.save()
-                painter.translate(canvas_point.x(),
-                                  canvas_point.y())
-                painter.rotate(angle + (180 if self.orientation in (90, 270) else 0))
-                painter.drawPixmap(int(-self.pixmap.width() / 2), int(-self.pixmap.height() / 2), self.pixmap)
-                painter.restore()
+            if tail_point is not None:
+                GeometryUtils.append_path_vertex(self._path_x, self._path_y, self._path_lengths, self._path_angles,
+                                                 tail_point.x(), tail_point.y())
+            try:
+                xs, ys, angles = GeometryUtils.generate_rotated_point_arrays_along_vertices(
+                    self._path_x, self._path_y, self._path_lengths, self._path_angles,
+                    point_count=self.marker_count,
+                    point_distance=self.marker_distance,
+                    orientation=self.orientation,
+                    include_endpoints=self.include_endpoints)
+            finally:
+                # remove the tail vertex again, leaving just the committed points in the cache
+                if tail_point is not None:
+                    del self._path_x[-1], self._path_y[-1], self._path_lengths[-1], self._path_angles[-1]
+
+            sprite_cache = SpriteCache.instance()
+            for x, y, angle in zip(xs, ys, angles):
+                canvas_point = self.toCanvasCoordinates(QgsPointXY(x, y))
+                sprite = sprite_cache.sprite(self.symbol_image,
+                                             angle + (180 if self.orientation in (90, 270) else 0))
+                painter.drawPixmap(SpriteCache.sprite_origin(sprite, canvas_point), sprite)
 
         painter.restore()
 
     def set_symbol(self, symbol_image: QImage):
+        self.symbol_image = symbol_image
         self.pixmap = QPixmap.fromImage(symbol_image)
+        # the bounds depend on the symbol size
+        self._points_rect = None
 
     def set_marker_count(self, count):
         self.marker_count = count
         self.marker_distance = None
+        self.invalidate_cache()
 
     def set_marker_distance(self, distance):
         self.marker_count = None
         self.marker_distance = distance
+        self.invalidate_cache()
 
     def set_orientation(self, orientation: float):
         self.orientation = orientation
+        self.invalidate_cache()
 
     def set_include_endpoints(self, include_endpoints: bool):
         self.include_endpoints = include_endpoints
+        self.invalidate_cache()
@@ -18,19 +18,15 @@ from qgis.core import (
     QgsFeature,
     QgsGeometry,
     QgsPointXY,
-    QgsRenderContext,
-    QgsExpressionContextUtils,
-    QgsProperty,
     QgsApplication,
-    NULL,
-    QgsSymbol
+    NULL
 )
 from qgis.gui import (
     QgsMapCanvas,
     QgsMapMouseEvent
 )
 
-from cartography_tools.gui.gui_utils import GuiUtils
+from cartography_tools.gui.symbol_preview_cache import SymbolPreviewCache
 from cartography_tools.tools.map_tool import Tool
 from cartography_tools.tools.marker_settings_widget import MarkerSettingsWidget
 from cartography_tools.tools.point_rotation_item import PointRotationItem
@@ -73,29 +69,8 @@ class SinglePointTemplatedMarkerTool(Tool):
 
     def create_rotation_item(self, map_point: QgsPointXY):
         f = self.create_feature(point=self.initial_point, rotation=0)
-
-        # find symbol for feature
-        renderer = self.current_layer().renderer().clone()
-        context = QgsRenderContext.fromMapSettings(self.canvas().mapSettings())
-        context.expressionContext().appendScope(QgsExpressionContextUtils.layerScope(self.current_layer()))
-        context.expressionContext().setFeature(f)
-
-        renderer.startRender(context, self.current_layer().fields())
-        symbol = renderer.originalSymbolForFeature(f, context)
-        if symbol is None:
-            # e.g. code which doesn't match existing category
-            if len(renderer.symbols(context)):
-                symbol = renderer.symbols(context)[0]
-            else:
-                symbol = QgsSymbol.defaultSymbol(self.current_layer().geometryType())
-
-        renderer.stopRender(context)
-
-        # clear existing data defined rotation
-        symbol.setDataDefinedAngle(QgsProperty())
-
-        # render symbol to image
-        symbol_image = GuiUtils.big_marker_preview_image(symbol, context.expressionContext())
+        symbol_image = SymbolPreviewCache.instance().preview_image(
+            self.current_layer(), f, self.widget.code_value() if self.widget.code_field() else None, self.canvas())
 
         self.rotation_item = PointRotationItem(self.canvas())
         self.rotation_item.set_symbol(symbol_image)